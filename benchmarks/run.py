@@ -0,0 +1,327 @@
+"""
+Benchmark runner for the SDK and CLI paths.
+
+Generates seeded policy / dynamic-group corpora (oci_lexer_parser.bench.corpus),
+runs each scenario in a fresh interpreter and writes machine-readable JSON
+results: throughput (statements/s), per-statement latency percentiles, peak
+RSS of the worker process and import time.
+
+For before/after regression checks of a change use
+`python -m oci_lexer_parser.bench` instead.
+
+    python benchmarks/run.py                                  # 1k statements, all scenarios
+    python benchmarks/run.py --sizes 1000,100000 --out results.json
+    python benchmarks/run.py --scenarios sdk-policy,cli-policy-chunked --sizes 10000000
+
+Scenarios:
+    import-sdk          `import oci_lexer_parser`
+    import-cli          `python -m oci_lexer_parser.cli --version`
+    sdk-policy          parse_policy_statements() per statement (latency percentiles)
+    sdk-policy-document parse_policy_statements() on the whole corpus in one call
+    sdk-dg              parse_dynamic_group_matching_rules() per rule
+    cli-policy-chunked  oci-lexer-parse --chunked --jsonl FILE
+    cli-policy          oci-lexer-parse --jsonl FILE
+    cli-dg              oci-lexer-parse --dynamic-group --jsonl FILE
+
+Peak RSS comes from wait4() and is Unix-only; elsewhere it is reported as null.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+SRC_DIR = REPO_ROOT / "src"
+
+sys.path.insert(0, str(SRC_DIR))
+from oci_lexer_parser.bench.corpus import write_corpus  # noqa: E402
+
+SDK_SCENARIOS = ("sdk-policy", "sdk-policy-document", "sdk-dg")
+CLI_SCENARIOS = {
+    "cli-policy-chunked": ("policy", ["--chunked", "--jsonl"]),
+    "cli-policy": ("policy", ["--jsonl"]),
+    "cli-dg": ("dg", ["--dynamic-group", "--jsonl"]),
+}
+IMPORT_SCENARIOS = ("import-sdk", "import-cli")
+ALL_SCENARIOS = (*IMPORT_SCENARIOS, *SDK_SCENARIOS, *CLI_SCENARIOS)
+
+
+# ============================================================
+# Worker side (runs inside a fresh interpreter)
+# ============================================================
+
+
+def _percentiles(samples: array) -> dict[str, float] | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def pick(q: float) -> float:
+        # nearest-rank
+        return ordered[min(n - 1, max(0, int(q * n + 0.5) - 1))] * 1000.0
+
+    return {
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "p999": pick(0.999),
+        "max": ordered[-1] * 1000.0,
+        "mean": statistics.fmean(ordered) * 1000.0,
+    }
+
+
+def _worker(scenario: str, corpus: Path) -> dict[str, Any]:
+    from oci_lexer_parser import parse_dynamic_group_matching_rules, parse_policy_statements
+    from oci_lexer_parser.cli import chunk_lines
+
+    clock = time.perf_counter
+    latencies = array("d")
+    count = 0
+
+    t0 = clock()
+    if scenario == "sdk-policy":
+        with open(corpus, encoding="utf-8") as fh:
+            for chunk in chunk_lines(fh):
+                s = clock()
+                parse_policy_statements(chunk)
+                latencies.append(clock() - s)
+        count = len(latencies)
+    elif scenario == "sdk-policy-document":
+        payload = parse_policy_statements(Path(corpus).read_text(encoding="utf-8"))
+        count = len(payload["statements"])  # type: ignore[index]
+    elif scenario == "sdk-dg":
+        with open(corpus, encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                s = clock()
+                parse_dynamic_group_matching_rules(line)
+                latencies.append(clock() - s)
+        count = len(latencies)
+    else:
+        raise SystemExit(f"unknown worker scenario: {scenario}")
+    elapsed = clock() - t0
+
+    return {"statements": count, "seconds": elapsed, "latency_ms": _percentiles(latencies)}
+
+
+# ============================================================
+# Runner side
+# ============================================================
+
+
+def _env() -> dict[str, str]:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{SRC_DIR}{os.pathsep}{env['PYTHONPATH']}" if "PYTHONPATH" in env else str(SRC_DIR)
+    return env
+
+
+def _run_child(cmd: list[str], *, stdout: Any) -> tuple[int, float, int | None, bytes]:
+    """Run cmd; return (returncode, wall seconds, peak RSS in KiB or None, stdout bytes)."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=stdout, stderr=subprocess.PIPE, env=_env(), cwd=str(REPO_ROOT))
+    out = b""
+    if stdout is subprocess.PIPE:
+        assert proc.stdout is not None
+        out = proc.stdout.read()
+    err = proc.stderr.read() if proc.stderr is not None else b""
+    rss_kib: int | None = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss = usage.ru_maxrss
+        rss_kib = rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS, KiB on Linux
+    else:  # pragma: no cover - non-Unix
+        proc.wait()
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        sys.stderr.write(err.decode("utf-8", "replace"))
+    return proc.returncode, wall, rss_kib, out
+
+
+def _bench_import(scenario: str, runs: int) -> dict[str, Any]:
+    if scenario == "import-sdk":
+        cmd = [sys.executable, "-c", "import oci_lexer_parser"]
+    else:
+        cmd = [sys.executable, "-m", "oci_lexer_parser.cli", "--version"]
+    walls = []
+    rss = None
+    for _ in range(runs):
+        rc, wall, rss, _ = _run_child(cmd, stdout=subprocess.DEVNULL)
+        if rc != 0:
+            raise SystemExit(f"{scenario} failed with exit code {rc}")
+        walls.append(wall * 1000.0)
+    # Baseline: a bare interpreter start, so the import cost can be read directly.
+    base = []
+    for _ in range(runs):
+        _, wall, _, _ = _run_child([sys.executable, "-c", "pass"], stdout=subprocess.DEVNULL)
+        base.append(wall * 1000.0)
+    return {
+        "scenario": scenario,
+        "runs": runs,
+        "wall_ms": {"median": statistics.median(walls), "min": min(walls)},
+        "interpreter_ms": {"median": statistics.median(base), "min": min(base)},
+        "import_ms": statistics.median(walls) - statistics.median(base),
+        "peak_rss_kib": rss,
+    }
+
+
+def _bench_sdk(scenario: str, corpus: Path, size: int) -> dict[str, Any]:
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", scenario, "--corpus", str(corpus)]
+    rc, wall, rss, out = _run_child(cmd, stdout=subprocess.PIPE)
+    if rc != 0:
+        raise SystemExit(f"{scenario} failed with exit code {rc}")
+    res = json.loads(out)
+    secs = res["seconds"]
+    return {
+        "scenario": scenario,
+        "size": size,
+        "statements": res["statements"],
+        "seconds": secs,
+        "statements_per_s": res["statements"] / secs if secs else None,
+        "latency_ms": res["latency_ms"],
+        "wall_seconds": wall,
+        "peak_rss_kib": rss,
+    }
+
+
+def _bench_cli(scenario: str, corpus: Path, size: int) -> dict[str, Any]:
+    _, flags = CLI_SCENARIOS[scenario]
+    cmd = [sys.executable, "-m", "oci_lexer_parser.cli", *flags, str(corpus)]
+    rc, wall, rss, _ = _run_child(cmd, stdout=subprocess.DEVNULL)
+    if rc != 0:
+        raise SystemExit(f"{scenario} failed with exit code {rc}")
+    return {
+        "scenario": scenario,
+        "size": size,
+        "statements": size,
+        "seconds": wall,
+        "statements_per_s": size / wall if wall else None,
+        "latency_ms": None,
+        "wall_seconds": wall,
+        "peak_rss_kib": rss,
+    }
+
+
+def _package_version() -> str:
+    try:
+        import importlib.metadata as md
+
+        return md.version("oci-lexer-parser")
+    except Exception:
+        return "unknown"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=str(REPO_ROOT), capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _meta(args: argparse.Namespace, sizes: list[int], scenarios: list[str]) -> dict[str, Any]:
+    return {
+        "timestamp": _dt.datetime.now(_dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "package_version": _package_version(),
+        "git_commit": _git_commit(),
+        "seed": args.seed,
+        "sizes": sizes,
+        "scenarios": scenarios,
+    }
+
+
+def _parse_sizes(raw: str) -> list[int]:
+    sizes = []
+    for part in raw.split(","):
+        part = part.strip().lower().replace("_", "")
+        mult = 1
+        if part.endswith("k"):
+            part, mult = part[:-1], 1_000
+        elif part.endswith("m"):
+            part, mult = part[:-1], 1_000_000
+        sizes.append(int(part) * mult)
+    return sizes
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1k", help="Comma-separated corpus sizes, e.g. 1k,100k,10m (default: 1k).")
+    ap.add_argument("--scenarios", default=",".join(ALL_SCENARIOS), help="Comma-separated scenario names.")
+    ap.add_argument("--seed", type=int, default=42, help="Corpus generator seed (default: 42).")
+    ap.add_argument("--import-runs", type=int, default=5, help="Interpreter launches per import scenario.")
+    ap.add_argument("--corpus-dir", type=Path, help="Keep generated corpora here instead of a temp dir.")
+    ap.add_argument("--out", type=Path, help="Write JSON results here (default: stdout).")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    ap.add_argument("--corpus", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        json.dump(_worker(args.worker, args.corpus), sys.stdout)
+        return 0
+
+    sizes = _parse_sizes(args.sizes)
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = sorted(set(scenarios) - set(ALL_SCENARIOS))
+    if unknown:
+        ap.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results: list[dict[str, Any]] = []
+    for sc in scenarios:
+        if sc in IMPORT_SCENARIOS:
+            sys.stderr.write(f"[bench] {sc}\n")
+            results.append(_bench_import(sc, args.import_runs))
+
+    with tempfile.TemporaryDirectory(prefix="oci-bench-") as tmp:
+        corpus_dir = args.corpus_dir or Path(tmp)
+        corpus_dir.mkdir(parents=True, exist_ok=True)
+        for size in sizes:
+            corpora: dict[str, Path] = {}
+            for sc in scenarios:
+                if sc in IMPORT_SCENARIOS:
+                    continue
+                kind = "dg" if sc.endswith("-dg") else "policy"
+                if kind not in corpora:
+                    path = corpus_dir / f"{kind}_{size}_seed{args.seed}.txt"
+                    if not path.exists():
+                        sys.stderr.write(f"[bench] generating {path.name}\n")
+                        write_corpus(path, kind, size, args.seed)
+                    corpora[kind] = path
+                sys.stderr.write(f"[bench] {sc} size={size}\n")
+                if sc in CLI_SCENARIOS:
+                    results.append(_bench_cli(sc, corpora[kind], size))
+                else:
+                    results.append(_bench_sdk(sc, corpora[kind], size))
+
+    doc = {"meta": _meta(args, sizes, scenarios), "results": results}
+    text = json.dumps(doc, indent=2) + "\n"
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
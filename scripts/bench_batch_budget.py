@@ -0,0 +1,87 @@
+"""
+Timing harness for the CLI's --batch-bytes and --batch-tokens budgets
+(--chunked path).
+
+Generates a seeded policy corpus, runs `oci-lexer-parse --chunked --jsonl`
+in-process for each budget and reports the median wall time, throughput,
+speed-up over one parse per statement (budget 0) and the tracemalloc peak of
+a separate run. Used to pick cli.DEFAULT_BATCH_BYTES and cli.DEFAULT_BATCH_TOKENS.
+
+    python scripts/bench_batch_budget.py [--statements 5000] [--budgets 0,1024,4096] [--token-budgets 64,256,1024]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from oci_lexer_parser import cli
+from oci_lexer_parser.bench.corpus import iter_policy_statements
+from oci_lexer_parser.bench.stats import median
+
+
+class _NullWriter:
+    def write(self, s: str) -> int:
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+def run_once(path: Path, flag: str, budget: int) -> None:
+    with redirect_stdout(_NullWriter()):  # type: ignore[type-var]
+        cli.main(["--chunked", "--jsonl", flag, str(budget), str(path)])
+
+
+def measure(path: Path, flag: str, budget: int, repeats: int) -> tuple[float, int]:
+    samples = []
+    for _ in range(repeats):
+        gc.collect()
+        t0 = time.perf_counter()
+        run_once(path, flag, budget)
+        samples.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    run_once(path, flag, budget)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return median(samples), peak
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--statements", type=int, default=5000)
+    ap.add_argument("--budgets", default="0,1024,4096,16384,65536,262144")
+    ap.add_argument("--token-budgets", default="64,256,1024,4096")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    runs = [("--batch-bytes", int(b)) for b in args.budgets.split(",") if b]
+    runs += [("--batch-tokens", int(b)) for b in args.token_budgets.split(",") if b]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "policy.txt"
+        path.write_text("".join(s + "\n" for s in iter_policy_statements(args.statements, args.seed)), encoding="utf-8")
+        run_once(path, "--batch-bytes", 0)  # warm the ANTLR DFA caches
+
+        print(f"{args.statements} statements, {path.stat().st_size:,} bytes, median of {args.repeats}")
+        print(f"{'budget':>16}  {'median s':>9}  {'stmts/s':>9}  {'speed-up':>8}  {'peak KiB':>9}")
+        base = None
+        for flag, budget in runs:
+            secs, peak = measure(path, flag, budget, args.repeats)
+            base = base or secs
+            label = f"{budget} {'bytes' if flag == '--batch-bytes' else 'tokens'}"
+            print(
+                f"{label:>16}  {secs:>9.3f}  {args.statements / secs:>9.0f}  "
+                f"{base / secs:>7.2f}x  {peak / 1024:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Timing harness for the expected-token memo used by syntax error reporting.
+
+Generates a seeded policy corpus with one syntax error per statement, parses it
+with error_mode="report" and compares the memo (parser_utils.ExpectedTokensCache)
+against calling recognizer.getExpectedTokens() on every error. Reports the
+median total parse time and the time spent in the lookups themselves.
+
+    python scripts/bench_expected_tokens.py [--statements 3000] [--repeats 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+from typing import Any
+
+from oci_lexer_parser import parse_policy_statements
+from oci_lexer_parser import parser_policy_statements as pps
+from oci_lexer_parser.bench.corpus import iter_broken_policy_statements
+from oci_lexer_parser.bench.stats import median
+from oci_lexer_parser.parser_utils import ExpectedTokensCache
+
+
+class _Uncached:
+    """What the error listener did before the memo."""
+
+    def lookup(self, recognizer: Any) -> tuple[int, ...]:
+        exp = recognizer.getExpectedTokens()
+        return tuple(t for r in (exp.intervals or ()) for t in r)
+
+
+class _Timed:
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.calls = 0
+        self.ns = 0
+
+    def lookup(self, recognizer: Any) -> tuple[int, ...]:
+        t0 = time.perf_counter_ns()
+        types = self.inner.lookup(recognizer)
+        self.ns += time.perf_counter_ns() - t0
+        self.calls += 1
+        return types
+
+
+def measure(text: str, make: Any, repeats: int) -> tuple[float, float, int]:
+    """Median parse seconds, median lookup seconds and lookups per parse."""
+    parse_s: list[float] = []
+    lookup_s: list[float] = []
+    calls = 0
+    for _ in range(repeats):
+        timed = _Timed(make())
+        pps._EXPECTED_TOKENS = timed  # type: ignore[assignment]
+        gc.collect()
+        t0 = time.perf_counter()
+        parse_policy_statements(text, error_mode="report")
+        parse_s.append(time.perf_counter() - t0)
+        lookup_s.append(timed.ns / 1e9)
+        calls = timed.calls
+    return median(parse_s), median(lookup_s), calls
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--statements", type=int, default=3000)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    text = "".join(s + "\n" for s in iter_broken_policy_statements(args.statements, args.seed))
+    saved = pps._EXPECTED_TOKENS
+    try:
+        parse_policy_statements(text, error_mode="report")  # warm the ANTLR DFA caches
+        warm = ExpectedTokensCache()
+        variants = [
+            ("uncached", _Uncached),
+            ("memo (cold)", ExpectedTokensCache),
+            ("memo (warm)", lambda: warm),
+        ]
+        print(f"{args.statements} statements, {len(text):,} bytes, median of {args.repeats}")
+        print(f"{'variant':<12}  {'errors':>7}  {'parse s':>8}  {'lookup ms':>9}  {'us/lookup':>9}")
+        for name, make in variants:
+            parse_secs, lookup_secs, calls = measure(text, make, args.repeats)
+            per_call = lookup_secs / calls * 1e6 if calls else 0.0
+            print(f"{name:<12}  {calls:>7}  {parse_secs:>8.3f}  {lookup_secs * 1e3:>9.2f}  {per_call:>9.2f}")
+        print(f"memo: {len(warm)} keys, {warm.hits} hits, {warm.misses} misses")
+    finally:
+        pps._EXPECTED_TOKENS = saved
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Allocation benchmark for the statement finalization steps.
+
+DEFINE substitution, the default tenancy alias and subject normalization run
+while statements are shaped. This harness parses a corpus whose subjects and
+compartments resolve through DEFINEs and reports, per configuration, the peak
+traced memory of the parse (tracemalloc), the memory retained by the payload
+and the best parse time (untraced). "plain" parses without any of the
+finalization options, so the other rows show what finalization adds on top
+of it.
+
+    python scripts/bench_finalize_allocs.py [--statements 5000] [--seed 7] [--repeat 3]
+
+Run it on the commits before and after a change to compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Any
+
+from oci_lexer_parser import parse_policy_statements
+
+_GROUPS = ["NetworkAdmins", "Auditors", "Default/Developers", "DBAdmins", "SecOps"]
+_VERBS = ["inspect", "read", "use", "manage"]
+_RESOURCES = ["buckets", "objects", "instances", "vcns", "volumes"]
+_COMPARTMENTS = ["apps", "prod", "network", "dev"]
+
+
+def build_corpus(n: int, seed: int) -> str:
+    rnd = random.Random(seed)
+    lines = [f"define group {g} as ocid1.group.oc1..{i:04d}" for i, g in enumerate(_GROUPS)]
+    lines += [f"define compartment {c} as ocid1.compartment.oc1..{i:04d}" for i, c in enumerate(_COMPARTMENTS)]
+    for _ in range(n):
+        groups = ", ".join(rnd.sample(_GROUPS, rnd.randint(1, 2)))
+        where = "tenancy" if rnd.random() < 0.2 else f"compartment {rnd.choice(_COMPARTMENTS)}"
+        lines.append(f"allow group {groups} to {rnd.choice(_VERBS)} {rnd.choice(_RESOURCES)} in {where}")
+    return "\n".join(lines) + "\n"
+
+
+def measure(text: str, repeat: int, **opts: Any) -> tuple[int, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    payload = parse_policy_statements(text, **opts)
+    gc.collect()  # drop parse trees; keep only what the payload retains
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del payload
+
+    # Time separately: tracing slows allocation-heavy code unevenly.
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        parse_policy_statements(text, **opts)
+        best = min(best, time.perf_counter() - t0)
+    return peak, retained, best
+
+
+CONFIGS: dict[str, dict[str, Any]] = {
+    "plain": {},
+    "define-subs": {"define_subs": True},
+    "all": {"define_subs": True, "default_tenancy_alias": "Acme", "default_identity_domain": "Default"},
+}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--statements", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per config (best is reported)")
+    args = ap.parse_args()
+
+    text = build_corpus(args.statements, args.seed)
+    print(f"statements: {args.statements}  corpus: {len(text):,} bytes")
+    print(f"{'config':<14}{'peak':>14}{'retained':>14}{'parse s':>10}")
+    for name, opts in CONFIGS.items():
+        peak, retained, elapsed = measure(text, args.repeat, **opts)
+        print(f"{name:<14}{peak:>14,}{retained:>14,}{elapsed:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
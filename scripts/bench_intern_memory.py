@@ -0,0 +1,84 @@
+"""
+Memory benchmark for parse_policy_statements(intern=True).
+
+Builds a policy corpus where the same subjects and condition fragments repeat
+many times (as in real tenancies), parses it with and without interning and
+reports the retained size of the resulting statements, the peak traced memory
+during the call (tracemalloc) and the parse time.
+
+    python scripts/bench_intern_memory.py [--statements 5000] [--seed 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from oci_lexer_parser import parse_policy_statements
+
+_GROUPS = ["NetworkAdmins", "Auditors", "Default/Developers", "DBAdmins", "SecOps"]
+_VERBS = ["inspect", "read", "use", "manage"]
+_RESOURCES = ["buckets", "objects", "instances", "vcns", "volumes", "secret-family"]
+_COMPARTMENTS = ["apps", "prod", "shared:network", "dev"]
+_CLAUSES = [
+    "request.permission = 'BUCKET_READ'",
+    "request.permission = 'OBJECT_INSPECT'",
+    "target.compartment.id = 'ocid1.compartment.oc1..aaaaaaaaexample'",
+    "request.region = 'iad'",
+    "request.user.mfaTotpVerified = 'true'",
+    "target.bucket.name IN ('logs', 'audit', 'exports')",
+]
+
+
+def build_corpus(n: int, seed: int) -> str:
+    rnd = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        line = (
+            f"allow group {rnd.choice(_GROUPS)} to {rnd.choice(_VERBS)} "
+            f"{rnd.choice(_RESOURCES)} in compartment {rnd.choice(_COMPARTMENTS)}"
+        )
+        k = rnd.randint(0, 3)
+        if k:
+            mode = rnd.choice(("all", "any"))
+            line += f" where {mode} {{ {', '.join(rnd.sample(_CLAUSES, k))} }}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def measure(text: str, *, intern: bool) -> tuple[int, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    payload = parse_policy_statements(text, intern=intern)
+    elapsed = time.perf_counter() - t0
+    gc.collect()  # drop parse trees; keep only what the payload retains
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del payload
+    return retained, peak, elapsed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--statements", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    text = build_corpus(args.statements, args.seed)
+    base_mem, base_peak, base_t = measure(text, intern=False)
+    int_mem, int_peak, int_t = measure(text, intern=True)
+
+    print(f"statements: {args.statements}  corpus: {len(text):,} bytes")
+    print(f"{'mode':<10}{'retained':>14}{'peak':>14}{'parse s':>10}")
+    print(f"{'plain':<10}{base_mem:>14,}{base_peak:>14,}{base_t:>10.2f}")
+    print(f"{'interned':<10}{int_mem:>14,}{int_peak:>14,}{int_t:>10.2f}")
+    print(f"retained memory: {int_mem / base_mem:.1%} of plain")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
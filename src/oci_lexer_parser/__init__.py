@@ -1,12 +1,55 @@
 # src/oci_lexer_parser/__init__.py
 
-from .parser_policy_statements import parse_policy_statements, parse_policy_statement, build_symbols
+from .parser_policy_statements import (
+    parse_policy_statements,
+    parse_policy_statement,
+    build_symbols,
+    materialize_conditions,
+    statement_conditions,
+)
 from .parser_dynamic_group_matching_rules import parse_dynamic_group_matching_rules, parse_dynamic_group_matching_rule
+from .parser_incremental import PolicyDocument, parse_policy_document, reparse_policy_document
+from .parser_utils import InternPool
+from .canonical import statement_fingerprint, dedupe_statements
+from .unparser import render_policy_statements, render_policy_statement, render_dynamic_group_rule
+from .policy_diff import diff_policies, iter_policy_diff_jsonl
+from .budgets import ParseBudgetExceeded
+from .recognizers import set_thread_safe_parsing
+from .symbols import SymbolTable
+from .timing import LatencyHistogram, StatementTimings
+from .oci_exports import (
+    parse_policy_export,
+    parse_dynamic_group_export,
+    iter_parsed_policy_export,
+    iter_parsed_dynamic_group_export,
+)
 
 __all__ = [
     "parse_policy_statements",
     "parse_policy_statement",
     "build_symbols",
+    "materialize_conditions",
+    "statement_conditions",
+    "InternPool",
     "parse_dynamic_group_matching_rules",
     "parse_dynamic_group_matching_rule",
+    "PolicyDocument",
+    "parse_policy_document",
+    "reparse_policy_document",
+    "statement_fingerprint",
+    "dedupe_statements",
+    "render_policy_statements",
+    "render_policy_statement",
+    "render_dynamic_group_rule",
+    "diff_policies",
+    "iter_policy_diff_jsonl",
+    "LatencyHistogram",
+    "StatementTimings",
+    "SymbolTable",
+    "set_thread_safe_parsing",
+    "ParseBudgetExceeded",
+    "parse_policy_export",
+    "parse_dynamic_group_export",
+    "iter_parsed_policy_export",
+    "iter_parsed_dynamic_group_export",
 ]
@@ -0,0 +1,8 @@
+"""
+Local performance tooling: timed scenarios and a regression gate.
+
+    python -m oci_lexer_parser.bench run --out base.json
+    # ... apply a change ...
+    python -m oci_lexer_parser.bench run --out head.json
+    python -m oci_lexer_parser.bench compare base.json head.json --threshold 5
+"""
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import os
+import platform
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from .scenarios import SCENARIOS, Corpus, time_scenario
+from .stats import compare_samples, median
+
+# Metadata fields that make two result files incomparable when they differ.
+_ENV_KEYS = ("python", "implementation", "machine", "statements", "rules", "seed")
+
+
+def _meta(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        import importlib.metadata as md
+
+        version = md.version("oci-lexer-parser")
+    except Exception:
+        version = "unknown"
+    return {
+        "timestamp": _dt.datetime.now(_dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "package_version": version,
+        "statements": args.statements,
+        "rules": args.rules,
+        "seed": args.seed,
+        "repeats": args.repeats,
+        "warmup": args.warmup,
+    }
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()] if args.scenarios else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        sys.stderr.write(f"unknown scenario(s): {', '.join(unknown)}; known: {', '.join(SCENARIOS)}\n")
+        return 2
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="oci-bench-") as tmp:
+        corpus = Corpus.generate(Path(tmp), statements=args.statements, rules=args.rules, seed=args.seed)
+        for name in names:
+            sc = SCENARIOS[name]
+            sys.stderr.write(f"[bench] {name}: {sc.description}\n")
+            samples = time_scenario(sc, corpus, repeats=args.repeats, warmup=args.warmup)
+            results[name] = {"units": sc.units(corpus), "median_s": median(samples), "samples_s": samples}
+
+    doc = {"meta": _meta(args), "scenarios": results}
+    text = json.dumps(doc, indent=2) + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+def _load(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        doc = json.load(fh)
+    if not isinstance(doc, dict) or not isinstance(doc.get("scenarios"), dict):
+        raise ValueError(f"{path}: not a bench result file (missing 'scenarios')")
+    return doc
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    try:
+        base = _load(args.base)
+        head = _load(args.head)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+
+    bmeta, hmeta = base.get("meta") or {}, head.get("meta") or {}
+    for key in _ENV_KEYS:
+        if bmeta.get(key) != hmeta.get(key):
+            sys.stderr.write(f"warning: '{key}' differs (base={bmeta.get(key)!r}, head={hmeta.get(key)!r})\n")
+
+    threshold = args.threshold / 100.0
+    rows: dict[str, Any] = {}
+    for name, b in base["scenarios"].items():
+        h = head["scenarios"].get(name)
+        if h is None:
+            sys.stderr.write(f"warning: scenario '{name}' missing from head; skipped\n")
+            continue
+        rows[name] = compare_samples(
+            b["samples_s"],
+            h["samples_s"],
+            threshold=threshold,
+            confidence=args.confidence,
+            resamples=args.resamples,
+            seed=args.seed,
+        )
+    for name in head["scenarios"].keys() - base["scenarios"].keys():
+        sys.stderr.write(f"warning: scenario '{name}' missing from base; skipped\n")
+
+    if args.json:
+        sys.stdout.write(json.dumps({"threshold": threshold, "scenarios": rows}, indent=2) + "\n")
+    else:
+        pct = int(round(args.confidence * 100))
+        sys.stdout.write(
+            f"{'scenario':<14}{'base ms':>11}{'head ms':>11}{'delta':>9}   {f'{pct}% CI':<20}verdict\n"
+        )
+        for name, r in rows.items():
+            ci = f"[{r['ci_low']:+.1%}, {r['ci_high']:+.1%}]"
+            sys.stdout.write(
+                f"{name:<14}{r['base_median_s'] * 1000:>11.2f}{r['head_median_s'] * 1000:>11.2f}"
+                f"{r['delta']:>+9.1%}   {ci:<20}{r['verdict']}\n"
+            )
+
+    regressed = [n for n, r in rows.items() if r["verdict"] == "regressed"]
+    if regressed:
+        sys.stderr.write(f"regression over {args.threshold:g}%: {', '.join(regressed)}\n")
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python -m oci_lexer_parser.bench",
+        description="Run timed parser scenarios locally and compare two runs.",
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Time the scenarios and write a JSON result file.")
+    run.add_argument("--out", help="Write results here (default: stdout).")
+    run.add_argument("--scenarios", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+    run.add_argument("--statements", type=int, default=300, help="Policy statements in the corpus (default: 300).")
+    run.add_argument("--rules", type=int, default=50, help="Dynamic-group rules in the corpus (default: 50).")
+    run.add_argument("--seed", type=int, default=42, help="Corpus generator seed (default: 42).")
+    run.add_argument("--repeats", type=int, default=10, help="Timed samples per scenario (default: 10).")
+    run.add_argument("--warmup", type=int, default=1, help="Untimed runs before sampling (default: 1).")
+    run.set_defaults(func=_cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Compare two result files; exit 1 on a regression.")
+    cmp_.add_argument("base", help="Result file of the baseline run.")
+    cmp_.add_argument("head", help="Result file of the candidate run.")
+    cmp_.add_argument("--threshold", type=float, default=5.0, help="Allowed slowdown in percent (default: 5).")
+    cmp_.add_argument("--confidence", type=float, default=0.95, help="Bootstrap confidence level (default: 0.95).")
+    cmp_.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples (default: 2000).")
+    cmp_.add_argument("--seed", type=int, default=0, help="Bootstrap seed (default: 0).")
+    cmp_.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    cmp_.set_defaults(func=_cmd_compare)
+
+    args = ap.parse_args(argv)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+"""
+Seeded synthetic corpora for the benchmarks.
+
+The policy generator cycles through every statement form in PolicyStatement.g4
+(ALLOW/DENY, DEFINE for each target, ADMIT incl. the ANY-TENANCY wildcard,
+ENDORSE incl. permission lists and compartment scopes, DENY ADMIT/ENDORSE) and
+every condition operator (=, !=, IN, NOT IN, BEFORE, AFTER, BETWEEN, NOT x, x)
+with literal, quoted OCID, bare OCID, regex and bare-word values, nested
+ANY/ALL groups and multi-line statements; iter_broken_policy_statements()
+injects one syntax error per statement for the error-reporting path. The DG
+generator produces nested ALL/ANY groups from DynamicGroupMatchingRule.g4,
+including the no-brace form and trailing commas.
+
+Both generators are deterministic for a given seed and stream lines, so
+corpora of millions of statements can be written without holding them in
+memory.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from pathlib import Path
+
+_GROUPS = ["NetworkAdmins", "Auditors", "'Default'/'Developers'", "DBAdmins", "'Sec Ops'", "Domain1/'Readers'"]
+_DYN_GROUPS = ["FnFunctions", "InstancePrincipals", "'Default'/'ci-runners'"]
+_SERVICES = ["faas", "objectstorage-us-ashburn-1", "blockstorage", "cloudguard"]
+_VERBS = ["inspect", "read", "use", "manage"]
+_PERMISSIONS = ["BUCKET_READ", "OBJECT_INSPECT", "KEY_READ", "VCN_CREATE", "INSTANCE_UPDATE"]
+_RESOURCES = ["buckets", "objects", "instance-family", "virtual-network-family", "keys", "all-resources"]
+_COMPARTMENTS = ["apps", "prod", "shared:network", "dev:team-a:sandbox", "'Finance Dept'"]
+_TENANCIES = ["PartnerTenancy", "Acme", "'Vendor Co'"]
+_LHS = [
+    "request.permission",
+    "request.operation",
+    "request.region",
+    "target.bucket.name",
+    "target.compartment.id",
+    "request.principal.group.tag.ops.role",
+    "request.utc-timestamp",
+]
+
+_DG_LHS = [
+    "resource.type",
+    "resource.compartment.id",
+    "instance.compartment.id",
+    "instance.id",
+    "tag.ops.role.value",
+    "resource.tag.env.value",
+]
+
+
+def _ocid(rnd: random.Random, kind: str) -> str:
+    return f"ocid1.{kind}.oc1..aaaa{rnd.getrandbits(64):016x}"
+
+
+def _value(rnd: random.Random, *, in_list: bool = False) -> str:
+    # A bare OCID runs up to the next space/comma/brace, so it would swallow
+    # the ')' closing an IN list; lists use quoted OCIDs instead.
+    k = rnd.randrange(5)
+    if k == 0:
+        return f"'{rnd.choice(_PERMISSIONS)}'"
+    if k == 1:
+        return f"'{_ocid(rnd, 'compartment')}'"
+    if k == 2:
+        return f"'{_ocid(rnd, 'bucket')}'" if in_list else _ocid(rnd, "bucket")
+    if k == 3:
+        return "/prod-.*/"
+    return rnd.choice(("iad", "phx", "true", "v2"))
+
+
+def _clause(rnd: random.Random) -> str:
+    lhs = rnd.choice(_LHS)
+    op = rnd.randrange(9)
+    if op == 0:
+        return f"{lhs} = {_value(rnd)}"
+    if op == 1:
+        return f"{lhs} != {_value(rnd)}"
+    if op == 2:
+        return f"{lhs} in ({', '.join(_value(rnd, in_list=True) for _ in range(rnd.randint(1, 6)))})"
+    if op == 3:
+        return f"{lhs} not in ({', '.join(_value(rnd, in_list=True) for _ in range(rnd.randint(1, 4)))})"
+    if op == 4:
+        return f"request.utc-timestamp before '2026-0{rnd.randint(1, 9)}-01T00:00:00Z'"
+    if op == 5:
+        return "request.utc-timestamp after '2025-01-01T00:00:00Z'"
+    if op == 6:
+        return "request.utc-timestamp.hour-of-day between '9' and '17'"
+    if op == 7:
+        return f"not {lhs}"
+    return lhs
+
+
+def _condition(rnd: random.Random, depth: int) -> str:
+    if depth <= 0 or rnd.random() < 0.4:
+        return _clause(rnd)
+    mode = rnd.choice(("all", "any", "ALL", "ANY"))
+    items = ", ".join(_condition(rnd, depth - 1) for _ in range(rnd.randint(1, 4)))
+    return f"{mode} {{{items}}}"
+
+
+def _where(rnd: random.Random) -> str:
+    if rnd.random() < 0.4:
+        return ""
+    # Occasionally break the statement across lines like hand-written policies.
+    sep = "\n    " if rnd.random() < 0.2 else " "
+    return f"{sep}where {_condition(rnd, rnd.randint(0, 3))}"
+
+
+def _subject(rnd: random.Random) -> str:
+    k = rnd.randrange(7)
+    if k == 0:
+        return "any-user"
+    if k == 1:
+        return "any-group"
+    if k == 2:
+        return f"service {', '.join(rnd.sample(_SERVICES, rnd.randint(1, 2)))}"
+    if k == 3:
+        return f"group {', '.join(rnd.sample(_GROUPS, rnd.randint(1, 3)))}"
+    if k == 4:
+        return f"group id {_ocid(rnd, 'group')}"
+    if k == 5:
+        return f"dynamic-group {rnd.choice(_DYN_GROUPS)}"
+    return f"dynamic-group id {_ocid(rnd, 'dynamicgroup')}, id {_ocid(rnd, 'dynamicgroup')}"
+
+
+def _named_subject(rnd: random.Random) -> str:
+    return rnd.choice((f"group {rnd.choice(_GROUPS)}", f"dynamic-group {rnd.choice(_DYN_GROUPS)}"))
+
+
+def _verb(rnd: random.Random) -> str:
+    k = rnd.randrange(6)
+    if k < 4:
+        return _VERBS[k]
+    if k == 4:
+        return rnd.choice(_PERMISSIONS)
+    return "{" + ", ".join(rnd.sample(_PERMISSIONS, rnd.randint(1, 3))) + "}"
+
+
+def _location(rnd: random.Random) -> str:
+    k = rnd.randrange(3)
+    if k == 0:
+        return "tenancy"
+    if k == 1:
+        return f"compartment id {_ocid(rnd, 'compartment')}"
+    return f"compartment {rnd.choice(_COMPARTMENTS)}"
+
+
+def _resource(rnd: random.Random) -> str:
+    return "" if rnd.random() < 0.05 else f" {rnd.choice(_RESOURCES)}"
+
+
+def _endorse_scope(rnd: random.Random) -> str:
+    k = rnd.randrange(3)
+    if k == 0:
+        return "any-tenancy"
+    if k == 1:
+        return f"tenancy {rnd.choice(_TENANCIES)}"
+    return f"compartment {rnd.choice(_COMPARTMENTS)} of tenancy {rnd.choice(_TENANCIES)}"
+
+
+def policy_statement(rnd: random.Random) -> str:
+    """One random policy statement (possibly spanning several lines)."""
+    k = rnd.randrange(20)
+    if k < 10:
+        effect = "Deny" if k == 0 else rnd.choice(("Allow", "allow", "ALLOW"))
+        return f"{effect} {_subject(rnd)} to {_verb(rnd)}{_resource(rnd)} in {_location(rnd)}{_where(rnd)}"
+    if k < 13:
+        target = rnd.choice(
+            (
+                f"tenancy {rnd.choice(_TENANCIES)}",
+                f"group {rnd.choice(_GROUPS)}",
+                f"dynamic-group {rnd.choice(_DYN_GROUPS)}",
+                f"compartment {rnd.choice(('apps', 'prod', 'dev'))}",
+            )
+        )
+        kind = target.split()[0].replace("dynamic-group", "dynamicgroup")
+        return f"Define {target} as {_ocid(rnd, kind)}"
+    if k < 16:
+        deny = "Deny " if k == 13 else ""
+        if rnd.random() < 0.3:
+            who = rnd.choice(("any-user", "any-group"))
+            return f"{deny}Admit {who} of any-tenancy to {_verb(rnd)}{_resource(rnd)} in {_location(rnd)}{_where(rnd)}"
+        of = f" of tenancy {rnd.choice(_TENANCIES)}" if rnd.random() < 0.7 else ""
+        return f"{deny}Admit {_named_subject(rnd)}{of} to {_verb(rnd)}{_resource(rnd)} in {_location(rnd)}{_where(rnd)}"
+    deny = "Deny " if k == 16 else ""
+    if rnd.random() < 0.3:
+        perms = ", ".join(rnd.sample(_PERMISSIONS, rnd.randint(1, 3)))
+        return f"{deny}Endorse {_named_subject(rnd)} {{{perms}}} in {_endorse_scope(rnd)}{_where(rnd)}"
+    verb = "associate" if rnd.random() < 0.2 else _verb(rnd)
+    return (
+        f"{deny}Endorse {_named_subject(rnd)} to {verb} {rnd.choice(_RESOURCES)} "
+        f"in {_endorse_scope(rnd)}{_where(rnd)}"
+    )
+
+
+def _dg_predicate(rnd: random.Random) -> str:
+    lhs = rnd.choice(_DG_LHS)
+    k = rnd.randrange(6)
+    if k == 0:
+        return lhs
+    op = "!=" if k == 1 else "="
+    if "compartment.id" in lhs or lhs == "instance.id":
+        return f"{lhs} {op} '{_ocid(rnd, 'compartment')}'"
+    return f"{lhs} {op} '{rnd.choice(('fnfunc', 'instance', 'prod', 'a,b', 'ci'))}'"
+
+
+def _dg_element(rnd: random.Random, depth: int) -> str:
+    if depth <= 0 or rnd.random() < 0.6:
+        return _dg_predicate(rnd)
+    mode = rnd.choice(("ALL ", "ANY ", "all ", "any ", ""))
+    return f"{mode}{{{_dg_items(rnd, depth - 1)}}}"
+
+
+def _dg_items(rnd: random.Random, depth: int) -> str:
+    items = ", ".join(_dg_element(rnd, depth) for _ in range(rnd.randint(1, 4)))
+    return items + ("," if rnd.random() < 0.1 else "")
+
+
+def dg_rule(rnd: random.Random, max_depth: int = 4) -> str:
+    """One random matching rule on a single line."""
+    depth = rnd.randint(0, max_depth)
+    if rnd.random() < 0.1:
+        return _dg_items(rnd, 0)  # no-brace form
+    return f"{rnd.choice(('ALL', 'ANY', 'all', 'any'))} {{{_dg_items(rnd, depth)}}}"
+
+
+def iter_policy_statements(n: int, seed: int) -> Iterator[str]:
+    rnd = random.Random(seed)
+    for _ in range(n):
+        yield policy_statement(rnd)
+
+
+def broken_policy_statement(rnd: random.Random) -> str:
+    """A policy statement with one syntax error: a dropped TO or IN, or a dangling WHERE."""
+    stmt = policy_statement(rnd)
+    k = rnd.randrange(3)
+    if k == 0 and " to " in stmt:
+        return stmt.replace(" to ", " ", 1)
+    if k == 1 and " in " in stmt:
+        return stmt.replace(" in ", " ", 1)
+    return stmt + " where"
+
+
+def iter_broken_policy_statements(n: int, seed: int) -> Iterator[str]:
+    rnd = random.Random(seed)
+    for _ in range(n):
+        yield broken_policy_statement(rnd)
+
+
+def iter_dg_rules(n: int, seed: int) -> Iterator[str]:
+    rnd = random.Random(seed)
+    for _ in range(n):
+        yield dg_rule(rnd)
+
+
+def write_corpus(path: Path, kind: str, n: int, seed: int) -> Path:
+    """Write an n-statement (or n-rule) corpus to `path`, one item per line."""
+    lines = iter_policy_statements(n, seed) if kind == "policy" else iter_dg_rules(n, seed)
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for ln in lines:
+            fh.write(ln)
+            fh.write("\n")
+    return path
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import copy
+import gc
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .. import cli
+from ..parser_dynamic_group_matching_rules import parse_dynamic_group_matching_rules
+from ..parser_policy_statements import (
+    _finalize_statements,
+    _run_parser,
+    _shape_statements,
+    build_symbols,
+    parse_policy_statements,
+)
+from .corpus import iter_broken_policy_statements, iter_dg_rules, iter_policy_statements
+
+# ============================================================
+# Timed scenarios
+# ============================================================
+#
+# Each scenario's setup() does the untimed preparation once and returns a
+# factory; the factory is called before every sample (also untimed) and returns
+# the thunk that is actually timed. This keeps per-sample preparation such as
+# copying statements that the measured code mutates out of the measurement.
+
+Thunk = Callable[[], Any]
+
+
+@dataclass(slots=True)
+class Corpus:
+    policy_text: str
+    dg_text: str
+    errors_text: str
+    policy_path: Path
+    dg_path: Path
+    statements: int
+    rules: int
+
+    @classmethod
+    def generate(cls, directory: Path, *, statements: int, rules: int, seed: int) -> Corpus:
+        policy_text = "".join(s + "\n" for s in iter_policy_statements(statements, seed))
+        dg_text = "".join(r + "\n" for r in iter_dg_rules(rules, seed))
+        errors_text = "".join(s + "\n" for s in iter_broken_policy_statements(statements, seed))
+        policy_path = directory / "policy.txt"
+        dg_path = directory / "dg.txt"
+        policy_path.write_text(policy_text, encoding="utf-8")
+        dg_path.write_text(dg_text, encoding="utf-8")
+        return cls(policy_text, dg_text, errors_text, policy_path, dg_path, statements, rules)
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    description: str
+    units: Callable[[Corpus], int]
+    setup: Callable[[Corpus], Callable[[], Thunk]]
+
+
+class _NullWriter:
+    def write(self, s: str) -> int:
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+@contextmanager
+def _quiet_stdout() -> Iterator[None]:
+    with redirect_stdout(_NullWriter()):  # type: ignore[type-var]
+        yield
+
+
+def _policy_parse(corpus: Corpus) -> Callable[[], Thunk]:
+    text = corpus.policy_text
+    return lambda: lambda: parse_policy_statements(text)
+
+
+def _dg_parse(corpus: Corpus) -> Callable[[], Thunk]:
+    text = corpus.dg_text
+    return lambda: lambda: parse_dynamic_group_matching_rules(text)
+
+
+def _policy_errors(corpus: Corpus) -> Callable[[], Thunk]:
+    text = corpus.errors_text
+    return lambda: lambda: parse_policy_statements(text, error_mode="report")
+
+
+def _cli_chunked(corpus: Corpus) -> Callable[[], Thunk]:
+    argv = ["--chunked", "--jsonl", str(corpus.policy_path)]
+
+    def run() -> None:
+        with _quiet_stdout():
+            cli.main(argv)
+
+    return lambda: run
+
+
+def _json_emit(corpus: Corpus) -> Callable[[], Thunk]:
+    payload = parse_policy_statements(corpus.policy_text)
+    stmts = payload["statements"]  # type: ignore[index]
+
+    def run() -> None:
+        with _quiet_stdout():
+            cli._emit_jsonl(stmts, False)
+
+    return lambda: run
+
+
+def _define_subs(corpus: Corpus) -> Callable[[], Thunk]:
+    doc, _ = _run_parser(corpus.policy_text, "raise")
+    shaped = _shape_statements(doc, corpus.policy_text, include_spans=False, nested_simplify=False)
+
+    def make() -> Thunk:
+        # _finalize_statements rewrites nested nodes in place; time it on a fresh copy.
+        stmts = copy.deepcopy(shaped)
+        return lambda: _finalize_statements(
+            stmts, sym=build_symbols(stmts, form="flat"), default_tenancy_alias=None, default_identity_domain=None
+        )
+
+    return make
+
+
+SCENARIOS: dict[str, Scenario] = {
+    sc.name: sc
+    for sc in (
+        Scenario("policy-parse", "parse_policy_statements() on the whole corpus", lambda c: c.statements, _policy_parse),
+        Scenario("dg-parse", "parse_dynamic_group_matching_rules() on all rules", lambda c: c.rules, _dg_parse),
+        Scenario(
+            "policy-errors",
+            "parse_policy_statements(error_mode='report'), one syntax error per statement",
+            lambda c: c.statements,
+            _policy_errors,
+        ),
+        Scenario("cli-chunked", "oci-lexer-parse --chunked --jsonl FILE (in-process)", lambda c: c.statements, _cli_chunked),
+        Scenario("json-emit", "JSONL serialization of the parsed statements", lambda c: c.statements, _json_emit),
+        Scenario("define-subs", "DEFINE symbol table + substitution and subject normalization", lambda c: c.statements, _define_subs),
+    )
+}
+
+
+def time_scenario(scenario: Scenario, corpus: Corpus, *, repeats: int, warmup: int) -> list[float]:
+    """Return `repeats` wall-clock samples (seconds) after `warmup` discarded runs."""
+    make = scenario.setup(corpus)
+    clock = time.perf_counter
+    samples: list[float] = []
+    for i in range(warmup + repeats):
+        thunk = make()
+        gc.collect()
+        t0 = clock()
+        thunk()
+        dt = clock() - t0
+        if i >= warmup:
+            samples.append(dt)
+    return samples
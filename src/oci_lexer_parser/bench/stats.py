@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+import statistics
+from collections.abc import Sequence
+from typing import Any
+
+# ============================================================
+# Robust comparison of two timing sample sets
+# ============================================================
+#
+# Timings are compared by their medians (insensitive to the occasional GC pause
+# or scheduler hiccup) and the uncertainty of the head/base ratio is estimated
+# with a percentile bootstrap: both sample sets are resampled with replacement
+# and the ratio of the resampled medians is collected. Everything is seeded so
+# a comparison is reproducible.
+
+
+def median(samples: Sequence[float]) -> float:
+    if not samples:
+        raise ValueError("no samples")
+    return float(statistics.median(samples))
+
+
+def bootstrap_ratio_ci(
+    base: Sequence[float],
+    head: Sequence[float],
+    *,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> tuple[float, float]:
+    """
+    Percentile-bootstrap confidence interval for median(head) / median(base).
+    """
+    if not base or not head:
+        raise ValueError("both sample sets must be non-empty")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError(f"confidence must be in (0, 1); got {confidence}")
+
+    rnd = random.Random(seed)
+    nb, nh = len(base), len(head)
+    ratios: list[float] = []
+    for _ in range(resamples):
+        mb = statistics.median(base[rnd.randrange(nb)] for _ in range(nb))
+        mh = statistics.median(head[rnd.randrange(nh)] for _ in range(nh))
+        ratios.append(mh / mb if mb else float("inf"))
+    ratios.sort()
+
+    alpha = (1.0 - confidence) / 2.0
+    lo = ratios[int(alpha * (resamples - 1))]
+    hi = ratios[int((1.0 - alpha) * (resamples - 1))]
+    return lo, hi
+
+
+def compare_samples(
+    base: Sequence[float],
+    head: Sequence[float],
+    *,
+    threshold: float,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Compare two timing sample sets (seconds; lower is better).
+
+    `threshold` is a relative slowdown (0.05 == 5%). The verdict is
+    "regressed" when the median slowdown exceeds the threshold *and* the
+    confidence interval lies entirely above "no change"; "improved" is the
+    mirror image; anything else is "ok".
+    """
+    mb = median(base)
+    mh = median(head)
+    lo, hi = bootstrap_ratio_ci(base, head, confidence=confidence, resamples=resamples, seed=seed)
+    delta = mh / mb - 1.0 if mb else float("inf")
+
+    if delta > threshold and lo > 1.0:
+        verdict = "regressed"
+    elif delta < -threshold and hi < 1.0:
+        verdict = "improved"
+    else:
+        verdict = "ok"
+
+    return {
+        "base_median_s": mb,
+        "head_median_s": mh,
+        "delta": delta,
+        "ci_low": lo - 1.0,
+        "ci_high": hi - 1.0,
+        "verdict": verdict,
+    }
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from antlr4 import Lexer, ParserRuleContext, Token
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.tree.Tree import ParseTreeListener
+
+# ============================================================
+# Parse budgets (max_statement_bytes / max_condition_depth / max_tokens / deadline)
+# ============================================================
+#
+# Budgets are checked as the token stream pulls each token from the lexer, so
+# a runaway input is stopped after at most one token past the limit, whatever
+# the parser is doing with it. One BudgetMeter spans a whole parse call: token
+# counts and the deadline carry across statements, segments and rules, while
+# statement size and condition depth are tracked per statement. Tokens lexed up
+# front and parsed later (lazy conditions) are replayed to the parser through
+# MeteredTokens.replay(), which keeps checking the deadline while it parses.
+# Work done once tokens are buffered (prediction, shaping) checks the deadline
+# per statement: DeadlineListener when a statement rule is exited, and the
+# shaping loop through MeteredTokens.check_deadline().
+
+# Tokens between two reads of the clock.
+_DEADLINE_STRIDE = 256
+
+
+class ParseBudgetExceeded(ValueError):
+    """
+    A parse stopped by one of its budgets. `budget` is the option name, `limit`
+    its value; `line`/`column` locate the token that crossed it.
+    """
+
+    def __init__(self, budget: str, limit: float, line: int, column: int, offending: str | None) -> None:
+        super().__init__(budget, limit, line, column, offending)
+        self.budget = budget
+        self.limit = limit
+        self.line = line
+        self.column = column
+        self.offending = offending
+
+    def __str__(self) -> str:
+        return f"parse budget exceeded: {self.budget}={self.limit} at line {self.line}, col {self.column}."
+
+
+class BudgetMeter:
+    """
+    Budget state of one parse call. `starters` are the token types that open a
+    statement, `where` the type that opens its condition (None: the whole
+    statement is a condition), `lbrace`/`rbrace` the nesting tokens counted by
+    max_condition_depth.
+    """
+
+    __slots__ = (
+        "max_statement_bytes",
+        "max_condition_depth",
+        "max_tokens",
+        "deadline",
+        "starters",
+        "where",
+        "lbrace",
+        "rbrace",
+        "count",
+        "line_shift",
+    )
+
+    def __init__(
+        self,
+        *,
+        max_statement_bytes: int | None,
+        max_condition_depth: int | None,
+        max_tokens: int | None,
+        deadline: float | None,
+        starters: frozenset[int],
+        where: int | None,
+        lbrace: int,
+        rbrace: int,
+    ) -> None:
+        self.max_statement_bytes = max_statement_bytes
+        self.max_condition_depth = max_condition_depth
+        self.max_tokens = max_tokens
+        self.deadline = deadline
+        self.starters = starters
+        self.where = where
+        self.lbrace = lbrace
+        self.rbrace = rbrace
+        self.count = 0
+        # Maps a line of the parsed text to its delta to a document line (prefilter).
+        self.line_shift: Callable[[int], int] | None = None
+
+    def tokens(self, lexer: Lexer, line_base: int = 0) -> MeteredTokens:
+        """Token source over `lexer` that enforces the budgets; `line_base` is added to reported lines."""
+        return MeteredTokens(lexer, self, line_base)
+
+
+def budget_meter(
+    *,
+    max_statement_bytes: int | None,
+    max_condition_depth: int | None,
+    max_tokens: int | None,
+    deadline: float | None,
+    starters: frozenset[int],
+    where: int | None,
+    lbrace: int,
+    rbrace: int,
+) -> BudgetMeter | None:
+    """A BudgetMeter, or None when no budget is set. Limits must be >= 1."""
+    limits = {
+        "max_statement_bytes": max_statement_bytes,
+        "max_condition_depth": max_condition_depth,
+        "max_tokens": max_tokens,
+    }
+    for name, value in limits.items():
+        if value is not None and value < 1:
+            raise ValueError(f"{name} must be >= 1; got {value}")
+    if deadline is None and all(v is None for v in limits.values()):
+        return None
+    return BudgetMeter(
+        max_statement_bytes=max_statement_bytes,
+        max_condition_depth=max_condition_depth,
+        max_tokens=max_tokens,
+        deadline=deadline,
+        starters=starters,
+        where=where,
+        lbrace=lbrace,
+        rbrace=rbrace,
+    )
+
+
+class MeteredTokens:
+    """Wraps a lexer as a token source; every other attribute is the lexer's."""
+
+    def __init__(self, lexer: Lexer, meter: BudgetMeter, line_base: int) -> None:
+        self._lexer = lexer
+        self._meter = meter
+        self._line_base = line_base
+        self._prev_type = Token.INVALID_TYPE
+        self._stmt_start = 0
+        self._depth = 0
+        self._in_cond = meter.where is None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lexer, name)
+
+    def nextToken(self) -> Token:
+        tok = self._lexer.nextToken()
+        m = self._meter
+        m.count += 1
+        t = tok.type
+        if t in m.starters:
+            # "deny admit" / "deny endorse" open one statement
+            if self._prev_type not in m.starters:
+                self._stmt_start = tok.start
+                self._depth = 0
+                self._in_cond = m.where is None
+        elif t == m.where:
+            self._in_cond = True
+        elif t == m.lbrace:
+            if self._in_cond:
+                self._depth += 1
+                if m.max_condition_depth is not None and self._depth > m.max_condition_depth:
+                    self._exceeded("max_condition_depth", m.max_condition_depth, tok)
+        elif t == m.rbrace and self._depth:
+            self._depth -= 1
+        self._prev_type = t
+
+        if m.max_tokens is not None and m.count > m.max_tokens:
+            self._exceeded("max_tokens", m.max_tokens, tok)
+        if m.max_statement_bytes is not None and t != Token.EOF:
+            # Input is validated as ASCII, so characters are bytes.
+            if tok.stop - self._stmt_start + 1 > m.max_statement_bytes:
+                self._exceeded("max_statement_bytes", m.max_statement_bytes, tok)
+        if m.deadline is not None and m.count % _DEADLINE_STRIDE == 1 and time.monotonic() > m.deadline:
+            self._exceeded("deadline", m.deadline, tok)
+        return tok
+
+    def check_deadline(self, tok: Token) -> None:
+        """Stop at `tok` if the deadline has passed (for work on tokens already pulled)."""
+        deadline = self._meter.deadline
+        if deadline is not None and time.monotonic() > deadline:
+            self._exceeded("deadline", deadline, tok)
+
+    def replay(self, tokens: list[Token]) -> ReplayedTokens:
+        """Token source over `tokens`, already pulled through this source, that checks the deadline again."""
+        return ReplayedTokens(ListTokenSource(tokens), self)
+
+    def _exceeded(self, budget: str, limit: float, tok: Token) -> None:
+        line = tok.line + self._line_base
+        shift = self._meter.line_shift
+        if shift is not None:
+            line += shift(line)
+        raise ParseBudgetExceeded(budget, limit, line, tok.column, tok.text if tok.type != Token.EOF else None)
+
+
+class ReplayedTokens:
+    """
+    Replays tokens a MeteredTokens has counted. The other budgets were checked
+    on those same tokens, so only the deadline is checked again.
+    """
+
+    def __init__(self, source: ListTokenSource, metered: MeteredTokens) -> None:
+        self._source = source
+        self._metered = metered
+        self._count = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._source, name)
+
+    def nextToken(self) -> Token:
+        tok = self._source.nextToken()
+        self._count += 1
+        deadline = self._metered._meter.deadline
+        if deadline is not None and self._count % _DEADLINE_STRIDE == 1 and time.monotonic() > deadline:
+            self._metered._exceeded("deadline", deadline, tok)
+        return tok
+
+
+def deadline_source(source: Any) -> MeteredTokens | None:
+    """The MeteredTokens behind a (possibly replayed) token source if it has a deadline, else None."""
+    if isinstance(source, ReplayedTokens):
+        source = source._metered
+    if isinstance(source, MeteredTokens) and source._meter.deadline is not None:
+        return source
+    return None
+
+
+class DeadlineListener(ParseTreeListener):
+    """Parse listener that checks the deadline of `tokens` as each `rule` context is exited."""
+
+    def __init__(self, tokens: MeteredTokens, rule: int) -> None:
+        self._tokens = tokens
+        self._rule = rule
+
+    def exitEveryRule(self, ctx: ParserRuleContext) -> None:
+        if ctx.getRuleIndex() == self._rule:
+            self._tokens.check_deadline(ctx.start)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from .parser_utils import simplify_group_tree
+
+# ============================================================
+# Canonical statement form & hashing
+# ============================================================
+#
+# Canonicalization removes everything that does not change what a statement
+# means: spans/source text, keyword case, same-mode condition nesting
+# (ANY { a, ANY { b } } == ANY { a, b }), and the order of items inside an
+# ANY/ALL condition group (and of subject values / permission lists, which are
+# sets in OCI). The canonical form is a plain JSON-friendly dict; hashes are
+# taken over its compact, key-sorted JSON serialization.
+
+# Keys that describe where a statement came from, not what it says.
+_LOCATION_KEYS = frozenset(("span", "source_text", "provenance"))
+
+# Keys that are expected to change when a statement is "modified" rather than
+# replaced (see identity_key()).
+_MUTABLE_KEYS = frozenset(("actions", "conditions", "def"))
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.blake2b(_dumps(obj).encode("ascii"), digest_size=16).hexdigest()
+
+
+def _lower_values(node: dict[str, Any]) -> dict[str, Any]:
+    out = dict(node)
+    vals = out.get("values")
+    if isinstance(vals, list):
+        out["values"] = [v.lower() if isinstance(v, str) else v for v in vals]
+    return out
+
+
+def _sorted_values(node: dict[str, Any]) -> dict[str, Any]:
+    out = dict(node)
+    vals = out.get("values")
+    if isinstance(vals, list) and len(vals) > 1:
+        out["values"] = sorted(vals, key=_dumps)
+    return out
+
+
+def _canonical_expr(node: dict[str, Any]) -> dict[str, Any]:
+    if node.get("type") != "group":
+        return {k: v for k, v in node.items() if k not in _LOCATION_KEYS}
+    items = [_canonical_expr(it) for it in node.get("items") or []]
+    items.sort(key=_dumps)
+    return {"type": "group", "mode": str(node.get("mode", "all")).lower(), "items": items}
+
+
+def canonicalize_statement(stmt: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return the canonical form of one statement from parse_policy_statements().
+
+    Spans are dropped, keywords (kind, verbs/permissions, resource types, group
+    modes) are lower-cased, same-mode condition groups are flattened, and
+    ANY/ALL condition items, subject values and permission lists are put in a
+    deterministic order. A lazy WHERE clause (lazy_conditions=True) is
+    materialized in `stmt` first, so it canonicalizes like an eager one.
+    """
+    out: dict[str, Any] = {}
+    for key, val in stmt.items():
+        if key in _LOCATION_KEYS:
+            continue
+        if key == "kind" and isinstance(val, str):
+            out[key] = val.lower()
+        elif key == "subject" and isinstance(val, dict):
+            out[key] = _sorted_values(val)
+        elif key == "actions" and isinstance(val, dict):
+            out[key] = _sorted_values(_lower_values(val))
+        elif key == "resources" and isinstance(val, dict):
+            out[key] = _lower_values(val)
+        elif key == "conditions" and isinstance(val, dict):
+            if val.get("type") == "lazy":
+                # Imported here: parser_policy_statements imports this module.
+                from .parser_policy_statements import statement_conditions
+
+                val = statement_conditions(stmt)
+            out[key] = _canonical_expr(simplify_group_tree(val, collapse_single=False))
+        else:
+            out[key] = val
+    return out
+
+
+def identity_key(canonical: dict[str, Any]) -> str:
+    """
+    Hex digest identifying "the same statement" across snapshots: its canonical
+    form without actions, conditions and DEFINE values. Two statements with the
+    same identity but different hashes are reported as modified.
+    """
+    return _digest({k: v for k, v in canonical.items() if k not in _MUTABLE_KEYS})
+
+
+def statement_fingerprint(stmt: dict[str, Any]) -> str:
+    """
+    Stable fingerprint of a statement from parse_policy_statements().
+
+    Equal for statements that differ only in whitespace, keyword case, spans,
+    same-mode condition nesting or the order of ANY/ALL items.
+    """
+    return _digest(canonicalize_statement(stmt))
+
+
+# ============================================================
+# Deduplication
+# ============================================================
+
+
+class StatementDeduper:
+    """
+    Collapse statements with the same fingerprint, keeping the first occurrence
+    and a "provenance" list describing every place it was seen.
+    """
+
+    def __init__(self) -> None:
+        self._by_fp: dict[str, dict[str, Any]] = {}
+
+    def add(self, stmt: dict[str, Any], provenance: dict[str, Any]) -> None:
+        fp = statement_fingerprint(stmt)
+        kept = self._by_fp.get(fp)
+        if kept is None:
+            kept = {k: v for k, v in stmt.items() if k != "provenance"}
+            kept["provenance"] = []
+            self._by_fp[fp] = kept
+        kept["provenance"].append(provenance)
+
+    def statements(self) -> list[dict[str, Any]]:
+        """Unique statements in first-seen order."""
+        return list(self._by_fp.values())
+
+
+def dedupe_statements(stmts: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Collapse identical statements. Each kept statement gets a "provenance" list
+    of {"statement_index": n} (1-based, plus "span" when the input has spans).
+    """
+    dd = StatementDeduper()
+    for idx, st in enumerate(stmts, start=1):
+        prov: dict[str, Any] = {"statement_index": idx}
+        if "span" in st:
+            prov["span"] = st["span"]
+        dd.add(st, prov)
+    return dd.statements()
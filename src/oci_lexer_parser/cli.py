@@ -4,9 +4,13 @@ import argparse
 import json
 import re
 import sys
-from collections.abc import Iterable, Iterator
-from contextlib import nullcontext
-from typing import Any, Literal, cast
+import tempfile
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
+from itertools import repeat
+from typing import Any, Literal, TypeVar, cast
 
 # Version reporting (stdlib preferred; fall back to backport)
 try:  # Prefer stdlib
@@ -14,9 +18,15 @@ try:  # Prefer stdlib
 except Exception:  # pragma: no cover
     import importlib_metadata  # type: ignore[import-not-found]
 
+from .canonical import StatementDeduper
+from .io_utils import expand_input_paths, open_text_input, open_text_output
+from .oci_exports import collect_policy_symbols, iter_parsed_dynamic_group_export, iter_parsed_policy_export
 from .parser_dynamic_group_matching_rules import parse_dynamic_group_matching_rules
 from .parser_policy_statements import build_symbols, parse_policy_statements
 from .parser_utils import DG_SCHEMA_VERSION, STATEMENT_SCHEMA_VERSION
+from .profiling import Profiler, make_profiler
+from .symbols import SymbolKey, SymbolTable, iter_defines
+from .timing import StatementTimings
 
 try:  # pragma: no cover
     _VERSION = importlib_metadata.version("oci-lexer-parser")
@@ -28,12 +38,30 @@ except importlib_metadata.PackageNotFoundError:  # pragma: no cover
 START_RE = re.compile(r"^\s*(allow|define|admit|endorse|deny)\b", re.IGNORECASE)
 DEFINE_START_RE = re.compile(r"^\s*define\b", re.IGNORECASE)
 
+# Default --batch-bytes for --chunked. scripts/bench_batch_budget.py showed no
+# reliable speed-up from batching on the Python ANTLR runtime (per-call setup is
+# small next to prediction cost) while peak memory grows with the budget, so
+# batching is opt-in. Re-run the harness before changing this.
+DEFAULT_BATCH_BYTES = 0
+# Default --batch-tokens for --chunked. Prediction cost follows token count
+# rather than characters (an OCID or quoted string is one token), but the same
+# harness put budgets of 64-512 tokens within run-to-run noise of budget 0
+# (0.86x-1.10x on 3000 statements), so this is opt-in as well.
+DEFAULT_BATCH_TOKENS = 0
+
+# Cheap stand-in for the policy lexer, used only to size batches: one match per
+# QUOTED/QUOTED_OCID, OCID, PATTERN, WORD or punctuation token.
+_TOKEN_ESTIMATE_RE = re.compile(
+    r"'(?:\\.|[^'\\\r\n])*'|ocid1\.[^\s,}]+|/(?:\\.|[^/'\r\n])*/|[A-Za-z0-9][A-Za-z0-9._-]*|!=|[,/:{}()=]"
+)
+
 
 Statements = list[dict[str, Any]]
 Diagnostics = dict[str, Any]
 Payload = dict[str, Any]
 ParseResult = Payload | tuple[Payload, Diagnostics]
 ErrorMode = Literal["raise", "report", "ignore"]
+_T = TypeVar("_T")
 
 
 # --------------------------
@@ -84,6 +112,41 @@ def chunk_lines(
         yield "".join(buf)
 
 
+def estimate_tokens(text: str) -> int:
+    """Approximate number of policy lexer tokens in `text` (comments included)."""
+    return sum(1 for _ in _TOKEN_ESTIMATE_RE.finditer(text))
+
+
+def batch_chunks(chunks: Iterable[str], max_bytes: int, max_tokens: int = 0) -> Iterator[list[str]]:
+    """
+    Group consecutive statement chunks into batches of at most `max_bytes`
+    characters and at most `max_tokens` estimated tokens (see estimate_tokens);
+    a budget <= 0 does not limit. A single larger chunk forms its own batch.
+    With neither budget set, each chunk is its own batch.
+    """
+    if max_bytes <= 0 and max_tokens <= 0:
+        for chunk in chunks:
+            yield [chunk]
+        return
+    batch: list[str] = []
+    size = 0
+    ntok = 0
+    for chunk in chunks:
+        n = estimate_tokens(chunk) if max_tokens > 0 else 0
+        if batch and (
+            (max_bytes > 0 and size + len(chunk) > max_bytes) or (max_tokens > 0 and ntok + n > max_tokens)
+        ):
+            yield batch
+            batch = []
+            size = 0
+            ntok = 0
+        batch.append(chunk)
+        size += len(chunk)
+        ntok += n
+    if batch:
+        yield batch
+
+
 # --------------------------
 # JSON helpers
 # --------------------------
@@ -113,6 +176,10 @@ def _parse_one_chunk(
     default_tenancy_alias: str | None,
     default_identity_domain: str | None,
     return_filter: Iterable[str] | None = None,
+    timings: StatementTimings | None = None,
+    slow_threshold_ms: float | None = None,
+    define_symbols: dict[SymbolKey, str] | None = None,
+    define_symbols_win: bool = False,
 ) -> tuple[Statements, Diagnostics | None, int]:
     """
     Normalize the parse result across error modes.
@@ -136,6 +203,10 @@ def _parse_one_chunk(
         default_tenancy_alias=default_tenancy_alias,
         default_identity_domain=default_identity_domain,
         return_filter=ret_filter,
+        timings=timings,
+        slow_threshold_ms=slow_threshold_ms,
+        define_symbols=define_symbols,
+        define_symbols_win=define_symbols_win,
     )
 
     if isinstance(res, tuple):
@@ -148,6 +219,112 @@ def _parse_one_chunk(
     return stmts, None, 0
 
 
+def _shift_spans(node: Any, start: int, line: int) -> None:
+    """Move every "span" below `node` back by `start` characters and `line` lines."""
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if k == "span" and isinstance(v, dict):
+                v["start"] -= start
+                v["stop"] -= start
+                v["line"] -= line
+            else:
+                _shift_spans(v, start, line)
+    elif isinstance(node, list):
+        for v in node:
+            _shift_spans(v, start, line)
+
+
+def _parse_batch(
+    batch: list[str],
+    *,
+    define_subs: bool,
+    error_mode: str,
+    include_spans: bool,
+    default_tenancy_alias: str | None,
+    default_identity_domain: str | None,
+    return_filter: Iterable[str] | None = None,
+    timings: StatementTimings | None = None,
+    slow_threshold_ms: float | None = None,
+    define_symbols: dict[SymbolKey, str] | None = None,
+    define_symbols_win: bool = False,
+) -> tuple[Statements, Diagnostics | None, int]:
+    """
+    Parse a batch of statement chunks with a single ANTLR `statements` call.
+
+    The result is the same as parsing each chunk on its own: spans (including
+    those in the slow-statement log) are rebased onto the chunk their statement
+    came from, and a batch with any syntax error is parsed again chunk by chunk
+    so that error recovery and diagnostics stay per statement.
+    """
+    opts: dict[str, Any] = {
+        "define_subs": define_subs,
+        "include_spans": include_spans,
+        "default_tenancy_alias": default_tenancy_alias,
+        "default_identity_domain": default_identity_domain,
+        "return_filter": return_filter,
+        "slow_threshold_ms": slow_threshold_ms,
+        "define_symbols": define_symbols,
+        "define_symbols_win": define_symbols_win,
+    }
+    if len(batch) == 1:
+        return _parse_one_chunk(batch[0], error_mode=error_mode, timings=timings, **opts)
+
+    # Time into a scratch collector so a fallback does not count statements twice.
+    batch_timings: StatementTimings | None = None
+    if timings is not None:
+        batch_timings = StatementTimings(timings.histogram.significant_digits)
+        batch_timings.statements = timings.statements
+
+    # "ignore" would hide errors that require the fallback; detect them via "report".
+    try:
+        stmts, _, err = _parse_one_chunk(
+            "".join(batch),
+            error_mode="raise" if error_mode == "raise" else "report",
+            timings=batch_timings,
+            **opts,
+        )
+    except ValueError:
+        err = 1
+
+    if not err:
+        slow = batch_timings.slow if batch_timings is not None else []
+        if (include_spans and stmts) or slow:
+            starts: list[int] = []
+            lines: list[int] = []
+            pos = line = 0
+            for chunk in batch:
+                starts.append(pos)
+                lines.append(line)
+                pos += len(chunk)
+                line += chunk.count("\n")
+            if include_spans:
+                for st in stmts:
+                    i = bisect_right(starts, st["span"]["start"]) - 1
+                    _shift_spans(st, starts[i], lines[i])
+            for item in slow:
+                i = bisect_right(starts, item.span["start"]) - 1
+                _shift_spans({"span": item.span}, starts[i], lines[i])
+        if timings is not None and batch_timings is not None:
+            timings.histogram.merge(batch_timings.histogram)
+            timings.slow.extend(slow)
+            timings.statements = batch_timings.statements
+        diags = None if error_mode != "report" else {"errors": [], "error_count": 0}
+        return stmts, diags, 0
+
+    all_stmts: Statements = []
+    errors: list[dict[str, Any]] = []
+    total = 0
+    for chunk in batch:
+        stmts, diags, err = _parse_one_chunk(chunk, error_mode=error_mode, timings=timings, **opts)
+        all_stmts.extend(stmts)
+        total += err
+        if diags:
+            errors.extend(diags.get("errors") or [])
+    if error_mode != "report":
+        return all_stmts, None, total
+    return all_stmts, {"errors": errors, "error_count": total}, total
+
+
 def _parse_and_emit_chunks(
     chunks: Iterable[str],
     *,
@@ -159,6 +336,13 @@ def _parse_and_emit_chunks(
     default_tenancy_alias: str | None,
     default_identity_domain: str | None,
     symbols_only: bool,
+    dedupe: bool = False,
+    timings: StatementTimings | None = None,
+    slow_threshold_ms: float | None = None,
+    batch_bytes: int = 0,
+    define_symbols: dict[SymbolKey, str] | None = None,
+    batch_tokens: int = 0,
+    define_symbols_win: bool = False,
 ) -> tuple[Statements, Statements, int, list[dict[str, Any]] | None]:
     """
     Parse a sequence of chunks, optionally emit JSONL as we go,
@@ -168,6 +352,17 @@ def _parse_and_emit_chunks(
       - symbols_only=True  => skip non-DEFINE chunks, parser returns only DEFINEs,
                               accumulate only DEFINEs, and print symbol table later.
       - symbols_only=False => parse everything; optionally emit JSONL.
+      - dedupe=True        => collapse identical statements across chunks; JSONL is
+                              emitted once at the end (unique statements + provenance).
+      - batch_bytes > 0    => consecutive chunks are parsed together in batches of up
+                              to that many characters (see _parse_batch); output is
+                              unchanged.
+      - batch_tokens > 0   => likewise, capped at that many estimated tokens
+                              (see estimate_tokens); combines with batch_bytes.
+      - define_symbols     => the whole input's DEFINE table (see scan_define_symbols);
+                              with define_subs, every chunk resolves aliases against it.
+      - define_symbols_win => that table also overrides a chunk's own DEFINEs (names the
+                              input binds more than once resolve to their last binding).
 
     Returns (all_statements, define_statements, total_error_count).
     """
@@ -178,20 +373,30 @@ def _parse_and_emit_chunks(
 
     # When symbols_only, tell parser to only return DEFINEs and skip non-DEFINE chunks upfront
     ret_filter = {"define"} if symbols_only else None
+    deduper = StatementDeduper() if dedupe and not symbols_only else None
+    stmt_index = 0
 
-    for chunk in chunks:
-        if symbols_only and not DEFINE_START_RE.match(chunk):
-            # Skip parsing non-DEFINE chunks entirely for speed.
-            continue
-
-        stmts, diags, err = _parse_one_chunk(
-            chunk,
+    if symbols_only:
+        # Skip parsing non-DEFINE chunks entirely for speed.
+        chunks = (c for c in chunks if DEFINE_START_RE.match(c))
+
+    # Without a whole-input table, DEFINE substitution only sees DEFINEs parsed in
+    # the same call; batching would make the result depend on batch boundaries.
+    if define_subs and define_symbols is None:
+        batch_bytes = batch_tokens = 0
+    for batch in batch_chunks(chunks, batch_bytes, batch_tokens):
+        stmts, diags, err = _parse_batch(
+            batch,
             define_subs=define_subs,
             error_mode=error_mode,
             include_spans=include_spans,
             default_tenancy_alias=default_tenancy_alias,
             default_identity_domain=default_identity_domain,
             return_filter=ret_filter,
+            timings=timings,
+            slow_threshold_ms=slow_threshold_ms,
+            define_symbols=define_symbols,
+            define_symbols_win=define_symbols_win,
         )
         total_errors += err
         if error_items is not None and diags:
@@ -199,7 +404,14 @@ def _parse_and_emit_chunks(
             if isinstance(errors, list):
                 error_items.extend(errors)
 
-        if jsonl and not symbols_only:
+        if deduper is not None:
+            for st in stmts:
+                stmt_index += 1
+                prov: dict[str, Any] = {"statement_index": stmt_index}
+                if "span" in st:
+                    prov["span"] = st["span"]
+                deduper.add(st, prov)
+        elif jsonl and not symbols_only:
             _emit_jsonl(stmts, pretty)
 
         if symbols_only:
@@ -209,12 +421,59 @@ def _parse_and_emit_chunks(
             define_stmts.extend(s for s in stmts if s.get("kind") == "define")
 
         # In non-symbols mode, you may also want the full array if not jsonl:
-        if not symbols_only and not jsonl:
+        if not symbols_only and not jsonl and deduper is None:
             all_stmts.extend(stmts)
 
+    if deduper is not None:
+        all_stmts = deduper.statements()
+        if jsonl:
+            _emit_jsonl(all_stmts, pretty)
+            all_stmts = []
+
     return all_stmts, define_stmts, total_errors, error_items
 
 
+# Characters of DEFINE chunks parsed per call while scanning for DEFINEs.
+_DEFINE_SCAN_BATCH_BYTES = 1 << 16
+
+
+def scan_define_symbols(chunks: Iterable[str]) -> tuple[dict[SymbolKey, str], set[SymbolKey]]:
+    """
+    First pass of --chunked --define-subs: the DEFINE table of a whole input.
+
+    Only DEFINE chunks are parsed, each with the same result as parsing it on its
+    own. As with build_symbols() on the whole document, the last definition of a
+    name wins. Also returns the names bound to two different OCIDs: a chunk that
+    carries an earlier binding of one would see that binding first, so the parse
+    pass must let the table win (define_symbols_win) to match a whole-file parse.
+    """
+    sym: dict[SymbolKey, str] = {}
+    rebound: set[SymbolKey] = set()
+    defines = (c for c in chunks if DEFINE_START_RE.match(c))
+    for batch in batch_chunks(defines, _DEFINE_SCAN_BATCH_BYTES):
+        stmts, _, _ = _parse_batch(
+            batch,
+            define_subs=False,
+            error_mode="ignore",
+            include_spans=False,
+            default_tenancy_alias=None,
+            default_identity_domain=None,
+            return_filter={"define"},
+        )
+        for t, name, ocid in iter_defines(stmts):
+            prev = sym.get((t, name))
+            if prev is not None and prev != ocid:
+                rebound.add((t, name))
+            sym[(t, name)] = ocid
+    return sym, rebound
+
+
+def _teed_lines(lines: Iterable[str], sink: Any) -> Iterator[str]:
+    for ln in lines:
+        sink.write(ln)
+        yield ln
+
+
 # --------------------------
 # IO helpers
 # --------------------------
@@ -222,24 +481,27 @@ def _read_source_from_file_or_stdin(path: str | None) -> str:
     """
     Read entire input into memory (stdin if path is None or '-').
     Use 'utf-8-sig' to be robust against BOM at start of file.
+    gzip/bz2/xz/zstd input is decompressed transparently.
     """
-    if path and path != "-":
-        with open(path, encoding="utf-8-sig", newline="") as fh:
-            return fh.read()
-    return sys.stdin.read()
+    ctx, _ = open_text_input(path)
+    with ctx as fh:
+        return fh.read()
 
 
 # --------------------------
 # Small utility helpers (for simpler main)
 # --------------------------
 def _open_input_ctx(file_arg: str | None):
-    """Return (context-manager, strip_bom_first_line_flag)."""
-    use_file = bool(file_arg and file_arg != "-")
-    if use_file:
-        # BOM handled by codec; we do NOT strip in chunk_lines
-        return open(file_arg, encoding="utf-8-sig", newline=""), False
-    # stdin is already a text stream; allow chunk_lines to strip BOM only once
-    return nullcontext(sys.stdin), True
+    """
+    Return (context-manager, strip_bom_first_line_flag).
+
+    Compressed input is decoded as a stream, so chunk_lines() never sees the
+    whole decompressed file at once.
+    """
+    # Files and decompressed streams use the utf-8-sig codec (we do NOT strip in
+    # chunk_lines); plain stdin is already a text stream, so chunk_lines strips
+    # the BOM only once.
+    return open_text_input(file_arg)
 
 
 def _write_diagnostics_file(path: str | None, payload: dict) -> None:
@@ -259,6 +521,16 @@ def _exit_code_for_errors(mode: ErrorMode, error_count: int) -> int:
     return 1 if (mode == "report" and error_count) else 0
 
 
+def _write_latency_summary(timings: StatementTimings | None) -> None:
+    if timings is None:
+        return
+    lat = timings.histogram.summary()
+    sys.stderr.write(
+        f"{lat['count']} statement(s): p50 {lat['p50_ms']:.2f} ms, p90 {lat['p90_ms']:.2f} ms, "
+        f"p99 {lat['p99_ms']:.2f} ms, max {lat['max_ms']:.2f} ms; {len(timings.slow)} slow\n"
+    )
+
+
 def _emit_symbols_from_defines(stmts: list[dict], pretty: bool) -> int:
     # Read DEFINE as {"symbol": {...}, "def": {"type":"ocid","value":"..."}}
     print(_json_dumps(build_symbols(stmts, form="nested"), pretty))
@@ -299,14 +571,221 @@ def _emit_rules_jsonl_or_array(
         print(_json_dumps(payload, pretty))
 
 
+# --------------------------
+# Multi-file input
+# --------------------------
+def _read_defines_task(path: str) -> Statements:
+    """DEFINE statements of one file; only its DEFINE chunks are parsed."""
+    ctx, strip_first = open_text_input(path)
+    with ctx as fh:
+        text = "".join(c for c in chunk_lines(fh, strip_bom_first_line=strip_first) if DEFINE_START_RE.match(c))
+    if not text:
+        return []
+    res = parse_policy_statements(text, return_filter={"define"}, error_mode="ignore")
+    return cast(Payload, res)["statements"]
+
+
+def _warn_symbol_conflicts(table: SymbolTable) -> None:
+    for c in table.conflicts():
+        where = ", ".join(f"{ocid} ({policy})" for policy, _comp, ocid in c.definitions)
+        sys.stderr.write(f"DEFINE conflict: {c.type} '{c.name}' is {where}; left unresolved elsewhere\n")
+
+
+def _parse_file_task(path: str, opts: dict[str, Any]) -> tuple[Statements, list[dict[str, Any]]]:
+    """Parse one input file; its statements and diagnostics get "source_file": path."""
+    text = _read_source_from_file_or_stdin(path)
+    try:
+        res = parse_policy_statements(text, **opts)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+    if isinstance(res, tuple):
+        payload, diags = res
+        errors = diags.get("errors") or []
+    else:
+        payload, errors = res, []
+    stmts = [{**st, "source_file": path} for st in payload.get("statements", [])]
+    return stmts, [{**e, "source_file": path} for e in errors]
+
+
+def _parse_file_timed_task(
+    path: str, opts: dict[str, Any]
+) -> tuple[tuple[Statements, list[dict[str, Any]]], StatementTimings]:
+    """_parse_file_task() with its own StatementTimings, returned for the caller to merge (workers are processes)."""
+    timings = StatementTimings(opts["timings"].histogram.significant_digits)
+    return _parse_file_task(path, {**opts, "timings": timings}), timings
+
+
+def _merged_timings(
+    results: Iterable[tuple[_T, StatementTimings]], timings: StatementTimings
+) -> Iterator[_T]:
+    for res, got in results:
+        timings.merge(got)
+        yield res
+
+
+def _map_files(fn: Callable[..., _T], paths: list[str], workers: int, *args: Iterable[Any]) -> Iterator[_T]:
+    """fn(path, *args) for every path, in input order, in up to `workers` processes."""
+    if workers <= 1 or len(paths) <= 1:
+        yield from map(fn, paths, *args)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as ex:
+        yield from ex.map(fn, paths, *args)
+
+
+def _run_files(
+    args: argparse.Namespace,
+    paths: list[str],
+    prof: Profiler,
+    timings: StatementTimings | None,
+) -> int:
+    """
+    Policy path for several input files (or directories / globs).
+
+    Files are parsed whole and independently, in parallel with --workers > 1;
+    output keeps the file order. With --shared-defines a first pass collects
+    the DEFINEs of all files into a SymbolTable scoped by file; names defined
+    differently in several files only resolve inside those files.
+    """
+    for flag, name in ((args.dynamic_group, "--dynamic-group"), (args.chunked, "--chunked"), (args.dedupe, "--dedupe")):
+        if flag:
+            sys.stderr.write(f"{name} takes a single input file.\n")
+            return 2
+    error_mode: ErrorMode = cast(ErrorMode, args.error_mode)
+    symbols_only = bool(args.symbols)
+
+    table: SymbolTable | None = None
+    if args.shared_defines:
+        table = SymbolTable()
+        for path, defines in zip(paths, _map_files(_read_defines_task, paths, args.workers)):
+            table.add_statements(defines, policy=path)
+        _warn_symbol_conflicts(table)
+
+    opts: dict[str, Any] = {
+        "define_subs": args.define_subs,
+        "return_filter": {"define"} if symbols_only else None,
+        "error_mode": error_mode,
+        "include_spans": args.include_spans,
+        "default_tenancy_alias": args.default_tenancy_alias,
+        "default_identity_domain": args.default_identity_domain,
+        "timings": timings,
+        "slow_threshold_ms": args.slow_threshold_ms,
+        "isolate_errors": args.isolate_errors,
+    }
+    per_file = ({**opts, "define_symbols": table.view(policy=p) if table else None} for p in paths)
+    if timings is not None and args.workers > 1:
+        results = _merged_timings(_map_files(_parse_file_timed_task, paths, args.workers, per_file), timings)
+    else:
+        results = _map_files(_parse_file_task, paths, args.workers, per_file)
+    return _emit_record_results(args, results, prof, rules=False)
+
+
+def _run_export(args: argparse.Namespace, prof: Profiler, timings: StatementTimings | None) -> int:
+    """Policy / dynamic-group path for --oci-export (`oci iam policy list` / `dynamic-group list` JSON)."""
+    for flag, name in ((args.chunked, "--chunked"), (args.dedupe, "--dedupe")):
+        if flag:
+            sys.stderr.write(f"{name} is not supported with --oci-export.\n")
+            return 2
+    error_mode: ErrorMode = cast(ErrorMode, args.error_mode)
+    opts: dict[str, Any] = {
+        "include_spans": args.include_spans,
+        "timings": timings,
+        "slow_threshold_ms": args.slow_threshold_ms,
+    }
+    source = args.file or "-"
+    if args.dynamic_group:
+        if args.symbols:
+            sys.stderr.write("--symbols is not supported with --dynamic-group.\n")
+            return 2
+        results = iter_parsed_dynamic_group_export(source, workers=args.workers, error_mode=error_mode, **opts)
+        return _emit_record_results(args, results, prof, rules=True)
+
+    table: SymbolTable | None = None
+    if args.shared_defines:
+        if source == "-":
+            sys.stderr.write("--shared-defines with --oci-export needs a file (the export is read twice).\n")
+            return 2
+        table = collect_policy_symbols(source)
+        _warn_symbol_conflicts(table)
+    opts.update(
+        define_subs=args.define_subs,
+        define_symbols=table,
+        return_filter={"define"} if args.symbols else None,
+        default_tenancy_alias=args.default_tenancy_alias,
+        default_identity_domain=args.default_identity_domain,
+        isolate_errors=args.isolate_errors,
+    )
+    results = iter_parsed_policy_export(source, workers=args.workers, error_mode=error_mode, **opts)
+    return _emit_record_results(args, results, prof, rules=False)
+
+
+def _emit_record_results(
+    args: argparse.Namespace,
+    results: Iterable[tuple[Statements, list[dict[str, Any]]]],
+    prof: Profiler,
+    *,
+    rules: bool,
+) -> int:
+    """
+    Write per-file / per-record (items, diagnostics) results: JSONL as they
+    arrive, otherwise one payload with all diagnostics at the end.
+    """
+    error_mode: ErrorMode = cast(ErrorMode, args.error_mode)
+    symbols_only = bool(args.symbols)
+    all_items: Statements = []
+    all_errors: list[dict[str, Any]] = []
+    for items, errors in results:
+        all_errors.extend(errors)
+        if args.jsonl and not symbols_only:
+            _emit_jsonl(items, args.pretty)
+        else:
+            all_items.extend(items)
+    prof.after_parse()
+
+    if symbols_only:
+        return _emit_symbols_from_defines(all_items, args.pretty)
+
+    diags = {"errors": all_errors, "error_count": len(all_errors)} if error_mode == "report" else None
+    if not args.jsonl:
+        if rules:
+            _emit_rules_jsonl_or_array(
+                rules=all_items, diags=diags, jsonl=False, pretty=args.pretty, schema_version=DG_SCHEMA_VERSION
+            )
+        else:
+            _emit_statements_jsonl_or_array(
+                stmts=all_items, diags=diags, jsonl=False, pretty=args.pretty, schema_version=STATEMENT_SCHEMA_VERSION
+            )
+    if diags is not None:
+        _write_diagnostics_file(args.diagnostics_file, diags)
+        if all_errors:
+            sys.stderr.write(f"{len(all_errors)} syntax error(s) detected\n")
+    return _exit_code_for_errors(error_mode, len(all_errors))
+
+
 # --------------------------
 # CLI
 # --------------------------
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser("oci-lexer-parse", description="Parse OCI IAM policy statements to JSON.")
-    ap.add_argument("file", nargs="?", help="Policy file; if omitted or '-', reads from stdin.")
+    ap.add_argument(
+        "files",
+        nargs="*",
+        metavar="PATH",
+        help=(
+            "Policy file(s), directories or glob patterns; if omitted or '-', reads from stdin. "
+            "With several files, each statement and diagnostic carries its 'source_file'."
+        ),
+    )
 
     ap.add_argument("--define-subs", action="store_true", help="Resolve DEFINE aliases where possible.")
+    ap.add_argument(
+        "--shared-defines",
+        action="store_true",
+        help=(
+            "With --define-subs and several input files (or --oci-export), resolve aliases against the "
+            "DEFINEs of all files/policies; a file's own DEFINEs take precedence and names defined "
+            "differently elsewhere are reported on stderr and left unresolved."
+        ),
+    )
     ap.add_argument(
         "--default-tenancy-alias",
         metavar="NAME",
@@ -348,6 +827,15 @@ def main() -> int:
         action="store_true",
         help="Explicitly parse policy statements (default mode).",
     )
+    ap.add_argument(
+        "--oci-export",
+        action="store_true",
+        help=(
+            "Input is `oci iam policy list` JSON (or, with --dynamic-group, `oci iam dynamic-group list`), "
+            "also SDK to_dict() arrays; read as a stream. Statements/rules and diagnostics carry "
+            "'policy' / 'dynamic_group' provenance (id, name, compartment_id)."
+        ),
+    )
     ap.add_argument("--pretty", action="store_true", help="Pretty-print JSON output.")
     ap.add_argument("--jsonl", action="store_true", help="Emit one JSON object per line (statement or rule).")
     ap.add_argument(
@@ -355,11 +843,87 @@ def main() -> int:
         action="store_true",
         help=(
             "Chunk input by statement starters to handle huge files. "
-            "With --error-mode raise, stops at the first failing chunk."
+            "With --error-mode raise, stops at the first failing chunk. "
+            "With --define-subs, the input is read twice (stdin via a temporary file): "
+            "first for its DEFINEs, then to parse, so aliases resolve as without --chunked."
+        ),
+    )
+    ap.add_argument(
+        "--batch-bytes",
+        type=int,
+        default=DEFAULT_BATCH_BYTES,
+        metavar="N",
+        help=(
+            "With --chunked, parse consecutive statements together in batches of up to N "
+            f"characters (default: {DEFAULT_BATCH_BYTES}; 0 = one statement chunk per parse). "
+            "Output is the same for any N."
+        ),
+    )
+    ap.add_argument(
+        "--batch-tokens",
+        type=int,
+        default=DEFAULT_BATCH_TOKENS,
+        metavar="N",
+        help=(
+            "With --chunked, cap each batch at about N lexer tokens "
+            f"(default: {DEFAULT_BATCH_TOKENS}; 0 = no token cap). Combines with --batch-bytes; "
+            "output is the same for any N."
+        ),
+    )
+    ap.add_argument(
+        "--isolate-errors",
+        action="store_true",
+        help=(
+            "Parse each statement on its own (without --chunked's streaming); statements with "
+            "syntax errors become {\"kind\": \"unknown\"} with their own diagnostics."
+        ),
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Parse in N worker processes (default: 1): the input files when there are several, "
+            "the policies/dynamic groups of --oci-export, otherwise the statements of --isolate-errors."
+        ),
+    )
+    ap.add_argument(
+        "--symbols",
+        action="store_true",
+        help=(
+            "Print symbol table (from DEFINE) and exit. Other statements are skipped without a syntax "
+            "check, except with --error-mode raise on non-chunked input."
+        ),
+    )
+    ap.add_argument(
+        "--dedupe",
+        action="store_true",
+        help=(
+            "Collapse statements that are identical up to whitespace, keyword case and "
+            "condition nesting/order; each kept statement lists where it was seen in 'provenance'."
         ),
     )
-    ap.add_argument("--symbols", action="store_true", help="Print symbol table (from DEFINE) and exit.")
     ap.add_argument("--diagnostics-file", help="If set, write diagnostics JSON to this path.")
+    ap.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help=(
+            "Write JSON/JSONL output to FILE instead of stdout; a .gz, .bz2, .xz or .zst suffix "
+            "compresses it. (Compressed input is detected automatically.)"
+        ),
+    )
+    ap.add_argument(
+        "--slow-threshold-ms",
+        type=float,
+        metavar="MS",
+        help=(
+            "Time every statement/rule; log those taking at least MS milliseconds "
+            "(index, line/col, parse and shaping time) and print latency percentiles to stderr. "
+            "With --chunked, line/col are relative to the statement's chunk."
+        ),
+    )
     ap.add_argument(
         "-V",
         "--version",
@@ -367,8 +931,78 @@ def main() -> int:
         version=f"oci-lexer-parse {_VERSION}",
         help="Show version and exit.",
     )
-    args = ap.parse_args()
+    ap.add_argument(
+        "--profile",
+        choices=["cpu", "mem"],
+        help=(
+            "Profile this run: 'cpu' writes a cProfile/pstats dump and prints time grouped by "
+            "lexer/parser/shaping/json; 'mem' writes a tracemalloc diff taken around parsing."
+        ),
+    )
+    ap.add_argument(
+        "--profile-out",
+        help="Profile output path (default: oci-lexer-parse.prof for cpu, oci-lexer-parse.memdiff.txt for mem).",
+    )
+    args = ap.parse_args(argv)
 
+    if args.slow_threshold_ms is not None and args.slow_threshold_ms < 0:
+        sys.stderr.write("--slow-threshold-ms must be non-negative.\n")
+        return 2
+
+    try:
+        inputs = expand_input_paths(args.files)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+    multi_file = len(args.files) > 1 or inputs != args.files
+    args.file = None if multi_file or not inputs else inputs[0]
+    if multi_file and "-" in inputs:
+        sys.stderr.write("'-' (stdin) cannot be combined with other inputs.\n")
+        return 2
+    if multi_file and args.oci_export:
+        sys.stderr.write("--oci-export takes a single input file.\n")
+        return 2
+
+    if args.workers < 1:
+        sys.stderr.write("--workers must be at least 1.\n")
+        return 2
+    if args.workers > 1 and not (args.isolate_errors or multi_file or args.oci_export):
+        sys.stderr.write("--workers requires --isolate-errors, --oci-export or several input files.\n")
+        return 2
+    if args.workers > 1 and args.slow_threshold_ms is not None and not (multi_file or args.oci_export):
+        sys.stderr.write("--workers with --isolate-errors is not supported with --slow-threshold-ms.\n")
+        return 2
+
+    if args.profile_out and not args.profile:
+        sys.stderr.write("--profile-out requires --profile.\n")
+        return 2
+
+    if args.shared_defines and not args.define_subs:
+        sys.stderr.write("--shared-defines requires --define-subs.\n")
+        return 2
+
+    try:
+        out_ctx = open_text_output(args.output) if args.output else nullcontext(sys.stdout)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"Cannot open output file: {e}\n")
+        return 2
+
+    prof = make_profiler(args.profile, args.profile_out)
+    prof.start()
+    timings = StatementTimings() if args.slow_threshold_ms is not None else None
+    try:
+        with out_ctx as out, redirect_stdout(out):
+            if multi_file:
+                return _run_files(args, inputs, prof, timings)
+            if args.oci_export:
+                return _run_export(args, prof, timings)
+            return _run(args, prof, timings)
+    finally:
+        prof.stop()
+        _write_latency_summary(timings)
+
+
+def _run(args: argparse.Namespace, prof: Profiler, timings: StatementTimings | None) -> int:
     symbols_only = bool(args.symbols)
     error_mode: ErrorMode = cast(ErrorMode, args.error_mode)
     default_identity_domain = args.default_identity_domain
@@ -387,13 +1021,22 @@ def main() -> int:
         if symbols_only:
             sys.stderr.write("--symbols is not supported with --dynamic-group.\n")
             return 2
+        if args.dedupe:
+            sys.stderr.write("--dedupe is not supported with --dynamic-group.\n")
+            return 2
+        if args.isolate_errors:
+            sys.stderr.write("--isolate-errors is not supported with --dynamic-group.\n")
+            return 2
 
         source = _read_source_from_file_or_stdin(args.file)
         res = parse_dynamic_group_matching_rules(
             source,
             error_mode=error_mode,
             include_spans=args.include_spans,
+            timings=timings,
+            slow_threshold_ms=args.slow_threshold_ms,
         )
+        prof.after_parse()
 
         if isinstance(res, tuple):
             payload, diags = res
@@ -424,7 +1067,28 @@ def main() -> int:
 
     # === CHUNKED PATH (POLICY) ===
     if args.chunked:
+        if args.isolate_errors:
+            sys.stderr.write("--chunked already isolates statements; drop --isolate-errors.\n")
+            return 2
         ctx, strip_first = _open_input_ctx(args.file)
+        define_symbols: dict[SymbolKey, str] | None = None
+        rebound: set[SymbolKey] = set()
+        if args.define_subs and not symbols_only:
+            # Pass one collects the whole input's DEFINEs so that every chunk
+            # resolves aliases defined anywhere in it. stdin cannot be read
+            # twice, so it is copied to a temporary file on the way.
+            spool = None
+            with ctx as fh:
+                lines: Iterable[str] = fh
+                if not args.file or args.file == "-":
+                    spool = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+                    lines = _teed_lines(fh, spool)
+                define_symbols, rebound = scan_define_symbols(chunk_lines(lines, strip_bom_first_line=strip_first))
+            if spool is not None:
+                spool.seek(0)
+                ctx = spool
+            else:
+                ctx, strip_first = _open_input_ctx(args.file)
         with ctx as fh:
             chunks = chunk_lines(fh, strip_bom_first_line=strip_first)
             all_stmts, define_stmts, total_errors, error_items = _parse_and_emit_chunks(
@@ -437,7 +1101,16 @@ def main() -> int:
                 default_tenancy_alias=default_tenancy_alias,
                 default_identity_domain=default_identity_domain,
                 symbols_only=symbols_only,
+                dedupe=args.dedupe,
+                timings=timings,
+                slow_threshold_ms=args.slow_threshold_ms,
+                batch_bytes=args.batch_bytes,
+                batch_tokens=args.batch_tokens,
+                define_symbols=define_symbols,
+                define_symbols_win=bool(rebound),
             )
+        # With --jsonl, statements are written while parsing; this marks the end of both.
+        prof.after_parse()
 
         if symbols_only:
             return _emit_symbols_from_defines(define_stmts, args.pretty)
@@ -471,7 +1144,16 @@ def main() -> int:
         default_tenancy_alias=default_tenancy_alias,
         default_identity_domain=default_identity_domain,
         return_filter=ret_filter,
+        dedupe=args.dedupe and not symbols_only,
+        timings=timings,
+        slow_threshold_ms=args.slow_threshold_ms,
+        isolate_errors=args.isolate_errors,
+        workers=args.workers,
+        # Like --chunked --symbols, only DEFINE statements are parsed, unless
+        # "raise" asks for every statement to be syntax-checked.
+        prefilter=symbols_only and error_mode != "raise",
     )
+    prof.after_parse()
 
     if isinstance(res, tuple):
         payload, diags = res
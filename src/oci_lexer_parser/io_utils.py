@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import bz2
+import glob
+import gzip
+import io
+import lzma
+import os
+import sys
+from contextlib import nullcontext
+from typing import IO, Any, BinaryIO, ContextManager, Literal, TextIO
+
+# ============================================================
+# Compressed input/output (CLI)
+# ============================================================
+#
+# Input compression is detected from the stream's magic bytes, never from the
+# file name, and decoded as a stream: the CLI's --chunked path iterates lines
+# of the returned text stream, so a compressed export is never held in memory
+# decompressed. gzip, bz2 and xz use the standard library; zstd uses
+# compression.zstd (Python 3.14+) or the optional `zstandard` package.
+# Output compression is chosen from the output path's suffix.
+
+Compression = Literal["gzip", "bz2", "xz", "zstd"]
+
+_MAGIC: tuple[tuple[bytes, Compression], ...] = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+_MAGIC_LEN = max(len(m) for m, _ in _MAGIC)
+
+_SUFFIXES: dict[str, Compression] = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+
+def sniff_compression(head: bytes) -> Compression | None:
+    """Compression format of a stream starting with `head`, or None for plain data."""
+    for magic, kind in _MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def compression_for_path(path: str) -> Compression | None:
+    """Compression implied by an output path's suffix (.gz, .bz2, .xz, .zst), or None."""
+    return _SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def _zstd_module() -> Any:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]  # Python 3.14+
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+
+        return zstandard
+    except ImportError:
+        raise ValueError("zstd streams require Python 3.14+ or the 'zstandard' package") from None
+
+
+def _decompressing_reader(raw: BinaryIO, kind: Compression) -> BinaryIO:
+    """Wrap `raw` in a streaming decompressor; closing the result leaves `raw` open."""
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")  # type: ignore[return-value]
+    if kind == "bz2":
+        return bz2.BZ2File(raw, mode="rb")  # type: ignore[return-value]
+    if kind == "xz":
+        return lzma.LZMAFile(raw, mode="rb")  # type: ignore[return-value]
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(raw, mode="rb")
+    return zstd.ZstdDecompressor().stream_reader(raw, closefd=False)
+
+
+def _compressing_writer(raw: BinaryIO, kind: Compression) -> BinaryIO:
+    """Wrap `raw` in a streaming compressor; closing the result leaves `raw` open."""
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="wb", mtime=0)  # type: ignore[return-value]
+    if kind == "bz2":
+        return bz2.BZ2File(raw, mode="wb")  # type: ignore[return-value]
+    if kind == "xz":
+        return lzma.LZMAFile(raw, mode="wb")  # type: ignore[return-value]
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(raw, mode="wb")
+    return zstd.ZstdCompressor().stream_writer(raw, closefd=False)
+
+
+class _ClosingTextWrapper(io.TextIOWrapper):
+    """TextIOWrapper that also closes the underlying raw file after the codec layers."""
+
+    def __init__(self, buffer: IO[bytes], raw: IO[bytes] | None, **kwargs: Any) -> None:
+        super().__init__(buffer, **kwargs)  # type: ignore[arg-type]
+        self._raw_file = raw
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            if self._raw_file is not None:
+                self._raw_file.close()
+
+
+def open_text_input(path: str | None) -> tuple[ContextManager[TextIO], bool]:
+    """
+    Open a policy/rule file, or stdin if path is None or '-', for streaming reads.
+
+    Compressed data (see sniff_compression) is decoded transparently. Returns
+    (context-manager, strip_bom_first_line): plain stdin is used as the text
+    stream it already is, so chunk_lines() must drop a leading BOM itself;
+    every other stream is decoded as utf-8-sig.
+    """
+    if path and path != "-":
+        raw = open(path, "rb")
+        try:
+            kind = sniff_compression(raw.peek(_MAGIC_LEN)[:_MAGIC_LEN])
+            if kind is None:
+                raw.close()
+                return open(path, encoding="utf-8-sig", newline=""), False
+            reader = _decompressing_reader(raw, kind)
+        except BaseException:
+            raw.close()
+            raise
+        return _ClosingTextWrapper(reader, raw, encoding="utf-8-sig", newline=""), False
+
+    stdin_buffer = getattr(sys.stdin, "buffer", None)
+    if stdin_buffer is None or not hasattr(stdin_buffer, "peek"):
+        # Replaced stdin (e.g. io.StringIO): plain text only.
+        return nullcontext(sys.stdin), True
+    kind = sniff_compression(stdin_buffer.peek(_MAGIC_LEN)[:_MAGIC_LEN])
+    if kind is None:
+        return nullcontext(sys.stdin), True
+    reader = _decompressing_reader(stdin_buffer, kind)
+    return _ClosingTextWrapper(reader, None, encoding="utf-8-sig", newline=""), False
+
+
+def open_text_output(path: str) -> TextIO:
+    """Open `path` for writing UTF-8 text, compressed according to its suffix."""
+    kind = compression_for_path(path)
+    if kind is None:
+        return open(path, "w", encoding="utf-8", newline="")
+    raw = open(path, "wb")
+    try:
+        writer = _compressing_writer(raw, kind)
+    except BaseException:
+        raw.close()
+        raise
+    return _ClosingTextWrapper(writer, raw, encoding="utf-8", newline="")
+
+
+# ============================================================
+# Input path expansion (CLI: several files, directories, globs)
+# ============================================================
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def _walk_files(directory: str) -> list[str]:
+    found: list[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        found.extend(os.path.join(root, f) for f in files if not f.startswith("."))
+    return sorted(found)
+
+
+def expand_input_paths(paths: list[str]) -> list[str]:
+    """
+    Expand CLI input arguments into a de-duplicated, deterministic file list.
+
+    Directories contribute every non-hidden file below them and glob patterns
+    (`*`, `?`, `[...]`, `**` recursive) every file they match, both in sorted
+    order; other arguments (plain paths and '-') are kept as given. Raises
+    ValueError when a directory or pattern matches no files.
+    """
+    out: list[str] = []
+    seen: set[str] = set()
+    for arg in paths:
+        if arg != "-" and os.path.isdir(arg):
+            matches = _walk_files(arg)
+        elif arg != "-" and not os.path.exists(arg) and _GLOB_CHARS & set(arg):
+            matches = sorted(p for p in glob.glob(arg, recursive=True) if os.path.isfile(p))
+        else:
+            matches = [arg]
+        if not matches:
+            raise ValueError(f"no input files found for {arg!r}")
+        for m in matches:
+            if m not in seen:
+                seen.add(m)
+                out.append(m)
+    return out
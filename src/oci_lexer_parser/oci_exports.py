@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, ContextManager, Literal, TextIO, TypeVar
+
+from .io_utils import open_text_input
+from .parser_dynamic_group_matching_rules import parse_dynamic_group_matching_rules
+from .parser_policy_statements import parse_policy_statements
+from .parser_utils import DG_SCHEMA_VERSION, STATEMENT_SCHEMA_VERSION
+from .symbols import SymbolTable
+from .timing import StatementTimings
+
+# ============================================================
+# OCI SDK/CLI exports (`oci iam policy list`, `oci iam dynamic-group list`)
+# ============================================================
+#
+# The CLI writes {"data": [ {...}, ... ]} with kebab-case keys
+# ("compartment-id", "matching-rule"); SDK objects dumped with to_dict() use
+# snake_case and are usually saved as a bare JSON array. Both shapes (and a
+# single {"data": {...}} object from `... get`) are read here.
+#
+# Exports are read with a small incremental JSON reader: only the record being
+# decoded is held in memory, so exports of 100k+ policies (optionally gzip/bz2/
+# xz/zstd compressed, see io_utils) stream through. Every policy is parsed as
+# one document ("\n".join(statements)); its statements, rules and diagnostics
+# get a "policy" / "dynamic_group" provenance dict {"id", "name",
+# "compartment_id"}. Records can be parsed in worker processes; results keep
+# the export order.
+
+ExportSource = str | os.PathLike[str] | TextIO
+ErrorMode = Literal["raise", "report", "ignore"]
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+_DEFINE_RE = re.compile(r"^\s*define\b", re.IGNORECASE)
+_WS = frozenset(" \t\r\n")
+_DECODER = json.JSONDecoder()
+_READ_SIZE = 1 << 16
+
+# Records per worker task, and tasks in flight per worker (bounds memory when
+# the export is much larger than what the workers have processed so far).
+_RECORDS_PER_TASK = 64
+_TASKS_PER_WORKER = 4
+
+
+class _JsonReader:
+    """Pull-style reader over a text stream: peek()/expect() punctuation, value() decodes one JSON value."""
+
+    def __init__(self, fh: TextIO, read_size: int = _READ_SIZE) -> None:
+        self._fh = fh
+        self._read_size = read_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        data = self._fh.read(size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input), not consumed."""
+        while True:
+            buf, pos = self._buf, self._pos
+            n = len(buf)
+            while pos < n and buf[pos] in _WS:
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill(self._read_size):
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"malformed OCI export: expected {ch!r}, found {got or 'end of input'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        size = self._read_size
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # Most likely a value cut off at the end of the buffer: read more and retry.
+                if self._fill(size):
+                    size *= 2
+                    continue
+                raise ValueError(f"malformed OCI export: {e.msg}") from None
+            # A number (or literal) ending exactly at the buffer end may continue in the next read.
+            if end == len(self._buf) and self._fill(size):
+                continue
+            self._pos = end
+            return obj
+
+
+def iter_export_items(fh: TextIO) -> Iterator[Any]:
+    """
+    Yield the records of an export stream one at a time: the elements of a
+    top-level JSON array, or of the "data" member of a top-level object (a
+    single "data" object is yielded as one record).
+    """
+    rd = _JsonReader(fh)
+    first = rd.peek()
+    if first == "{":
+        rd.expect("{")
+        while True:
+            if rd.peek() == "}":
+                raise ValueError('malformed OCI export: object has no "data" member')
+            key = rd.value()
+            rd.expect(":")
+            if key == "data":
+                break
+            rd.value()  # skip e.g. "opc-next-page"
+            if rd.peek() == ",":
+                rd.expect(",")
+        if rd.peek() == "{":
+            yield rd.value()
+            return
+    elif first != "[":
+        raise ValueError('malformed OCI export: expected a JSON array or an object with a "data" member')
+
+    rd.expect("[")
+    if rd.peek() == "]":
+        return
+    while True:
+        yield rd.value()
+        nxt = rd.peek()
+        if nxt == "]":
+            return
+        rd.expect(",")
+
+
+@dataclass(slots=True)
+class PolicyRecord:
+    id: str | None
+    name: str | None
+    compartment_id: str | None
+    statements: list[str]
+
+    def provenance(self) -> dict[str, str | None]:
+        return {"id": self.id, "name": self.name, "compartment_id": self.compartment_id}
+
+
+@dataclass(slots=True)
+class DynamicGroupRecord:
+    id: str | None
+    name: str | None
+    compartment_id: str | None
+    matching_rule: str
+
+    def provenance(self) -> dict[str, str | None]:
+        return {"id": self.id, "name": self.name, "compartment_id": self.compartment_id}
+
+
+def _field(item: dict[str, Any], kebab: str) -> Any:
+    """Value of an export key in CLI (kebab-case) or SDK (snake_case) spelling."""
+    if kebab in item:
+        return item[kebab]
+    return item.get(kebab.replace("-", "_"))
+
+
+def _record_fields(item: Any, what: str) -> tuple[str | None, str | None, str | None]:
+    if not isinstance(item, dict):
+        raise ValueError(f"malformed OCI export: {what} record must be an object; got {type(item).__name__}")
+    return item.get("id"), item.get("name"), _field(item, "compartment-id")
+
+
+def _policy_record(item: Any) -> PolicyRecord:
+    pid, name, cid = _record_fields(item, "policy")
+    stmts = item.get("statements")
+    if not isinstance(stmts, list) or not all(isinstance(s, str) for s in stmts):
+        raise ValueError(f"policy {name or pid!r} has no 'statements' list of strings")
+    return PolicyRecord(pid, name, cid, stmts)
+
+
+def _dynamic_group_record(item: Any) -> DynamicGroupRecord:
+    gid, name, cid = _record_fields(item, "dynamic group")
+    rule = _field(item, "matching-rule")
+    if not isinstance(rule, str):
+        raise ValueError(f"dynamic group {name or gid!r} has no 'matching-rule' string")
+    return DynamicGroupRecord(gid, name, cid, rule)
+
+
+def _open_source(source: ExportSource) -> ContextManager[TextIO]:
+    if isinstance(source, (str, os.PathLike)):
+        ctx, _ = open_text_input(os.fspath(source))
+        return ctx
+    return nullcontext(source)
+
+
+def iter_policy_records(source: ExportSource) -> Iterator[PolicyRecord]:
+    """Stream the policies of an `oci iam policy list` (or SDK) export from a path or text stream."""
+    with _open_source(source) as fh:
+        for item in iter_export_items(fh):
+            yield _policy_record(item)
+
+
+def iter_dynamic_group_records(source: ExportSource) -> Iterator[DynamicGroupRecord]:
+    """Stream the dynamic groups of an `oci iam dynamic-group list` (or SDK) export."""
+    with _open_source(source) as fh:
+        for item in iter_export_items(fh):
+            yield _dynamic_group_record(item)
+
+
+# --------------------------
+# Parsing
+# --------------------------
+
+# Per record: (statements or rules, diagnostics) with provenance attached.
+RecordResult = tuple[list[dict[str, Any]], list[dict[str, Any]]]
+
+
+def _tag(items: list[dict[str, Any]], key: str, prov: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{**it, key: prov} for it in items]
+
+
+def _split_result(res: Any) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    if isinstance(res, tuple):
+        payload, diags = res
+        return payload, diags.get("errors") or []
+    return res, []
+
+
+def _parse_policy(rec: PolicyRecord, opts: dict[str, Any]) -> RecordResult:
+    table = opts.get("define_symbols")
+    if isinstance(table, SymbolTable):
+        opts = {**opts, "define_symbols": table.view(policy=rec.id, compartment=rec.compartment_id)}
+    try:
+        res = parse_policy_statements("\n".join(rec.statements), **opts)
+    except ValueError as e:
+        raise ValueError(f"policy {rec.name or rec.id!r}: {e}") from e
+    payload, errors = _split_result(res)
+    prov = rec.provenance()
+    return _tag(payload["statements"], "policy", prov), _tag(errors, "policy", prov)
+
+
+def _parse_dynamic_group(rec: DynamicGroupRecord, opts: dict[str, Any]) -> RecordResult:
+    try:
+        res = parse_dynamic_group_matching_rules(rec.matching_rule, **opts)
+    except ValueError as e:
+        raise ValueError(f"dynamic group {rec.name or rec.id!r}: {e}") from e
+    payload, errors = _split_result(res)
+    prov = rec.provenance()
+    return _tag(payload["rules"], "dynamic_group", prov), _tag(errors, "dynamic_group", prov)
+
+
+# (fn, opts) of the _ordered_map call a worker process serves; set once per
+# process by _init_worker, so opts (a SymbolTable can be large) is not pickled
+# with every batch.
+_WORKER: tuple[Callable[[Any, dict[str, Any]], Any], dict[str, Any]] | None = None
+
+
+def _init_worker(fn: Callable[[Any, dict[str, Any]], Any], opts: dict[str, Any]) -> None:
+    global _WORKER
+    _WORKER = (fn, opts)
+
+
+def _parse_batch(batch: list[Any]) -> tuple[list[Any], StatementTimings | None]:
+    """Worker task: fn(record, opts) for a batch, plus the batch's own timings if opts asks for them."""
+    if _WORKER is None:
+        raise RuntimeError("_parse_batch() called outside an _ordered_map worker")
+    fn, opts = _WORKER
+    timings = opts.get("timings")
+    if timings is not None:
+        timings = StatementTimings(timings.histogram.significant_digits)
+        opts = {**opts, "timings": timings}
+    return [fn(rec, opts) for rec in batch], timings
+
+
+def _batched(items: Iterable[_T], size: int) -> Iterator[list[_T]]:
+    batch: list[_T] = []
+    for it in items:
+        batch.append(it)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ordered_map(
+    fn: Callable[[_T, dict[str, Any]], _R], records: Iterable[_T], opts: dict[str, Any], workers: int
+) -> Iterator[_R]:
+    """
+    fn(record, opts) for every record, in order; batches go to `workers`
+    processes with bounded look-ahead. opts is sent to each process once; a
+    StatementTimings in opts["timings"] receives the workers' timings, merged
+    in record order.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1; got {workers}")
+    if workers == 1:
+        for rec in records:
+            yield fn(rec, opts)
+        return
+
+    timings: StatementTimings | None = opts.get("timings")
+
+    def done(fut: Any) -> list[_R]:
+        results, got = fut.result()
+        if timings is not None and got is not None:
+            timings.merge(got)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fn, opts)) as ex:
+        pending: deque[Any] = deque()
+        for batch in _batched(records, _RECORDS_PER_TASK):
+            pending.append(ex.submit(_parse_batch, batch))
+            if len(pending) >= workers * _TASKS_PER_WORKER:
+                yield from done(pending.popleft())
+        while pending:
+            yield from done(pending.popleft())
+
+
+def collect_policy_symbols(source: ExportSource, table: SymbolTable | None = None) -> SymbolTable:
+    """
+    First pass for tenancy-wide DEFINE substitution: parse only the DEFINE
+    statements of every policy in an export into a SymbolTable scoped by policy
+    id and compartment id. Pass the table to parse_policy_export(...,
+    define_subs=True, define_symbols=table); each policy then sees its own
+    DEFINEs, its compartment's and the unambiguous tenancy-wide ones.
+    """
+    table = table if table is not None else SymbolTable()
+    for rec in iter_policy_records(source):
+        defines = [st for st in rec.statements if _DEFINE_RE.match(st)]
+        stmts: list[dict[str, Any]] = []
+        if defines:
+            stmts = parse_policy_statements("\n".join(defines), error_mode="ignore")["statements"]  # type: ignore[index]
+        table.add_statements(stmts, policy=rec.id, compartment=rec.compartment_id)
+    return table
+
+
+def iter_parsed_policy_export(
+    source: ExportSource,
+    *,
+    workers: int = 1,
+    error_mode: ErrorMode = "raise",
+    **parse_kwargs: Any,
+) -> Iterator[RecordResult]:
+    """
+    Parse every policy of an export; yields (statements, diagnostics) per policy,
+    in export order. Statements and diagnostics carry "policy": {"id", "name",
+    "compartment_id"}. Keyword arguments are passed to parse_policy_statements()
+    (diagnostics are only collected with error_mode="report"). With workers > 1,
+    policies are parsed in that many processes. A SymbolTable passed as
+    `define_symbols` is applied per policy (see collect_policy_symbols()).
+    """
+    opts = {"error_mode": error_mode, **parse_kwargs}
+    yield from _ordered_map(_parse_policy, iter_policy_records(source), opts, workers)
+
+
+def iter_parsed_dynamic_group_export(
+    source: ExportSource,
+    *,
+    workers: int = 1,
+    error_mode: ErrorMode = "raise",
+    **parse_kwargs: Any,
+) -> Iterator[RecordResult]:
+    """Like iter_parsed_policy_export() for dynamic groups; rules carry "dynamic_group" provenance."""
+    opts = {"error_mode": error_mode, **parse_kwargs}
+    yield from _ordered_map(_parse_dynamic_group, iter_dynamic_group_records(source), opts, workers)
+
+
+def _collect(results: Iterable[RecordResult], key: str, schema_version: str, error_mode: ErrorMode) -> Any:
+    items: list[dict[str, Any]] = []
+    errors: list[dict[str, Any]] = []
+    for got, errs in results:
+        items.extend(got)
+        errors.extend(errs)
+    payload = {"schema_version": schema_version, key: items}
+    if error_mode == "report":
+        return payload, {"errors": errors, "error_count": len(errors)}
+    return payload
+
+
+def parse_policy_export(
+    source: ExportSource,
+    *,
+    workers: int = 1,
+    error_mode: ErrorMode = "raise",
+    **parse_kwargs: Any,
+) -> dict[str, Any] | tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Parse an `oci iam policy list` / SDK policy export into one payload, shaped
+    like parse_policy_statements() (a (payload, diagnostics) tuple in "report" mode).
+    """
+    results = iter_parsed_policy_export(source, workers=workers, error_mode=error_mode, **parse_kwargs)
+    return _collect(results, "statements", STATEMENT_SCHEMA_VERSION, error_mode)
+
+
+def parse_dynamic_group_export(
+    source: ExportSource,
+    *,
+    workers: int = 1,
+    error_mode: ErrorMode = "raise",
+    **parse_kwargs: Any,
+) -> dict[str, Any] | tuple[dict[str, Any], dict[str, Any]]:
+    """Parse an `oci iam dynamic-group list` / SDK export, shaped like parse_dynamic_group_matching_rules()."""
+    results = iter_parsed_dynamic_group_export(source, workers=workers, error_mode=error_mode, **parse_kwargs)
+    return _collect(results, "rules", DG_SCHEMA_VERSION, error_mode)
@@ -2,24 +2,31 @@ from __future__ import annotations
 
 import re
 import sys
-from dataclasses import asdict, dataclass
+import time
 from typing import Any, Literal, Sequence
 
-from antlr4 import CommonTokenStream, InputStream, Token
+from antlr4 import CommonTokenStream, Token
 from antlr4.error.ErrorListener import ErrorListener
 from antlr4.error.Errors import ParseCancellationException
 from antlr4.error.ErrorStrategy import BailErrorStrategy
 
+from .budgets import ParseBudgetExceeded, budget_meter
 from .grammar.gen.DynamicGroupMatchingRuleLexer import DynamicGroupMatchingRuleLexer
 from .grammar.gen.DynamicGroupMatchingRuleParser import DynamicGroupMatchingRuleParser as P
 from .parser_utils import (
     DG_SCHEMA_VERSION,
+    ExpectedTokensCache,
+    LazySyntaxIssue,
+    LineIndex,
+    Vocabulary,
     ctx_span,
     simplify_group_tree,
     span_source,
     split_rules_by_newline_preserving_groups,
     validate_ascii,
 )
+from .recognizers import new_lexer, new_parser
+from .timing import StatementTimings
 
 # ASCII validation / spans live in parser_utils.
 
@@ -28,32 +35,29 @@ from .parser_utils import (
 # Diagnostics
 # ============================================================
 
-@dataclass(slots=True)
-class SyntaxIssue:
-    line: int
-    column: int
-    message: str
-    offending: str | None = None
-    expected: list[str] | None = None
-    line_text: str | None = None
-    caret: str | None = None
-    rule_index: int | None = None
+class SyntaxIssue(LazySyntaxIssue):
+    """A matching-rule syntax error; to_dict() gives the diagnostics JSON item."""
+
+    __slots__ = ("rule_index",)
+
+    def __init__(self, *args: Any, rule_index: int | None = None) -> None:
+        super().__init__(*args)
+        self.rule_index = rule_index
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**super().to_dict(), "rule_index": self.rule_index}
+
+
+# Expected-token sets by (ATN state, invoking-state chain); shared by all parses.
+_EXPECTED_TOKENS = ExpectedTokensCache()
 
 
 class CollectingErrorListener(ErrorListener):
     def __init__(self, source_text: str) -> None:
         super().__init__()
         self.issues: list[SyntaxIssue] = []
-        self._lines_keep = source_text.splitlines(keepends=True)
-
-        def _rstrip_crlf(s: str) -> str:
-            if s.endswith("\r\n"):
-                return s[:-2]
-            if s.endswith("\n") or s.endswith("\r"):
-                return s[:-1]
-            return s
-
-        self._lines = [_rstrip_crlf(ln) for ln in self._lines_keep]
+        self._lines = LineIndex(source_text)
+        self._vocab: Vocabulary | None = None
 
     def syntaxError(  # type: ignore[override]
         self,
@@ -66,43 +70,15 @@ class CollectingErrorListener(ErrorListener):
     ) -> None:
         tok_text = offendingSymbol.text if isinstance(offendingSymbol, Token) else None
 
-        expected_names: list[str] = []
-        try:
-            exp = recognizer.getExpectedTokens()
-            ints = list(exp.toList())
-            sym = getattr(recognizer, "symbolicNames", None)
-            lit = getattr(recognizer, "literalNames", None)
-            for ttype in ints:
-                name = None
-                if lit and ttype < len(lit) and lit[ttype] is not None:
-                    name = lit[ttype]
-                elif sym and ttype < len(sym) and sym[ttype] is not None:
-                    name = sym[ttype]
-                if name:
-                    expected_names.append(name)
-        except Exception:
-            pass
-
-        line_text = None
-        caret = None
+        types: tuple[int, ...] = ()
         try:
-            if 1 <= line <= len(self._lines):
-                line_text = self._lines[line - 1]
-                caret = (" " * column) + "^"
+            types = _EXPECTED_TOKENS.lookup(recognizer)
+            if self._vocab is None:
+                self._vocab = (getattr(recognizer, "literalNames", None) or (), getattr(recognizer, "symbolicNames", None) or ())
         except Exception:
             pass
 
-        self.issues.append(
-            SyntaxIssue(
-                line=line,
-                column=column,
-                message=str(msg),
-                offending=tok_text,
-                expected=(expected_names or None),
-                line_text=line_text,
-                caret=caret,
-            )
-        )
+        self.issues.append(SyntaxIssue(line, column, str(msg), tok_text, types, self._vocab, self._lines))
 
 
 # ============================================================
@@ -353,7 +329,26 @@ def parse_dynamic_group_matching_rules(
     include_spans: bool = False,
     nested_simplify: bool = False,
     error_mode: Literal["raise", "report", "ignore"] = "raise",
+    timings: StatementTimings | None = None,
+    slow_threshold_ms: float | None = None,
+    max_statement_bytes: int | None = None,
+    max_condition_depth: int | None = None,
+    max_tokens: int | None = None,
+    deadline: float | None = None,
 ) -> dict[str, Any] | tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Parse one matching rule per line (newlines inside braces or quotes do not split).
+
+    timings / slow_threshold_ms work as in parse_policy_statements(): each rule's
+    lex+parse and shaping time is recorded, and rules taking at least
+    `slow_threshold_ms` are kept in `timings.slow` (statement_index is the rule's
+    1-based position, span is relative to the whole input) and logged.
+
+    max_statement_bytes / max_condition_depth / max_tokens / deadline work as in
+    parse_policy_statements(), per rule (size, ANY/ALL nesting) and for the whole
+    input (tokens, deadline). A budget stop returns no rules; its "report"
+    diagnostic carries the rule_index and a rule-relative line, like syntax errors.
+    """
     if isinstance(text, (list, tuple)):
         source_text = "\n".join("" if t is None else str(t) for t in text)
     else:
@@ -367,37 +362,66 @@ def parse_dynamic_group_matching_rules(
             return payload, {"errors": [], "error_count": 0}
         return payload
 
+    meter = budget_meter(
+        max_statement_bytes=max_statement_bytes,
+        max_condition_depth=max_condition_depth,
+        max_tokens=max_tokens,
+        deadline=deadline,
+        starters=frozenset(),
+        where=None,
+        lbrace=P.LBRACE,
+        rbrace=P.RBRACE,
+    )
     chunks = split_rules_by_newline_preserving_groups(source_text)
 
     out: list[dict[str, Any]] = []
     issues: list[SyntaxIssue] = []
 
-    for chunk in chunks:
-        input_stream = InputStream(chunk)
-        lexer = DynamicGroupMatchingRuleLexer(input_stream)
-        tokens = CommonTokenStream(lexer)
-        parser = P(tokens)
+    timed = timings is not None or slow_threshold_ms is not None
+    if timed:
+        timings = timings or StatementTimings()
+        clock = time.perf_counter_ns
+        pos = 0
+        line = 1
+
+    for rule_index, chunk in enumerate(chunks, 1):
+        if timed:
+            t0 = clock()
+        lexer = new_lexer(DynamicGroupMatchingRuleLexer, chunk)
+        parser = new_parser(P, CommonTokenStream(meter.tokens(lexer) if meter is not None else lexer))
         parser.removeErrorListeners()
 
-        if error_mode == "raise":
-            parser._errHandler = BailErrorStrategy()
-            try:
+        try:
+            if error_mode == "raise":
+                parser._errHandler = BailErrorStrategy()
+                try:
+                    rule_ctx = parser.matchingRule()
+                except ParseCancellationException as ex:
+                    tok = getattr(ex, "offendingToken", None)
+                    if isinstance(tok, Token):
+                        raise ValueError(f"syntax error at line {tok.line}, col {tok.column}.") from None
+                    raise ValueError("syntax error while parsing matching rules.") from None
+
+            elif error_mode == "report":
+                listener = CollectingErrorListener(chunk)
+                parser.addErrorListener(listener)
                 rule_ctx = parser.matchingRule()
-            except ParseCancellationException as ex:
-                tok = getattr(ex, "offendingToken", None)
-                if isinstance(tok, Token):
-                    raise ValueError(f"syntax error at line {tok.line}, col {tok.column}.") from None
-                raise ValueError("syntax error while parsing matching rules.") from None
-
-        elif error_mode == "report":
-            listener = CollectingErrorListener(chunk)
-            parser.addErrorListener(listener)
-            rule_ctx = parser.matchingRule()
-            issues.extend(listener.issues)
-
-        else:
-            rule_ctx = parser.matchingRule()
+                issues.extend(listener.issues)
 
+            else:
+                rule_ctx = parser.matchingRule()
+        except ParseBudgetExceeded as ex:
+            # A budget stopped the parse: no rules, one diagnostic
+            if error_mode == "raise":
+                raise
+            payload = {"schema_version": DG_SCHEMA_VERSION, "rules": []}
+            if error_mode == "report":
+                issue = SyntaxIssue(ex.line, ex.column, str(ex), ex.offending, (), None, LineIndex(chunk), rule_index=rule_index)
+                return payload, {"errors": [{**issue.to_dict(), "budget": ex.budget, "limit": ex.limit}], "error_count": 1}
+            return payload
+
+        if timed:
+            t1 = clock()
         tree = _build_tree(rule_ctx, include_spans=include_spans, source_text=chunk)
         tree2 = simplify_group_tree(tree, collapse_single=True) if nested_simplify else tree
         lvl = _level(tree2)
@@ -409,8 +433,21 @@ def parse_dynamic_group_matching_rules(
 
         out.append(rule_obj)
 
+        if timed:
+            t2 = clock()
+            start = source_text.find(chunk, pos)
+            line += source_text.count("\n", pos, start)
+            pos = start + len(chunk)
+            span = {
+                "start": start,
+                "stop": pos - 1,
+                "line": line,
+                "column": start - source_text.rfind("\n", 0, start) - 1,
+            }
+            timings.record(span, t1 - t0, t2 - t1, slow_threshold_ms)
+
     if error_mode == "report":
-        diags = {"errors": [asdict(i) for i in issues], "error_count": len(issues)}
+        diags = {"errors": [i.to_dict() for i in issues], "error_count": len(issues)}
         return {"schema_version": DG_SCHEMA_VERSION, "rules": out}, diags
 
     return {"schema_version": DG_SCHEMA_VERSION, "rules": out}
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from .parser_policy_statements import (
+    _STMT_START_RE,
+    SyntaxIssue,
+    TextInput,
+    _finalize_statements,
+    _normalize_text_input,
+    _run_parser,
+    _segment_bounds,
+    _shape_statements,
+)
+from .parser_utils import STATEMENT_SCHEMA_VERSION, validate_ascii
+
+# ============================================================
+# Incremental re-parse of edited policy documents
+# ============================================================
+#
+# A document is cut into segments at the statement starts found by
+# _STMT_START_RE (the first segment always begins at offset 0 so any preamble
+# stays attached to the first statement, exactly like a whole-document parse).
+# Each segment is lexed/parsed on its own and keeps document-absolute spans and
+# line numbers. An edit re-parses only the segments whose text or boundaries
+# changed; segments after the edit are shifted, not re-parsed.
+#
+# For well-formed documents the result is identical to parse_policy_statements()
+# on the full text. With syntax errors, ANTLR's recovery is confined to the
+# failing statement (as with the CLI's --chunked mode).
+
+SymbolKey = tuple[str, str]
+
+
+@dataclass(slots=True)
+class _Segment:
+    start: int  # absolute offset of the segment in the document
+    line: int  # number of newlines before `start` (added to 1-based ANTLR lines)
+    statements: list[dict[str, Any]]
+    issues: list[SyntaxIssue]
+    defines: tuple[tuple[str, str, str], ...]  # (type, name, ocid) in source order
+    refs: frozenset[SymbolKey]  # symbol keys this segment's statements could resolve
+
+
+@dataclass(slots=True)
+class _Options:
+    define_subs: bool
+    include_spans: bool
+    nested_simplify: bool
+    error_mode: Literal["raise", "report", "ignore"]
+    default_tenancy_alias: str | None
+    default_identity_domain: str | None
+
+
+@dataclass(slots=True)
+class PolicyDocument:
+    """
+    Parse state of a policy document that can be updated with text edits.
+
+    Create one with parse_policy_document() and update it with
+    reparse_policy_document(). A PolicyDocument is never mutated by an edit; a
+    new one is returned that shares the unchanged segments.
+    """
+
+    text: str
+    options: _Options
+    segments: list[_Segment] = field(default_factory=list)
+    symbols: dict[SymbolKey, str] = field(default_factory=dict)
+
+    def result(self) -> dict[str, Any] | tuple[dict[str, Any], dict[str, Any]]:
+        """Return the same shape parse_policy_statements() returns for this document."""
+        stmts: list[dict[str, Any]] = []
+        for seg in self.segments:
+            stmts.extend(seg.statements)
+        payload = {"schema_version": STATEMENT_SCHEMA_VERSION, "statements": stmts}
+
+        if self.options.error_mode == "report":
+            errors: list[dict[str, Any]] = []
+            for idx, seg in enumerate(self.segments, start=1):
+                for issue in seg.issues:
+                    item = issue.to_dict()
+                    item["statement_index"] = idx
+                    errors.append(item)
+            return payload, {"errors": errors, "error_count": len(errors)}
+        return payload
+
+
+# ============================================================
+# Segment helpers
+# ============================================================
+
+
+def _symbol_refs(stmts: list[dict[str, Any]]) -> frozenset[SymbolKey]:
+    """
+    Collect the DEFINE keys that _finish_statement would look up for these
+    (not yet substituted) statements.
+    """
+    refs: set[SymbolKey] = set()
+    for st in stmts:
+        kind = st.get("kind")
+        if kind == "define":
+            continue
+        sub = st.get("subject")
+        if isinstance(sub, dict) and sub.get("type") in ("group", "dynamic-group"):
+            refs.update((sub["type"], v) for v in sub.get("values") or [] if isinstance(v, str))
+        for key in ("source", "target"):
+            node = st.get(key)
+            if isinstance(node, dict) and node.get("type") == "tenancy":
+                refs.update(("tenancy", v) for v in node.get("values") or [] if isinstance(v, str))
+        loc = st.get("location")
+        if isinstance(loc, dict) and loc.get("type") == "compartment_name":
+            refs.update(("compartment", v) for v in loc.get("values") or [] if isinstance(v, str))
+    return frozenset(refs)
+
+
+def _rebase_span(st: dict[str, Any], d_off: int, d_line: int) -> dict[str, Any]:
+    span = st.get("span")
+    if not isinstance(span, dict) or not (d_off or d_line):
+        return st
+    out = dict(st)
+    out["span"] = {
+        **span,
+        "start": span["start"] + d_off,
+        "stop": span["stop"] + d_off,
+        "line": span["line"] + d_line,
+    }
+    return out
+
+
+def _parse_segment(text: str, start: int, end: int, line: int, opts: _Options) -> tuple[_Segment, list[dict[str, Any]]]:
+    """
+    Parse text[start:end] and return the segment plus its raw (unsubstituted)
+    statements. Spans and diagnostics are rebased to document coordinates.
+    """
+    seg_text = text[start:end]
+    if not seg_text.strip():
+        return _Segment(start, line, [], [], (), frozenset()), []
+
+    doc, issues = _run_parser(seg_text, opts.error_mode)
+    raw = _shape_statements(
+        doc,
+        seg_text,
+        include_spans=opts.include_spans,
+        nested_simplify=opts.nested_simplify,
+    )
+    if opts.include_spans:
+        raw = [_rebase_span(st, start, line) for st in raw]
+
+    defines = tuple(
+        (st["symbol"].get("type"), st["symbol"].get("name"), st["def"].get("value"))
+        for st in raw
+        if st.get("kind") == "define" and isinstance(st["symbol"].get("name"), str) and st["symbol"].get("name")
+    )
+    refs = _symbol_refs(raw) if opts.define_subs else frozenset()
+    issues = [i.shifted(line) for i in issues]
+    return _Segment(start, line, [], issues, defines, refs), raw
+
+
+def _finalize(segments: list[_Segment], raws: dict[int, list[dict[str, Any]]], sym: dict[SymbolKey, str], opts: _Options) -> None:
+    for idx, raw in raws.items():
+        segments[idx].statements = _finalize_statements(
+            raw,
+            sym=sym if opts.define_subs else None,
+            default_tenancy_alias=opts.default_tenancy_alias,
+            default_identity_domain=opts.default_identity_domain,
+        )
+
+
+def _symbols_from(segments: list[_Segment]) -> dict[SymbolKey, str]:
+    # Same "last DEFINE wins" semantics as build_symbols(form="flat").
+    return {(t, name): oc for seg in segments for (t, name, oc) in seg.defines}
+
+
+# ============================================================
+# Public API
+# ============================================================
+
+
+def parse_policy_document(
+    text: TextInput,
+    *,
+    define_subs: bool = False,
+    include_spans: bool = False,
+    nested_simplify: bool = False,
+    error_mode: Literal["raise", "report", "ignore"] = "raise",
+    default_tenancy_alias: str | None = None,
+    default_identity_domain: str | None = None,
+) -> PolicyDocument:
+    """
+    Parse a policy document into a PolicyDocument that supports incremental
+    re-parsing. Options have the same meaning as in parse_policy_statements().
+    """
+    text = _normalize_text_input(text)
+    validate_ascii(text)
+
+    opts = _Options(
+        define_subs=define_subs,
+        include_spans=include_spans,
+        nested_simplify=nested_simplify,
+        error_mode=error_mode,
+        default_tenancy_alias=default_tenancy_alias,
+        default_identity_domain=default_identity_domain,
+    )
+
+    bounds = _segment_bounds(text)
+    bounds.append(len(text))
+
+    segments: list[_Segment] = []
+    raws: dict[int, list[dict[str, Any]]] = {}
+    line = 0
+    for idx in range(len(bounds) - 1):
+        start, end = bounds[idx], bounds[idx + 1]
+        if idx:
+            line += text.count("\n", bounds[idx - 1], start)
+        seg, raw = _parse_segment(text, start, end, line, opts)
+        segments.append(seg)
+        raws[idx] = raw
+
+    sym = _symbols_from(segments) if define_subs else {}
+    _finalize(segments, raws, sym, opts)
+    return PolicyDocument(text=text, options=opts, segments=segments, symbols=sym)
+
+
+def reparse_policy_document(
+    previous: PolicyDocument,
+    offset: int,
+    removed: int,
+    inserted: str,
+) -> PolicyDocument:
+    """
+    Apply a text edit to `previous` and re-parse only the affected statements.
+
+    The edit replaces `removed` characters at `offset` with `inserted`. Statements
+    after the edit get their spans and line numbers rebased; DEFINE substitution is
+    recomputed only for statements that reference a symbol whose value changed.
+    """
+    old_text = previous.text
+    if offset < 0 or removed < 0 or offset + removed > len(old_text):
+        raise ValueError(f"edit out of range: offset={offset}, removed={removed}, length={len(old_text)}")
+    validate_ascii(inserted)
+
+    opts = previous.options
+    old_segs = previous.segments
+    text = old_text[:offset] + inserted + old_text[offset + removed :]
+    d_off = len(inserted) - removed
+    d_line = inserted.count("\n") - old_text.count("\n", offset, offset + removed)
+
+    old_starts = [seg.start for seg in old_segs]
+    edit_end = offset + removed
+
+    # One segment before the one holding the edit: the edit may create or remove
+    # the statement start of its own segment, which changes the previous one too.
+    first = max(0, bisect_right(old_starts, offset) - 2)
+    # Old segments from `cand` onward start after the edit and can be reused if
+    # the rescan lands on their (shifted) start again.
+    cand = bisect_right(old_starts, edit_end)
+
+    # The first match is the region's own start (or, at offset 0, the first
+    # statement start, which shares segment 0 with any preamble).
+    region_start = old_starts[first]
+    new_bounds = [region_start]
+    reuse_from = len(old_segs)
+    matches = _STMT_START_RE.finditer(text, region_start)
+    next(matches, None)
+    for m in matches:
+        s = m.start()
+        while cand < len(old_segs) and old_starts[cand] + d_off < s:
+            cand += 1
+        if cand < len(old_segs) and old_starts[cand] + d_off == s:
+            reuse_from = cand
+            break
+        new_bounds.append(s)
+    region_end = old_starts[reuse_from] + d_off if reuse_from < len(old_segs) else len(text)
+
+    # Re-parse the region.
+    segments: list[_Segment] = list(old_segs[:first])
+    raws: dict[int, list[dict[str, Any]]] = {}
+    base_line = old_segs[first].line
+    bounds = new_bounds + [region_end]
+    for k in range(len(bounds) - 1):
+        start, end = bounds[k], bounds[k + 1]
+        if k == 0 and end <= offset and first + 1 < len(old_segs) and end == old_starts[first + 1]:
+            # The leading context segment is untouched by the edit.
+            segments.append(old_segs[first])
+            continue
+        line = base_line + text.count("\n", region_start, start)
+        seg, raw = _parse_segment(text, start, end, line, opts)
+        raws[len(segments)] = raw
+        segments.append(seg)
+
+    # Shift the untouched tail.
+    for seg in old_segs[reuse_from:]:
+        if d_off or d_line:
+            seg = _Segment(
+                start=seg.start + d_off,
+                line=seg.line + d_line,
+                statements=[_rebase_span(st, d_off, d_line) for st in seg.statements],
+                issues=[i.shifted(d_line) for i in seg.issues] if d_line else seg.issues,
+                defines=seg.defines,
+                refs=seg.refs,
+            )
+        segments.append(seg)
+
+    sym: dict[SymbolKey, str] = {}
+    if opts.define_subs:
+        sym = _symbols_from(segments)
+        old_sym = previous.symbols
+        changed = {k for k in old_sym.keys() | sym.keys() if old_sym.get(k) != sym.get(k)}
+        if changed:
+            for idx, seg in enumerate(segments):
+                if idx not in raws and not changed.isdisjoint(seg.refs):
+                    end = segments[idx + 1].start if idx + 1 < len(segments) else len(text)
+                    segments[idx], raws[idx] = _parse_segment(text, seg.start, end, seg.line, opts)
+
+    _finalize(segments, raws, sym, opts)
+    return PolicyDocument(text=text, options=opts, segments=segments, symbols=sym)
@@ -2,32 +2,56 @@ from __future__ import annotations
 
 import re
 import sys
+import time
 from bisect import bisect_right
-from collections.abc import Iterable
-from dataclasses import asdict, dataclass
-from typing import Any, Literal
-
-from antlr4 import CommonTokenStream, InputStream, Token
+from collections import ChainMap
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Literal, cast
+
+from antlr4 import CommonTokenStream, Token
+from antlr4.ListTokenSource import ListTokenSource
 from antlr4.error.ErrorListener import ErrorListener
 from antlr4.error.Errors import ParseCancellationException
 from antlr4.error.ErrorStrategy import BailErrorStrategy
 
+from .budgets import (
+    BudgetMeter,
+    DeadlineListener,
+    MeteredTokens,
+    ParseBudgetExceeded,
+    budget_meter,
+    deadline_source,
+)
+from .canonical import dedupe_statements
 from .grammar.gen.PolicyStatementLexer import PolicyStatementLexer
 from .grammar.gen.PolicyStatementParser import PolicyStatementParser as P
 from .parser_utils import (
     STATEMENT_SCHEMA_VERSION,
+    ExpectedTokensCache,
+    InternPool,
+    LazySyntaxIssue,
+    LineIndex,
+    Vocabulary,
     ctx_span,
     simplify_group_tree,
     span_source,
     validate_ascii,
 )
+from .recognizers import new_lexer, new_parser
+from .symbols import SymbolTable, iter_defines
+from .timing import StatementTimer, StatementTimings
 
 # ============================================================
 # Precompiled regexes (hot-path)
 # ============================================================
 
+# "deny admit" / "deny endorse" are one statement even across a line break, so
+# they are matched as a single start.
 _STMT_START_RE = re.compile(
-    r"^\s*(?i:(allow|define|admit|endorse|deny))\b",
+    r"^\s*(?i:(deny\s+(?:admit|endorse)|allow|define|admit|endorse|deny))\b",
     flags=re.MULTILINE,
 )
 
@@ -126,42 +150,41 @@ _STD_VERBS = frozenset(map(_intern, ("manage", "use", "read", "inspect")))
 # Diagnostics collector
 # ============================================================
 
-@dataclass(slots=True)
-class SyntaxIssue:
-    line: int
-    column: int
-    message: str
-    offending: str | None = None
-    expected: list[str] | None = None
-    statement_index: int | None = None
-    line_text: str | None = None
-    caret: str | None = None
+class SyntaxIssue(LazySyntaxIssue):
+    """A policy syntax error; to_dict() gives the diagnostics JSON item."""
 
+    __slots__ = ("statement_index",)
 
-class CollectingErrorListener(ErrorListener):
-    def __init__(self, source_text: str) -> None:
-        super().__init__()
-        self.issues: list[SyntaxIssue] = []
-        self._source = source_text
+    def __init__(self, *args: Any, statement_index: int | None = None) -> None:
+        super().__init__(*args)
+        self.statement_index = statement_index
 
-        self._lines_keep = source_text.splitlines(keepends=True)
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "line": self.line,
+            "column": self.column,
+            "message": self.message,
+            "offending": self.offending,
+            "expected": self.expected,
+            "statement_index": self.statement_index,
+            "line_text": self.line_text,
+            "caret": self.caret,
+        }
 
-        def _rstrip_crlf(s: str) -> str:
-            if s.endswith("\r\n"):
-                return s[:-2]
-            if s.endswith("\n") or s.endswith("\r"):
-                return s[:-1]
-            return s
 
-        self._lines = [_rstrip_crlf(ln) for ln in self._lines_keep]
+# Expected-token sets by (ATN state, invoking-state chain); shared by all parses.
+_EXPECTED_TOKENS = ExpectedTokensCache()
 
-        self._line_offsets: list[int] = [0]
-        acc = 0
-        for ln in self._lines_keep:
-            acc += len(ln)
-            self._line_offsets.append(acc)
 
-        self._stmt_starts: list[int] = [m.start() for m in _STMT_START_RE.finditer(source_text)]
+class CollectingErrorListener(ErrorListener):
+    def __init__(self, source_text: str) -> None:
+        super().__init__()
+        self.issues: list[SyntaxIssue] = []
+        self._source = source_text
+        # Built on the first error only; clean parses never scan the text again.
+        self._lines = LineIndex(source_text)
+        self._stmt_starts: list[int] | None = None
+        self._vocab: Vocabulary | None = None
 
     def syntaxError(
         self,
@@ -174,51 +197,33 @@ class CollectingErrorListener(ErrorListener):
     ) -> None:  # type: ignore[override]
         tok_text = offendingSymbol.text if isinstance(offendingSymbol, Token) else None
 
-        expected_names: list[str] = []
+        types: tuple[int, ...] = ()
         try:
-            exp = recognizer.getExpectedTokens()
-            ints = list(exp.toList())
-            sym = getattr(recognizer, "symbolicNames", None)
-            lit = getattr(recognizer, "literalNames", None)
-            for ttype in ints:
-                name = None
-                if lit and ttype < len(lit) and lit[ttype] is not None:
-                    name = lit[ttype]
-                elif sym and ttype < len(sym) and sym[ttype] is not None:
-                    name = sym[ttype]
-                if name:
-                    expected_names.append(name)
+            types = _EXPECTED_TOKENS.lookup(recognizer)
+            if self._vocab is None:
+                self._vocab = (getattr(recognizer, "literalNames", None) or (), getattr(recognizer, "symbolicNames", None) or ())
         except Exception:
             pass
 
         stmt_index = None
         try:
-            line_idx = max(0, min(line - 1, len(self._lines)))
-            offset = self._line_offsets[line_idx] + max(0, column)
-            idx = bisect_right(self._stmt_starts, offset)
+            if self._stmt_starts is None:
+                self._stmt_starts = [m.start() for m in _STMT_START_RE.finditer(self._source)]
+            idx = bisect_right(self._stmt_starts, self._lines.offset(line, column))
             stmt_index = idx if idx > 0 else 1
         except Exception:
             pass
 
-        line_text = None
-        caret = None
-        try:
-            if 1 <= line <= len(self._lines):
-                line_text = self._lines[line - 1]
-                caret = (" " * column) + "^"
-        except Exception:
-            pass
-
         self.issues.append(
             SyntaxIssue(
-                line=line,
-                column=column,
-                message=str(msg),
-                offending=tok_text,
-                expected=(expected_names or None),
+                line,
+                column,
+                str(msg),
+                tok_text,
+                types,
+                self._vocab,
+                self._lines,
                 statement_index=stmt_index,
-                line_text=line_text,
-                caret=caret,
             )
         )
 
@@ -331,11 +336,11 @@ def _cond_expr_to_output(node: dict[str, Any]) -> dict[str, Any]:
     return {"type": "group", "mode": "all", "items": [expr]}
 
 
-def _conditions(ctx_with_cond: Any, *, nested_simplify: bool) -> dict[str, Any] | None:
+def _conditions(ctx_with_cond: Any, *, nested_simplify: bool, lazy: _LazyWhere | None = None) -> dict[str, Any] | None:
     get_cond = getattr(ctx_with_cond, "conditionExpr", None)
     c = get_cond() if callable(get_cond) else None
     if not c:
-        return None
+        return lazy.marker(ctx_with_cond) if lazy is not None else None
 
     tree = _cond_node(c)
     if nested_simplify:
@@ -343,6 +348,128 @@ def _conditions(ctx_with_cond: Any, *, nested_simplify: bool) -> dict[str, Any]
     return _cond_expr_to_output(tree)
 
 
+# ============================================================
+# Lazy conditions (lazy_conditions=True)
+# ============================================================
+#
+# WHERE clauses are cut from the token stream before the parser sees them, so
+# ANTLR never predicts through them and no condition tree is built. A clause is
+# cut only if it matches the conditionExpr grammar (checked by the token matcher
+# below) and is followed by the end of input or a statement keyword; the
+# statement keeps {"type": "lazy", "text": ...} as its "conditions" until
+# statement_conditions() / materialize_conditions() parse that text. If the cut
+# document has any syntax error, or a cut clause does not end an allow/admit/
+# endorse statement, the document is parsed again as written, so diagnostics
+# and the accepted language never change.
+
+_COND_VALUE_TYPES = frozenset((P.QUOTED, P.QUOTED_OCID, P.OCID, P.PATTERN, P.WORD))
+_STATEMENT_START_TYPES = frozenset((P.ALLOW, P.DENY, P.DEFINE, P.ADMIT, P.ENDORSE))
+_CLAUSE_FOLLOW_TYPES = _STATEMENT_START_TYPES | {Token.EOF}
+
+
+def _match_value_list(types: list[int], i: int) -> int:
+    """`( condValue (, condValue)* )` at types[i]: index past it, or -1."""
+    if types[i] != P.LPAREN:
+        return -1
+    i += 1
+    while types[i] in _COND_VALUE_TYPES:
+        if types[i + 1] == P.RPAREN:
+            return i + 2
+        if types[i + 1] != P.COMMA:
+            return -1
+        i += 2
+    return -1
+
+
+def _match_condition_expr(types: list[int], i: int) -> int:
+    """A conditionExpr at types[i] (which ends with EOF): index past it, or -1."""
+    t = types[i]
+    if t == P.ANY or t == P.ALL:
+        if types[i + 1] != P.LBRACE:
+            return -1
+        i += 2
+        while True:
+            i = _match_condition_expr(types, i)
+            if i < 0:
+                return -1
+            if types[i] == P.RBRACE:
+                return i + 1
+            if types[i] != P.COMMA:
+                return -1
+            i += 1
+    if t == P.NOT:
+        return i + 2 if types[i + 1] == P.WORD else -1
+    if t != P.WORD:
+        return -1
+    op = types[i + 1]
+    if op in (P.EQ, P.NEQ, P.BEFORE, P.AFTER):
+        return i + 3 if types[i + 2] in _COND_VALUE_TYPES else -1
+    if op == P.BETWEEN:
+        ok = types[i + 2] in _COND_VALUE_TYPES and types[i + 3] == P.AND and types[i + 4] in _COND_VALUE_TYPES
+        return i + 5 if ok else -1
+    if op == P.IN:
+        return _match_value_list(types, i + 2)
+    if op == P.NOT:
+        return _match_value_list(types, i + 3) if types[i + 2] == P.IN else -1
+    return i + 1  # bare presence check
+
+
+@dataclass(slots=True)
+class _LazyWhere:
+    text: str
+    nested_simplify: bool
+    # offset of the last character before WHERE -> (first, last) offset of the clause
+    clauses: dict[int, tuple[int, int]]
+
+    def marker(self, ctx: Any) -> dict[str, Any] | None:
+        clause = self.clauses.get(ctx.stop.stop) if ctx.stop is not None else None
+        if clause is None:
+            return None
+        return {"type": "lazy", "text": self.text[clause[0] : clause[1] + 1], "nested_simplify": self.nested_simplify}
+
+    def extend_span(self, span: dict[str, Any]) -> dict[str, Any]:
+        """A statement span that stops before its cut clause, extended over it."""
+        clause = self.clauses.get(span["stop"])
+        return {**span, "stop": clause[1]} if clause is not None else span
+
+
+def _cut_where_clauses(tokens: list[Token], text: str, nested_simplify: bool) -> tuple[list[Token], _LazyWhere]:
+    """Drop every WHERE clause that the matcher accepts from `tokens` (which end with EOF)."""
+    types = [t.type for t in tokens]
+    kept: list[Token] = []
+    clauses: dict[int, tuple[int, int]] = {}
+    last = 0
+    for i, t in enumerate(types):
+        if t != P.WHERE or i == 0 or i < last:
+            continue
+        end = _match_condition_expr(types, i + 1)
+        if end > 0 and types[end] in _CLAUSE_FOLLOW_TYPES:
+            kept.extend(tokens[last:i])
+            clauses[tokens[i - 1].stop] = (tokens[i + 1].start, tokens[end - 1].stop)
+            last = end
+    kept.extend(tokens[last:])
+    return kept, _LazyWhere(text, nested_simplify, clauses)
+
+
+def _claims_all(doc: Any, lazy: _LazyWhere) -> bool:
+    """Whether every cut clause follows the last token of an allow/admit/endorse statement."""
+    claimed = 0
+    for st in doc.statement():
+        s = st.allowStmt() or st.admitStmt() or st.endorseStmt()
+        if s is not None and s.stop is not None and s.stop.stop in lazy.clauses:
+            claimed += 1
+    return claimed == len(lazy.clauses)
+
+
+def _materialize_where(node: dict[str, Any]) -> dict[str, Any]:
+    parser = new_parser(P, CommonTokenStream(new_lexer(PolicyStatementLexer, node["text"])))
+    parser.removeErrorListeners()
+    tree = _cond_node(parser.conditionExpr())
+    if node.get("nested_simplify"):
+        tree = _simplify_cond(tree)
+    return _cond_expr_to_output(tree)
+
+
 # ============================================================
 # Subject shaping
 # ============================================================
@@ -379,12 +506,13 @@ def _subject_from_stmt(stmt_ctx: Any) -> dict[str, Any]:
             return _subject_node(single_ctx)
     return {"type": "unknown", "values": []}
 
-def _normalize_subject_values(
-    stmts: list[dict[str, Any]],
+def _subject_value_objects(
+    stype: Any,
+    vals: list[Any],
     default_identity_domain: str | None,
-) -> None:
+) -> list[dict[str, Any]]:
     """
-    V1 subject normalization.
+    V1 subject normalization of one subject's raw string values.
 
     Transform subject.values from raw strings:
         ["DomA/User1", "User2", ...]
@@ -400,76 +528,35 @@ def _normalize_subject_values(
             identity_domain and "Name" as the principal label.
           * If there is no explicit prefix and 'default_identity_domain' is provided,
             attach that identity domain.
-      - For subject.type in {"group-id", "dynamic-group-id"}:
-          * Values are treated as OCIDs. We still store them under "label" so that
-            downstream code only has to look at "label" plus subject.type.
-      - For subject.type == "service":
-          * Values are treated as service names, stored in "label".
-      - For "any-user" / "any-group":
-          * Values list is typically empty; we leave it as-is.
-
-    This mutates 'stmts' in place, *after* DEFINE substitutions so that lookups
-    still see the original string values.
+      - Any other type ("group-id"/"dynamic-group-id" OCIDs, "service" names, ...):
+          * The value is stored under "label", so that downstream code only has to
+            look at "label" plus subject.type.
     """
-    if not isinstance(stmts, list):
-        return
-
-    for st in stmts:
-        sub = st.get("subject")
-        if not isinstance(sub, dict):
+    split = stype in ("group", "dynamic-group")
+    default_dom = _intern(default_identity_domain) if split and default_identity_domain else None
+    new_vals: list[dict[str, Any]] = []
+    for v in vals:
+        # If someone already gave us structured values, don't break them.
+        if isinstance(v, dict):
+            new_vals.append(v)
             continue
-
-        stype = sub.get("type")
-        vals = sub.get("values")
-        if not isinstance(vals, list) or not vals:
+        if not isinstance(v, str):
+            # Fallback: keep as-is in a minimal wrapper.
+            new_vals.append({"label": str(v)})
             continue
 
-        new_vals: list[dict[str, Any]] = []
-
-        for v in vals:
-            # If someone already gave us structured values, don't break them.
-            if isinstance(v, dict):
-                new_vals.append(v)
-                continue
-
-            if not isinstance(v, str):
-                # Fallback: keep as-is in a minimal wrapper.
-                new_vals.append({"label": str(v)})
-                continue
-
-            dom: str | None = None
-            label = v
-
-            if stype in ("group", "dynamic-group"):
-                # Try explicit Domain/Name pattern first
-                if "/" in v:
-                    dom_candidate, rest = v.split("/", 1)
-                    if dom_candidate and rest:
-                        dom = _intern(dom_candidate)
-                        label = rest
-                # If no explicit prefix, use global default identity domain if provided
-                if dom is None and default_identity_domain:
-                    dom = _intern(default_identity_domain)
-
-            elif stype in ("group-id", "dynamic-group-id"):
-                # OCIDs; we still store as "label"
-                label = v
-
-            elif stype == "service":
-                # Service names; treated as labels.
-                label = v
-
-            else:
-                # any-user / any-group (values usually empty) or unknown types
-                label = v
-
-            val_obj: dict[str, Any] = {"label": label}
-            if dom is not None:
-                val_obj["identity_domain"] = dom
+        dom = default_dom
+        label = v
+        if split and "/" in v:
+            # Try explicit Domain/Name pattern first
+            dom_candidate, rest = v.split("/", 1)
+            if dom_candidate and rest:
+                dom = _intern(dom_candidate)
+                label = rest
 
-            new_vals.append(val_obj)
+        new_vals.append({"label": label} if dom is None else {"label": label, "identity_domain": dom})
+    return new_vals
 
-        sub["values"] = new_vals
 
 # ============================================================
 # Verb/resource/location shaping
@@ -560,9 +647,87 @@ def _location_from_stmt(stmt_ctx: Any) -> dict[str, Any]:
     return {"type": "unknown", "values": []}
 
 
+# ============================================================
+# return_filter projection
+# ============================================================
+
+
+@dataclass(frozen=True, slots=True)
+class _Projection:
+    """
+    A parsed return_filter: statement kinds to keep, top-level fields to keep
+    ("kind" always included) and whether only the first kept statement is wanted.
+    None means "all".
+    """
+
+    kinds: frozenset[str] | None = None
+    fields: frozenset[str] | None = None
+    first_only: bool = False
+
+    def keeps(self, field: str) -> bool:
+        return self.fields is None or field in self.fields
+
+
+def _projection(return_filter: Iterable[str] | dict[str, Any] | str | None, *, dedupe: bool) -> _Projection | None:
+    if return_filter is None:
+        return None
+    if isinstance(return_filter, str):
+        return _Projection(kinds=frozenset((return_filter.lower(),)))
+    if isinstance(return_filter, (list, set, tuple)):
+        return _Projection(kinds=frozenset(str(x).lower() for x in return_filter))
+    if isinstance(return_filter, dict):
+        kinds = return_filter.get("kinds")
+        f = return_filter.get("fields")
+        fields: set[str] | None = None
+        if f is not None:
+            fields = set(f)
+            fields.add("kind")
+            if dedupe:
+                fields.add("provenance")
+        return _Projection(
+            kinds=frozenset(str(x).lower() for x in kinds) if kinds is not None else None,
+            fields=frozenset(fields) if fields is not None else None,
+            first_only=bool(return_filter.get("first_only", False)),
+        )
+    return None
+
+
+def _project_statements(out: list[dict[str, Any]], proj: _Projection) -> list[dict[str, Any]]:
+    """Apply `proj` to already shaped statements."""
+    if proj.kinds is not None:
+        out = [s for s in out if s.get("kind") in proj.kinds]
+    if proj.fields is not None:
+        fields = proj.fields
+        out = [{k: v for k, v in s.items() if k in fields} for s in out]
+    if proj.first_only and out:
+        out = [out[0]]
+    return out
+
+
 # ============================================================
 # Statement shapers
 # ============================================================
+#
+# With a projection, a shaper returns None for a statement whose kind is not
+# kept (having looked at nothing but the tokens that decide the kind) and
+# builds only the fields that are kept.
+
+
+def _add_span(
+    out: dict[str, Any],
+    ctx: Any,
+    source_text: str | None,
+    proj: _Projection | None,
+    lazy: _LazyWhere | None = None,
+) -> None:
+    if proj is None or proj.keeps("span") or proj.keeps("source_text"):
+        span = ctx_span(ctx)
+        if lazy is not None:
+            span = lazy.extend_span(span)
+        if proj is None or proj.keeps("span"):
+            out["span"] = span
+        if source_text is not None and (proj is None or proj.keeps("source_text")):
+            out["source_text"] = span_source(source_text, span)
 
 
 def _allow(
@@ -571,24 +736,30 @@ def _allow(
     *,
     nested_simplify: bool,
     source_text: str | None,
-) -> dict[str, Any]:
+    proj: _Projection | None = None,
+    lazy: _LazyWhere | None = None,
+) -> dict[str, Any] | None:
     eff = _ilower(ctx.effect().getText())  # "allow" or "deny"
 
-    out: dict[str, Any] = {
-        "kind": eff,  # "allow" or "deny"
-        "subject": _subject_from_stmt(ctx),
-        "actions": _actions_from_stmt(ctx),
-        "resources": _resource_from_stmt(ctx),
-        "location": _location_from_stmt(ctx),
-    }
+    if proj is not None and proj.kinds is not None and eff not in proj.kinds:
+        return None
 
-    cond = _conditions(ctx, nested_simplify=nested_simplify)
-    if cond:
-        out["conditions"] = cond
+    out: dict[str, Any] = {"kind": eff}  # "allow" or "deny"
+    if proj is None or proj.keeps("subject"):
+        out["subject"] = _subject_from_stmt(ctx)
+    if proj is None or proj.keeps("actions"):
+        out["actions"] = _actions_from_stmt(ctx)
+    if proj is None or proj.keeps("resources"):
+        out["resources"] = _resource_from_stmt(ctx)
+    if proj is None or proj.keeps("location"):
+        out["location"] = _location_from_stmt(ctx)
+
+    if proj is None or proj.keeps("conditions"):
+        cond = _conditions(ctx, nested_simplify=nested_simplify, lazy=lazy)
+        if cond:
+            out["conditions"] = cond
     if include_spans:
-        out["span"] = ctx_span(ctx)
-        if source_text is not None:
-            out["source_text"] = span_source(source_text, out["span"])
+        _add_span(out, ctx, source_text, proj, lazy)
     return out
 
 
@@ -599,7 +770,15 @@ def _define_target_name(tgt: Any) -> str:
     return _strip_quotes(name_ctx.getText()) if name_ctx is not None else "?"
 
 
-def _define(ctx: P.DefineStmtContext, include_spans: bool, *, source_text: str | None) -> dict[str, Any]:
+def _define(
+    ctx: P.DefineStmtContext,
+    include_spans: bool,
+    *,
+    source_text: str | None,
+    proj: _Projection | None = None,
+) -> dict[str, Any] | None:
+    if proj is not None and proj.kinds is not None and "define" not in proj.kinds:
+        return None
     # Build the define 'symbol' (typed alias) and its 'def' (typed value, usually ocid)
     tgt = ctx.defineTarget()
     if tgt is None:
@@ -620,10 +799,10 @@ def _define(ctx: P.DefineStmtContext, include_spans: bool, *, source_text: str |
         "symbol": symbol,
         "def": {"type": "ocid", "value": ocid_text},
     }
+    if proj is not None and proj.fields is not None:
+        node = {k: v for k, v in node.items() if k in proj.fields}
     if include_spans:
-        node["span"] = ctx_span(ctx)
-        if source_text is not None:
-            node["source_text"] = span_source(source_text, node["span"])
+        _add_span(node, ctx, source_text, proj)
     return node
 
 
@@ -684,36 +863,37 @@ def _endorse(
     *,
     nested_simplify: bool,
     source_text: str | None,
-) -> dict[str, Any]:
+    proj: _Projection | None = None,
+    lazy: _LazyWhere | None = None,
+) -> dict[str, Any] | None:
     denym = getattr(ctx, "DENY", None)
     is_deny = bool(denym()) if callable(denym) else False
     kind = "deny_endorse" if is_deny else "endorse"
+    if proj is not None and proj.kinds is not None and kind not in proj.kinds:
+        return None
 
-    targets = _target_from_stmt(ctx)
-
-    if isinstance(ctx, P.EndorsePermissionListContext):
-        actions = _endorse_permission_list_actions(ctx)
-    else:
-        evm = getattr(ctx, "endorseVerb", None)
-        evctx = evm() if callable(evm) else None
-        actions = _endorse_actions_from_ctx(evctx) if evctx else {"type": "unknown", "values": []}
-
-    out: dict[str, Any] = {
-        "kind": kind,
-        "subject": _subject_from_stmt(ctx),
-        "target": targets,
-        "actions": actions,
-        "resources": _resource_from_stmt(ctx),
-    }
+    out: dict[str, Any] = {"kind": kind}
+    if proj is None or proj.keeps("subject"):
+        out["subject"] = _subject_from_stmt(ctx)
+    if proj is None or proj.keeps("target"):
+        out["target"] = _target_from_stmt(ctx)
+    if proj is None or proj.keeps("actions"):
+        if isinstance(ctx, P.EndorsePermissionListContext):
+            out["actions"] = _endorse_permission_list_actions(ctx)
+        else:
+            evm = getattr(ctx, "endorseVerb", None)
+            evctx = evm() if callable(evm) else None
+            out["actions"] = _endorse_actions_from_ctx(evctx) if evctx else {"type": "unknown", "values": []}
+    if proj is None or proj.keeps("resources"):
+        out["resources"] = _resource_from_stmt(ctx)
 
-    cond = _conditions(ctx, nested_simplify=nested_simplify)
-    if cond:
-        out["conditions"] = cond
+    if proj is None or proj.keeps("conditions"):
+        cond = _conditions(ctx, nested_simplify=nested_simplify, lazy=lazy)
+        if cond:
+            out["conditions"] = cond
 
     if include_spans:
-        out["span"] = ctx_span(ctx)
-        if source_text is not None:
-            out["source_text"] = span_source(source_text, out["span"])
+        _add_span(out, ctx, source_text, proj, lazy)
 
     return out
 
@@ -725,45 +905,52 @@ def _admit(
     *,
     nested_simplify: bool,
     source_text: str | None,
-) -> dict[str, Any]:
+    proj: _Projection | None = None,
+    lazy: _LazyWhere | None = None,
+) -> dict[str, Any] | None:
     denym = getattr(ctx, "DENY", None)
     is_deny = bool(denym()) if callable(denym) else False
     kind = "deny_admit" if is_deny else "admit"
+    if proj is not None and proj.kinds is not None and kind not in proj.kinds:
+        return None
 
     if isinstance(ctx, P.AdmitWildcardOfAnyTenancyContext):
         # Grammar-enforced: OF ANY-TENANCY is only reachable with ANY_USER or
         # ANY_GROUP as subject.
-        subject = {"type": "any-group", "values": []} if ctx.ANY_GROUP() else {"type": "any-user", "values": []}
+        subject: dict[str, Any] | None = (
+            {"type": "any-group", "values": []} if ctx.ANY_GROUP() else {"type": "any-user", "values": []}
+        )
         source: dict[str, Any] | None = {"type": "any-tenancy", "values": []}
     else:
         # Under error recovery, ANTLR can fail to commit to either labeled
         # alternative (both start with "ADMIT ANY_USER/ANY_GROUP ..."), leaving
         # a bare AdmitStmtContext that has neither .OF() nor .name() at all.
-        subject = _subject_from_stmt(ctx)
+        subject = _subject_from_stmt(ctx) if proj is None or proj.keeps("subject") else None
         ofm = getattr(ctx, "OF", None)
         namem = getattr(ctx, "name", None)
         name_ctx = namem() if callable(ofm) and ofm() and callable(namem) else None
         source = {"type": "tenancy", "values": [_strip_quotes(name_ctx.getText())]} if name_ctx else None
 
-    out: dict[str, Any] = {
-        "kind": kind,
-        "subject": subject,
-        "actions": _actions_from_stmt(ctx),
-        "resources": _resource_from_stmt(ctx),
-        "location": _location_from_stmt(ctx),
-    }
-
-    if source is not None:
+    out: dict[str, Any] = {"kind": kind}
+    if subject is not None and (proj is None or proj.keeps("subject")):
+        out["subject"] = subject
+    if proj is None or proj.keeps("actions"):
+        out["actions"] = _actions_from_stmt(ctx)
+    if proj is None or proj.keeps("resources"):
+        out["resources"] = _resource_from_stmt(ctx)
+    if proj is None or proj.keeps("location"):
+        out["location"] = _location_from_stmt(ctx)
+
+    if source is not None and (proj is None or proj.keeps("source")):
         out["source"] = source
 
-    cond = _conditions(ctx, nested_simplify=nested_simplify)
-    if cond:
-        out["conditions"] = cond
+    if proj is None or proj.keeps("conditions"):
+        cond = _conditions(ctx, nested_simplify=nested_simplify, lazy=lazy)
+        if cond:
+            out["conditions"] = cond
 
     if include_spans:
-        out["span"] = ctx_span(ctx)
-        if source_text is not None:
-            out["source_text"] = span_source(source_text, out["span"])
+        _add_span(out, ctx, source_text, proj, lazy)
 
     return out
 
@@ -780,14 +967,7 @@ def build_symbols(
     form: Literal["flat", "nested"] = "flat",
 ) -> dict[Any, Any]:
     # Build mapping: (type, name) -> ocid  from define statements using new shape
-    triples = (
-        (sym.get("type"), sym.get("name"), (defn or {}).get("value"))
-        for st in stmts
-        if st.get("kind") == "define"
-        for sym in (st.get("symbol", {}),)
-        for defn in (st.get("def", {}),)
-        if isinstance(sym.get("name"), str) and sym.get("name")
-    )
+    triples = iter_defines(stmts)
 
     if form == "flat":
         return {(t, name): oc for (t, name, oc) in triples}
@@ -798,100 +978,624 @@ def build_symbols(
     return out
 
 
-def _apply_define_subs(stmts: list[dict[str, Any]], sym: dict[tuple[str, str], str]) -> list[dict[str, Any]]:
-    out: list[dict[str, Any]] = []
-
-    for st in stmts:
-        if st.get("kind") == "define":
-            out.append(st)
-            continue
+def _merged_symbols(
+    stmts: list[dict[str, Any]],
+    extra: Mapping[tuple[str, str], str] | SymbolTable | None,
+    extra_wins: bool = False,
+) -> Mapping[tuple[str, str], str]:
+    """Flat symbol table of `stmts`, layered over `extra` (the statements' DEFINEs win unless extra_wins)."""
+    sym = build_symbols(stmts, form="flat")
+    if isinstance(extra, SymbolTable):
+        extra = extra.view()
+    if not extra:
+        return sym
+    if not sym:
+        return extra
+    # Layer instead of copying: `extra` may be a large tenancy-wide table.
+    return ChainMap(extra, sym) if extra_wins else ChainMap(sym, extra)
+
+
+def _resolve_tenancy(node: Any, sym: Mapping[tuple[str, str], str]) -> None:
+    # admit source / endorse target: single tenancy alias -> tenancy_id
+    if isinstance(node, dict) and node.get("type") == "tenancy":
+        vals = node.get("values") or []
+        if isinstance(vals, list) and len(vals) == 1:
+            oc = sym.get(("tenancy", vals[0]))
+            if oc:
+                node["type"] = "tenancy_id"
+                node["values"] = [oc]
+
+
+def _finish_statement(
+    st: dict[str, Any],
+    sym: Mapping[tuple[str, str], str] | None,
+    default_tenancy_alias: str | None,
+    default_identity_domain: str | None,
+) -> None:
+    """
+    Bring one freshly shaped statement into its final form, in place: DEFINE
+    substitution, default tenancy alias, then subject normalization.
 
-        s = st
-        modified = False
+    The statement must not be shared: its nested nodes are rewritten rather
+    than copied, and each subject's values list is built once, already
+    substituted and normalized.
+    """
+    kind = st.get("kind")
+    if kind == "define":
+        return
 
-        # subjects: group/dynamic-group -> *-id if all names resolve
-        sub = st.get("subject")
-        if isinstance(sub, dict):
-            t = sub.get("type")
-            vals = sub.get("values") or []
-            if t in ("group", "dynamic-group") and isinstance(vals, list) and vals:
+    sub = st.get("subject")
+    if isinstance(sub, dict):
+        t = sub.get("type")
+        vals = sub.get("values")
+        if isinstance(vals, list) and vals:
+            # subjects: group/dynamic-group -> *-id if all names resolve
+            if sym and t in ("group", "dynamic-group"):
                 ocids = [sym.get((t, name)) for name in vals]
                 if all(ocids):
-                    if not modified:
-                        s, modified = dict(st), True
-                        sub = s.get("subject")
-                    if isinstance(sub, dict):
-                        sub["type"] = f"{t}-id"
-                        sub["values"] = ocids
-
-        # admit: replace source tenancy alias -> tenancy_id
-        if s.get("kind") in ("admit", "deny_admit"):
-            src_val = s.get("source")
-            if isinstance(src_val, dict) and src_val.get("type") == "tenancy":
-                vals = src_val.get("values") or []
-                if isinstance(vals, list) and len(vals) == 1:
-                    ten = vals[0]
-                    oc = sym.get(("tenancy", ten))
-                    if oc:
-                        if not modified:
-                            s, modified = dict(st), True
-                            src_val = s.get("source")
-                        if isinstance(src_val, dict):
-                            src_val["type"] = "tenancy_id"
-                            src_val["values"] = [oc]
-
-        # endorse: replace targets tenancy alias -> tenancy_id
-        if s.get("kind") in ("endorse", "deny_endorse"):
-            tgt_val = s.get("target")
-            if isinstance(tgt_val, dict) and tgt_val.get("type") == "tenancy":
-                vals = tgt_val.get("values") or []
-                if isinstance(vals, list) and len(vals) == 1:
-                    ten = vals[0]
-                    oc = sym.get(("tenancy", ten))
-                    if oc:
-                        if not modified:
-                            s, modified = dict(st), True
-                            tgt_val = s.get("target")
-                        if isinstance(tgt_val, dict):
-                            tgt_val["type"] = "tenancy_id"
-                            tgt_val["values"] = [oc]
-
-        # location: single-name compartment -> compartment-id if resolvable
-        loc = s.get("location")
-        if isinstance(loc, dict) and loc.get("type") == "compartment_name":
-            vals = loc.get("values") or []
+                    t = sub["type"] = f"{t}-id"
+                    vals = ocids
+            sub["values"] = _subject_value_objects(t, vals, default_identity_domain)
+
+    if sym:
+        if kind in ("admit", "deny_admit"):
+            _resolve_tenancy(st.get("source"), sym)
+        elif kind in ("endorse", "deny_endorse"):
+            _resolve_tenancy(st.get("target"), sym)
+
+    loc = st.get("location")
+    if isinstance(loc, dict):
+        vals = loc.get("values")
+        if sym and loc.get("type") == "compartment_name":
+            # location: single-name compartment -> compartment-id if resolvable
             if isinstance(vals, list) and len(vals) == 1:
                 oc = sym.get(("compartment", vals[0]))
                 if oc:
-                    if not modified:
-                        s, modified = dict(st), True
-                        loc = s.get("location")
-                    if isinstance(loc, dict):
-                        loc["type"] = "compartment-id"
-                        loc["values"] = [oc]
+                    loc["type"] = "compartment-id"
+                    loc["values"] = [oc]
+        elif default_tenancy_alias and loc.get("type") == "tenancy" and isinstance(vals, list) and not vals:
+            # Default tenancy alias for locations that are exactly "IN TENANCY"
+            # (no effect on ADMIT 'OF TENANCY' or ENDORSE targets).
+            loc["values"] = [default_tenancy_alias]
+
+
+# ============================================================
+# Pipeline stages (shared by the incremental/segmented parsers)
+# ============================================================
+
+
+def _token_stream(text: str, meter: BudgetMeter | None = None, line_base: int = 0) -> CommonTokenStream:
+    """Tokens of `text`, metered by `meter` (lines reported `line_base` lines down) if given."""
+    lexer = new_lexer(PolicyStatementLexer, text)
+    return CommonTokenStream(meter.tokens(lexer, line_base) if meter is not None else lexer)
+
+
+def _run_parser(
+    text: str,
+    error_mode: Literal["raise", "report", "ignore"],
+    timer: StatementTimer | None = None,
+    line_shift: Callable[[int], int] | None = None,
+    tokens: CommonTokenStream | None = None,
+) -> tuple[Any, list[SyntaxIssue]]:
+    """
+    Lex and parse `text` with the `statements` entry rule (or parse `tokens`,
+    lexed from `text`, instead). `line_shift` maps a line of `text` to the delta
+    that makes it a document line (prefilter) for the "raise" message; reported
+    issues are returned unshifted.
+    """
+    if tokens is None:
+        tokens = _token_stream(text)
+    parser = new_parser(P, tokens)
+    parser.removeErrorListeners()
+    if timer is not None:
+        parser.addParseListener(timer)
+    watch = deadline_source(tokens.tokenSource)
+    if watch is not None:
+        # Buffered tokens are not metered again; check once per statement.
+        parser.addParseListener(DeadlineListener(watch, P.RULE_statement))
+
+    if error_mode == "raise":
+        parser._errHandler = BailErrorStrategy()
+        try:
+            doc = parser.statements()
+        except ParseCancellationException as ex:
+            tok = getattr(ex, "offendingToken", None)
+            if isinstance(tok, Token):
+                line = tok.line + (line_shift(tok.line) if line_shift is not None else 0)
+                raise ValueError(f"syntax error at line {line}, col {tok.column}.") from None
+            raise ValueError("syntax error while parsing.") from None
+        return doc, []
+
+    if error_mode == "report":
+        listener = CollectingErrorListener(text)
+        parser.addErrorListener(listener)
+        doc = parser.statements()
+        return doc, listener.issues
+
+    return parser.statements(), []
+
+
+def _run_parser_lazy(
+    text: str,
+    error_mode: Literal["raise", "report", "ignore"],
+    timer: StatementTimer | None = None,
+    line_shift: Callable[[int], int] | None = None,
+    *,
+    nested_simplify: bool,
+    tokens: CommonTokenStream | None = None,
+) -> tuple[Any, list[SyntaxIssue], _LazyWhere | None]:
+    """
+    _run_parser() with the WHERE clauses cut from the token stream (see "Lazy
+    conditions"); the returned _LazyWhere is None if the document was parsed as
+    written.
+    """
+    stream = tokens if tokens is not None else _token_stream(text)
+    stream.fill()
+    # Budgets are checked while lexing; a metered stream keeps its deadline
+    # running over the parses of the lexed tokens.
+    source = stream.tokenSource
+    metered = source if isinstance(source, MeteredTokens) else None
+    kept, lazy = _cut_where_clauses(stream.tokens, text, nested_simplify)
+    if not lazy.clauses:
+        if metered is not None:
+            stream = _replayed(stream.tokens, metered)
+        return (*_run_parser(text, error_mode, timer, line_shift, stream), None)
+    doc, issues = _run_parser(text, "report", timer, tokens=_replayed(kept, metered))
+    if not issues and _claims_all(doc, lazy):
+        return doc, issues, lazy
+    # Parse as written so errors are raised/reported exactly as without the cut.
+    if timer is not None:
+        timer.reset()
+    return (*_run_parser(text, error_mode, timer, line_shift, _replayed(stream.tokens, metered)), None)
+
+
+def _replayed(tokens: list[Token], metered: MeteredTokens | None) -> CommonTokenStream:
+    return CommonTokenStream(metered.replay(tokens) if metered is not None else ListTokenSource(tokens))
+
+
+def _shape_statement(
+    st: Any,
+    text: str,
+    *,
+    include_spans: bool,
+    nested_simplify: bool,
+    proj: _Projection | None = None,
+    lazy: _LazyWhere | None = None,
+) -> dict[str, Any] | None:
+    a = st.allowStmt()
+    if a:
+        return _allow(a, include_spans, nested_simplify=nested_simplify, source_text=text, proj=proj, lazy=lazy)
+    d = st.defineStmt()
+    if d:
+        return _define(d, include_spans, source_text=text, proj=proj)
+    m = st.admitStmt()
+    if m:
+        return _admit(m, include_spans, nested_simplify=nested_simplify, source_text=text, proj=proj, lazy=lazy)
+    e = st.endorseStmt()
+    if e:
+        return _endorse(e, include_spans, nested_simplify=nested_simplify, source_text=text, proj=proj, lazy=lazy)
+    if proj is not None and proj.kinds is not None and "unknown" not in proj.kinds:
+        return None
+    node: dict[str, Any] = {"kind": "unknown"}
+    if include_spans:
+        _add_span(node, st, text, proj, lazy)
+    return node
+
+
+def _shape_statements(
+    doc: Any,
+    text: str,
+    *,
+    include_spans: bool,
+    nested_simplify: bool,
+    timer: StatementTimer | None = None,
+    finish: Callable[[dict[str, Any]], None] | None = None,
+    proj: _Projection | None = None,
+    lazy: _LazyWhere | None = None,
+    needles: tuple[str, ...] = (),
+    deadline: MeteredTokens | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Shape every statement of `doc`. With `finish` (see _finisher), each one is
+    brought into its final form right after it is shaped; otherwise statements
+    are returned raw for _finalize_statements(). With `proj`, statements of
+    other kinds are skipped, only the kept fields are built and first_only stops
+    shaping at the first kept statement (the timer still sees every statement).
+    With `needles` (lower-case), so are statements whose text contains none.
+    `lazy` holds the WHERE clauses cut by _run_parser_lazy(). With `deadline`
+    (see deadline_source), its deadline is checked before each statement.
+    """
+    if timer is None and proj is None and not needles and deadline is None:
+        if finish is None:
+            out = [
+                _shape_statement(st, text, include_spans=include_spans, nested_simplify=nested_simplify, lazy=lazy)
+                for st in doc.statement()
+            ]
+            return out  # type: ignore[return-value]
+        # Finish each statement as soon as it is shaped (interning frees its copies).
+        out = []
+        for st in doc.statement():
+            node = _shape_statement(st, text, include_spans=include_spans, nested_simplify=nested_simplify, lazy=lazy)
+            finish(node)  # type: ignore[arg-type]
+            out.append(node)
+        return out
+
+    clock = time.perf_counter_ns
+    out = []
+    done = False
+    for i, st in enumerate(doc.statement()):
+        if deadline is not None:
+            deadline.check_deadline(st.start)
+        t0 = clock()
+        if not done and (not needles or _mentions(st, text, needles, lazy)):
+            node = _shape_statement(
+                st, text, include_spans=include_spans, nested_simplify=nested_simplify, proj=proj, lazy=lazy
+            )
+            if node is not None:
+                if finish is not None:
+                    finish(node)
+                out.append(node)
+                done = proj is not None and proj.first_only
+        if timer is not None:
+            timer.shaped(i, st, clock() - t0)
+        elif done:
+            break
+    return out
 
-        out.append(s)
 
+def _mentions(st: Any, text: str, needles: tuple[str, ...], lazy: _LazyWhere | None) -> bool:
+    """Whether the text of statement `st` (its cut WHERE clause included) contains one of `needles`."""
+    span = ctx_span(st)
+    if lazy is not None:
+        span = lazy.extend_span(span)
+    body = text[span["start"] : span["stop"] + 1].lower()
+    return any(n in body for n in needles)
+
+
+def _document_defines(doc: Any) -> list[dict[str, Any]]:
+    """Shape only the DEFINE statements of `doc` (for the symbol table)."""
+    return [cast(dict, _define(d, False, source_text=None)) for st in doc.statement() if (d := st.defineStmt())]
+
+
+def _finisher(
+    *,
+    sym: Mapping[tuple[str, str], str] | None,
+    default_tenancy_alias: str | None,
+    default_identity_domain: str | None,
+    pool: InternPool | None = None,
+) -> Callable[[dict[str, Any]], None]:
+    """
+    _finish_statement() with its settings bound. With `pool`, the finished
+    statement's subtrees are then swapped for the pool's shared copies, so the
+    statement's own copies can be freed before the next one is shaped.
+    """
+    finish = partial(
+        _finish_statement,
+        sym=sym,
+        default_tenancy_alias=default_tenancy_alias,
+        default_identity_domain=default_identity_domain,
+    )
+    if pool is None:
+        return finish
+
+    def finish_interned(st: dict[str, Any]) -> None:
+        finish(st)
+        _intern_statement(st, pool)
+
+    return finish_interned
+
+
+def _finalize_statements(
+    out: list[dict[str, Any]],
+    *,
+    sym: Mapping[tuple[str, str], str] | None,
+    default_tenancy_alias: str | None,
+    default_identity_domain: str | None,
+    pool: InternPool | None = None,
+) -> list[dict[str, Any]]:
+    """
+    DEFINE substitution, default tenancy alias and subject normalization of raw
+    statements (in place, see _finisher), for paths that shape before the
+    document's symbol table is known.
+    """
+    finish = _finisher(
+        sym=sym,
+        default_tenancy_alias=default_tenancy_alias,
+        default_identity_domain=default_identity_domain,
+        pool=pool,
+    )
+    for st in out:
+        finish(st)
     return out
 
 
+# Per-statement keys that are never shared between statements.
+_UNSHARED_KEYS = frozenset(("span", "provenance"))
+
+
+def _intern_statement(st: dict[str, Any], pool: InternPool) -> None:
+    """Replace the subtrees of `st` with the ones shared through `pool`, in place."""
+    intern = pool.intern
+    for k, v in st.items():
+        if k not in _UNSHARED_KEYS:
+            st[k] = intern(v)
+
+
+def _budget_error(text: str, ex: ParseBudgetExceeded) -> dict[str, Any]:
+    """Diagnostics item for a parse stopped by a budget (line/column are document-relative)."""
+    lines = LineIndex(text)
+    starts = [m.start() for m in _STMT_START_RE.finditer(text)]
+    idx = bisect_right(starts, lines.offset(ex.line, ex.column))
+    issue = SyntaxIssue(ex.line, ex.column, str(ex), ex.offending, (), None, lines, statement_index=max(idx, 1))
+    return {**issue.to_dict(), "budget": ex.budget, "limit": ex.limit}
+
+
 # ============================================================
-# Optional default tenancy-alias injection for "IN TENANCY"
+# Error-isolating parse (isolate_errors=True)
 # ============================================================
+#
+# The document is cut at the statement starts found by _STMT_START_RE (a DENY
+# line followed by ADMIT/ENDORSE is one start) and every segment is
+# lexed/parsed on its own, so a malformed statement cannot pull its neighbours
+# into ANTLR's error recovery. A segment with any syntax error
+# becomes a single {"kind": "unknown"} statement carrying its own diagnostics.
+# Segments are independent, which makes the work linear in the document size
+# and lets it be spread over worker processes.
 
-def _inject_default_tenancy_alias_in_location(stmts: list[dict[str, Any]], alias: str) -> None:
+# (segment text, document offset of the segment, newlines before it)
+_SegmentJob = tuple[str, int, int]
+
+# Segments handed to a worker process per task (amortizes pickling overhead).
+_SEGMENTS_PER_TASK = 256
+
+
+def _segment_bounds(text: str) -> list[int]:
     """
-    For locations that are exactly {"type":"tenancy","values":[]}, set values to [alias].
-    Mutates the statements list in place. No effect on ADMIT 'OF TENANCY' or ENDORSE targets.
+    Segment start offsets. The first statement start is replaced by 0 so that
+    a preamble shares the first segment (and its statement_index) with it.
     """
-    if not alias:
-        return
-    for st in stmts:
-        loc = st.get("location")
-        if isinstance(loc, dict) and loc.get("type") == "tenancy":
-            vals = loc.get("values")
-            if isinstance(vals, list) and not vals:
-                loc["values"] = [alias]
+    starts = [m.start() for m in _STMT_START_RE.finditer(text)]
+    return [0, *starts[1:]]
+
+
+def _iter_segments(text: str) -> Iterable[_SegmentJob]:
+    bounds = _segment_bounds(text)
+    bounds.append(len(text))
+    line = 0
+    for idx in range(len(bounds) - 1):
+        start, end = bounds[idx], bounds[idx + 1]
+        if idx:
+            line += text.count("\n", bounds[idx - 1], start)
+        yield text[start:end], start, line
+
+
+def _parse_isolated_segment(
+    job: _SegmentJob,
+    error_mode: Literal["raise", "report", "ignore"],
+    include_spans: bool,
+    nested_simplify: bool,
+    timings: StatementTimings | None = None,
+    slow_threshold_ms: float | None = None,
+    lazy_conditions: bool = False,
+    meter: BudgetMeter | None = None,
+    needles: tuple[str, ...] = (),
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Parse one segment; return (raw statements, diagnostics as dicts) in document
+    coordinates. Diagnostics are only returned in "report" mode. With `needles`,
+    only statements whose text contains one are shaped (see _shape_statements).
+    """
+    seg_text, start, line = job
+    if not seg_text.strip():
+        return [], []
+
+    timer: StatementTimer | None = None
+    slow_before = 0
+    if timings is not None:
+        timer = StatementTimer(timings, P.RULE_statement, slow_threshold_ms)
+        slow_before = len(timings.slow)
+
+    # "ignore" would hide the errors that decide whether the segment is kept.
+    seg_mode: Literal["raise", "report"] = "raise" if error_mode == "raise" else "report"
+    lazy: _LazyWhere | None = None
+    tokens = _token_stream(seg_text, meter, line) if meter is not None else None
+    if lazy_conditions:
+        doc, issues, lazy = _run_parser_lazy(seg_text, seg_mode, timer, nested_simplify=nested_simplify, tokens=tokens)
+    else:
+        doc, issues = _run_parser(seg_text, seg_mode, timer, tokens=tokens)
+
+    if issues:
+        node: dict[str, Any] = {"kind": "unknown"}
+        if include_spans:
+            body = seg_text.strip()
+            lead = seg_text.index(body[0])
+            node["span"] = {
+                "start": start + lead,
+                "stop": start + lead + len(body) - 1,
+                "line": line + 1 + seg_text.count("\n", 0, lead),
+                "column": lead - seg_text.rfind("\n", 0, lead) - 1,
+            }
+            node["source_text"] = body
+        if error_mode != "report":
+            return [node], []
+        errors = [i.to_dict() for i in issues]
+        for e in errors:
+            e["line"] += line
+        return [node], errors
+
+    out = _shape_statements(
+        doc,
+        seg_text,
+        include_spans=include_spans,
+        nested_simplify=nested_simplify,
+        timer=timer,
+        lazy=lazy,
+        needles=needles,
+        deadline=deadline_source(tokens.tokenSource) if tokens is not None else None,
+    )
+    if include_spans and (start or line):
+        for st in out:
+            span = st["span"]
+            st["span"] = {**span, "start": span["start"] + start, "stop": span["stop"] + start, "line": span["line"] + line}
+    if timings is not None:
+        for item in timings.slow[slow_before:]:
+            span = item.span if lazy is None else lazy.extend_span(item.span)
+            item.span = {**span, "start": span["start"] + start, "stop": span["stop"] + start, "line": span["line"] + line}
+    return out, []
+
+
+def _parse_isolated_task(
+    args: tuple[list[_SegmentJob], Literal["raise", "report", "ignore"], bool, bool, bool, tuple[str, ...]],
+) -> list[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+    """Worker-process entry point: parse a run of consecutive segments."""
+    jobs, error_mode, include_spans, nested_simplify, lazy_conditions, needles = args
+    return [
+        _parse_isolated_segment(
+            j, error_mode, include_spans, nested_simplify, lazy_conditions=lazy_conditions, needles=needles
+        )
+        for j in jobs
+    ]
+
+
+def _parse_isolated(
+    text: str,
+    *,
+    error_mode: Literal["raise", "report", "ignore"],
+    include_spans: bool,
+    nested_simplify: bool,
+    workers: int,
+    timings: StatementTimings | None,
+    slow_threshold_ms: float | None,
+    lazy_conditions: bool = False,
+    meter: BudgetMeter | None = None,
+    needles: tuple[str, ...] = (),
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Steps 2-3 of parse_policy_statements() for isolate_errors=True. Diagnostics
+    get the 1-based `statement_index` of the "unknown" statement they produced.
+    """
+    if workers > 1:
+        jobs = list(_iter_segments(text))
+        tasks = [
+            (jobs[i : i + _SEGMENTS_PER_TASK], error_mode, include_spans, nested_simplify, lazy_conditions, needles)
+            for i in range(0, len(jobs), _SEGMENTS_PER_TASK)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results: Iterable[tuple[list[dict[str, Any]], list[dict[str, Any]]]] = (
+                r for chunk in ex.map(_parse_isolated_task, tasks) for r in chunk
+            )
+            return _collect_isolated(results)
+
+    return _collect_isolated(
+        _parse_isolated_segment(
+            j, error_mode, include_spans, nested_simplify, timings, slow_threshold_ms, lazy_conditions, meter, needles
+        )
+        for j in _iter_segments(text)
+    )
+
+
+def _collect_isolated(
+    results: Iterable[tuple[list[dict[str, Any]], list[dict[str, Any]]]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    out: list[dict[str, Any]] = []
+    errors: list[dict[str, Any]] = []
+    for stmts, errs in results:
+        for e in errs:
+            e["statement_index"] = len(out) + 1
+        errors.extend(errs)
+        out.extend(stmts)
+    return out, errors
+
+
+# ============================================================
+# Prefilter: skip statements before they reach ANTLR
+# ============================================================
+#
+# The document is cut into segments as for isolate_errors. A segment is kept
+# if any statement in it could have a kept kind (judged from the statement
+# keywords it contains, so the scan may keep too much but never drops a
+# statement of a kept kind) and, with substrings, if its text contains one of
+# them. Runs of consecutive kept segments are concatenated and parsed in one
+# call; spans, diagnostics and timings are then rebased onto the document.
+
+_KIND_WORD_RE = re.compile(r"\b(allow|define|admit|endorse|deny)\b", re.IGNORECASE)
+
+_WORD_KINDS: dict[str, tuple[str, ...]] = {
+    "allow": ("allow",),
+    "define": ("define",),
+    "admit": ("admit", "deny_admit"),
+    "endorse": ("endorse", "deny_endorse"),
+    "deny": ("deny", "deny_admit", "deny_endorse"),
+}
+
+
+def _segment_may_be(seg: str, kinds: frozenset[str]) -> bool:
+    return any(not kinds.isdisjoint(_WORD_KINDS[m.group(1).lower()]) for m in _KIND_WORD_RE.finditer(seg))
+
+
+@dataclass(slots=True)
+class _Prefiltered:
+    text: str  # the kept runs, concatenated
+    new_starts: list[int]  # offset of each run in `text`
+    new_lines: list[int]  # newlines in `text` before each run
+    shifts: list[tuple[int, int]]  # (offset delta, line delta) of each run
+    dropped_defines: bool  # a segment that may hold a DEFINE was dropped
+
+    def _run_at(self, offset: int) -> tuple[int, int]:
+        return self.shifts[bisect_right(self.new_starts, offset) - 1]
+
+    def rebase_span(self, span: dict[str, Any]) -> dict[str, Any]:
+        d_off, d_line = self._run_at(span["start"])
+        return {**span, "start": span["start"] + d_off, "stop": span["stop"] + d_off, "line": span["line"] + d_line}
+
+    def line_shift(self, line: int) -> int:
+        """Line delta for a 1-based line of `text`."""
+        return self.shifts[max(0, bisect_right(self.new_lines, line - 1) - 1)][1]
+
+
+def _prefilter(text: str, kinds: frozenset[str] | None, needles: tuple[str, ...]) -> _Prefiltered | None:
+    """Keep the segments that pass the kind and substring tests; None if all are kept."""
+    bounds = _segment_bounds(text)
+    bounds.append(len(text))
+    folded = text.lower() if needles else text
+    pieces: list[str] = []
+    new_starts: list[int] = []
+    new_lines: list[int] = []
+    shifts: list[tuple[int, int]] = []
+    dropped_defines = False
+    pos = line = old_line = 0
+    prev_kept = False
+    for idx in range(len(bounds) - 1):
+        start, end = bounds[idx], bounds[idx + 1]
+        seg = text[start:end]
+        keep = (kinds is None or _segment_may_be(seg, kinds)) and (
+            not needles or any(n in folded[start:end] for n in needles)
+        )
+        if keep:
+            if not prev_kept:
+                new_starts.append(pos)
+                new_lines.append(line)
+                shifts.append((start - pos, old_line - line))
+            pieces.append(seg)
+            pos += len(seg)
+            line += seg.count("\n")
+        elif not dropped_defines and _segment_may_be(seg, frozenset(("define",))):
+            dropped_defines = True
+        old_line += seg.count("\n")
+        prev_kept = keep
+    if len(pieces) == len(bounds) - 1:
+        return None
+    if not pieces:
+        new_starts, new_lines, shifts = [0], [0], [(0, 0)]
+    return _Prefiltered("".join(pieces), new_starts, new_lines, shifts, dropped_defines)
+
+
+def _prefilter_needles(prefilter: bool | str | Iterable[str]) -> tuple[str, ...]:
+    if isinstance(prefilter, bool):
+        return ()
+    if isinstance(prefilter, str):
+        return (prefilter.lower(),)
+    return tuple(n.lower() for n in prefilter)
 
 
 # ============================================================
@@ -909,6 +1613,20 @@ def parse_policy_statements(
     error_mode: Literal["raise", "report", "ignore"] = "raise",
     default_tenancy_alias: str | None = None,
     default_identity_domain: str | None = None,
+    dedupe: bool = False,
+    intern: bool | InternPool = False,
+    timings: StatementTimings | None = None,
+    slow_threshold_ms: float | None = None,
+    isolate_errors: bool = False,
+    workers: int = 1,
+    define_symbols: Mapping[tuple[str, str], str] | SymbolTable | None = None,
+    define_symbols_win: bool = False,
+    prefilter: bool | str | Iterable[str] = False,
+    lazy_conditions: bool = False,
+    max_statement_bytes: int | None = None,
+    max_condition_depth: int | None = None,
+    max_tokens: int | None = None,
+    deadline: float | None = None,
 ) -> dict[str, Any] | tuple[dict[str, Any], dict[str, Any]]:
     """
     Parse one or more statements and return a payload with schema_version + statements.
@@ -932,6 +1650,88 @@ def parse_policy_statements(
       identity_domain to 'Domain' and label to 'Name'. If no explicit prefix is
       present and this argument is provided, we attach that identity domain for
       group/dynamic-group subjects.
+
+    dedupe:
+      When True, statements with the same canonical fingerprint (see
+      canonical.statement_fingerprint) are collapsed into the first occurrence,
+      which gets a "provenance" list of {"statement_index": n, "span": ...}.
+
+    return_filter:
+      Statement kinds to keep (a kind, or a list/set/tuple of kinds), or a dict with
+      optional "kinds", "fields" (top-level keys to keep; "kind" is always kept) and
+      "first_only" (keep only the first statement). Without dedupe/isolate_errors,
+      dropped kinds and fields are never shaped and first_only stops shaping early;
+      the document is still parsed in full, so syntax errors are raised or reported
+      as without a filter.
+
+    intern:
+      When True (or an InternPool to share across calls), identical subtrees of the
+      returned statements (subjects, actions, conditions and their clauses/values,
+      ...) are stored once and shared between statements. Statement dicts and spans
+      stay distinct; the shared subtrees must be treated as read-only.
+
+    timings / slow_threshold_ms:
+      When either is given, each statement's lex+parse and shaping time is measured.
+      Totals are recorded into `timings.histogram` (pass a StatementTimings to read
+      them back). Statements taking at least `slow_threshold_ms` are appended to
+      `timings.slow` with their statement_index, span and times, and logged as a
+      warning on the "oci_lexer_parser.timing" logger.
+
+    isolate_errors:
+      When True, each statement (cut at lines starting with a statement keyword) is
+      lexed and parsed on its own, so a malformed statement cannot swallow or corrupt
+      its neighbours. A statement with a syntax error is returned as {"kind": "unknown"}
+      (plus span/source_text with include_spans); in "report" mode its diagnostics
+      carry the 1-based "statement_index" of that entry. Well-formed documents give
+      the same result as a normal parse.
+
+    workers:
+      With isolate_errors, parse statements in this many worker processes (default 1:
+      in-process). Not supported together with timings/slow_threshold_ms.
+
+    prefilter:
+      When True, statements whose kind return_filter drops are skipped before they
+      reach ANTLR: a cheap scan of the statement starts (as for isolate_errors)
+      decides which to parse. A string or iterable of strings additionally keeps
+      only statements whose text contains one of them (case-insensitive), e.g. a
+      group name; the scan only drops line-start segments that contain none, and
+      each parsed statement is then matched on its own text (with isolate_errors,
+      a segment that fails to parse is kept as one "unknown" statement if it
+      matches). Skipped statements are not checked for syntax errors, even with
+      error_mode="raise". statement_index values are renumbered: diagnostics and
+      the slow-statement log count the statements of the parsed segments, dedupe
+      provenance the returned ones. Spans and lines stay document-relative.
+      DEFINE substitution still uses every DEFINE of the document.
+
+    lazy_conditions:
+      When True, WHERE clauses are skipped by the parser and each statement's
+      "conditions" is {"type": "lazy", "text": <clause text>, "nested_simplify": ...}
+      until statement_conditions() (per statement, on first access) or
+      materialize_conditions() builds the condition tree. Syntax errors are still
+      raised or reported as without it, and spans cover the whole statement.
+      Ignored with dedupe, which compares condition trees.
+
+    max_statement_bytes / max_condition_depth / max_tokens / deadline:
+      Parse budgets, checked as each token is lexed: the size of a statement, the
+      brace nesting of its WHERE clause (ANY/ALL groups), the number of tokens lexed
+      for the call, and a time.monotonic() value after which parsing stops (read
+      every 256 tokens, and per statement as it is parsed and shaped). When one
+      is exceeded the parse stops: "raise" raises ParseBudgetExceeded (a
+      ValueError with budget, limit, line and column); in "report"/"ignore" no
+      statements are returned and "report" gives a single diagnostic with
+      "budget" and "limit" keys. Not supported with workers > 1.
+
+    define_symbols:
+      With define_subs, extra DEFINE aliases: a flat build_symbols() mapping
+      {(type, name): ocid}, a SymbolTable (its tenancy-wide view) or a scoped
+      SymbolTable.view(policy=..., compartment=...). The document's own DEFINE
+      statements take precedence.
+
+    define_symbols_win:
+      Let define_symbols take precedence over the document's own DEFINEs instead,
+      for a table already built from a larger input that contains the document
+      (e.g. the CLI's --chunked --define-subs), so that a name defined twice
+      resolves to the input's last definition in every part of it.
     """
     # NEW: normalize here
     text = _normalize_text_input(text)
@@ -946,127 +1746,167 @@ def parse_policy_statements(
             return payload, {"errors": [], "error_count": 0}
         return payload
 
-    # 2) ANTLR pipeline
-    input_stream = InputStream(text)
-    lexer = PolicyStatementLexer(input_stream)
-    tokens = CommonTokenStream(lexer)
-    parser = P(tokens)
-    parser.removeErrorListeners()
-
-    listener: CollectingErrorListener | None = None
-
-    if error_mode == "raise":
-        parser._errHandler = BailErrorStrategy()
-        try:
-            doc = parser.statements()
-        except ParseCancellationException as ex:
-            tok = getattr(ex, "offendingToken", None)
-            if isinstance(tok, Token):
-                raise ValueError(f"syntax error at line {tok.line}, col {tok.column}.") from None
-            raise ValueError("syntax error while parsing.") from None
-        issues: list[SyntaxIssue] = []
-
-    elif error_mode == "report":
-        listener = CollectingErrorListener(text)
-        parser.addErrorListener(listener)
-        doc = parser.statements()
-        issues = listener.issues
-
-    else:
-        doc = parser.statements()
-        issues = []
-
-    # 3) Shape
-    out: list[dict[str, Any]] = []
-    for st in doc.statement():
-        a = st.allowStmt()
-        if a:
-            out.append(
-                _allow(
-                    a,
-                    include_spans,
-                    nested_simplify=nested_simplify,
-                    source_text=text,
-                )
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1; got {workers}")
+    timed = timings is not None or slow_threshold_ms is not None
+    if workers > 1 and (timed or not isolate_errors):
+        raise ValueError("workers > 1 requires isolate_errors=True and no timings/slow_threshold_ms.")
+    meter = budget_meter(
+        max_statement_bytes=max_statement_bytes,
+        max_condition_depth=max_condition_depth,
+        max_tokens=max_tokens,
+        deadline=deadline,
+        starters=_STATEMENT_START_TYPES,
+        where=P.WHERE,
+        lbrace=P.LBRACE,
+        rbrace=P.RBRACE,
+    )
+    if meter is not None and workers > 1:
+        raise ValueError("workers > 1 does not support max_statement_bytes/max_condition_depth/max_tokens/deadline.")
+
+    proj = _projection(return_filter, dedupe=dedupe)
+    # Dedupe fingerprints whole statements and numbers them in document order,
+    # so with it the filter can only run afterwards.
+    pushed_down = proj is not None and not isolate_errors and not dedupe
+    lazy_conditions = lazy_conditions and not dedupe
+    stmt_timings = (timings or StatementTimings()) if timed else None
+    slow_before = len(stmt_timings.slow) if stmt_timings is not None else 0
+    # Statements are interned as they are finished (6b), not after the whole list is built.
+    pool = intern if isinstance(intern, InternPool) else InternPool() if intern else None
+
+    try:
+        # 1b) Prefilter: statements the filter drops never reach ANTLR
+        pre: _Prefiltered | None = None
+        defines: list[dict[str, Any]] | None = None
+        needles: tuple[str, ...] = ()
+        if prefilter:
+            kinds = proj.kinds if proj is not None and proj.kinds is not None and "unknown" not in proj.kinds else None
+            needles = _prefilter_needles(prefilter)
+            if kinds is not None or needles:
+                pre = _prefilter(text, kinds, needles)
+            if pre is not None and define_subs and pre.dropped_defines:
+                # Substitution still sees every DEFINE of the document.
+                only_defines = _prefilter(text, frozenset(("define",)), ())
+                defines_text = only_defines.text if only_defines else text
+                if meter is not None:
+                    meter.line_shift = only_defines.line_shift if only_defines else None
+                defines = _document_defines(_run_parser(defines_text, "ignore", tokens=_token_stream(defines_text, meter))[0])
+        parse_text = pre.text if pre is not None else text
+        if meter is not None:
+            meter.line_shift = pre.line_shift if pre is not None else None
+
+        if not parse_text.strip():
+            # Every statement was skipped
+            out, errors = [], []
+        elif isolate_errors:
+            # 2-3) Per-statement parse + shape
+            out, errors = _parse_isolated(
+                parse_text,
+                error_mode=error_mode,
+                include_spans=include_spans,
+                nested_simplify=nested_simplify,
+                workers=workers,
+                timings=stmt_timings,
+                slow_threshold_ms=slow_threshold_ms,
+                lazy_conditions=lazy_conditions,
+                meter=meter,
+                needles=needles,
             )
-            continue
-        d = st.defineStmt()
-        if d:
-            out.append(_define(d, include_spans, source_text=text))
-            continue
-        m = st.admitStmt()
-        if m:
-            out.append(
-                _admit(
-                    m,
-                    include_spans,
-                    nested_simplify=nested_simplify,
-                    source_text=text,
-                )
+            if pre is not None:
+                for e in errors:
+                    e["line"] += pre.line_shift(e["line"])
+            # 4) DEFINE subs, 5) default tenancy alias, 5b) subject normalization, 6b) interning
+            out = _finalize_statements(
+                out,
+                sym=(
+                    _merged_symbols(out if defines is None else defines, define_symbols, define_symbols_win)
+                    if define_subs
+                    else None
+                ),
+                default_tenancy_alias=default_tenancy_alias,
+                default_identity_domain=default_identity_domain,
+                pool=pool,
             )
-            continue
-        e = st.endorseStmt()
-        if e:
-            out.append(
-                _endorse(
-                    e,
-                    include_spans,
-                    nested_simplify=nested_simplify,
-                    source_text=text,
+        else:
+            timer: StatementTimer | None = None
+            if stmt_timings is not None:
+                timer = StatementTimer(stmt_timings, P.RULE_statement, slow_threshold_ms)
+
+            # 2) ANTLR pipeline
+            line_shift = pre.line_shift if pre is not None else None
+            lazy: _LazyWhere | None = None
+            tokens = _token_stream(parse_text, meter) if meter is not None else None
+            if lazy_conditions:
+                doc, issues, lazy = _run_parser_lazy(
+                    parse_text, error_mode, timer, line_shift, nested_simplify=nested_simplify, tokens=tokens
+                )
+            else:
+                doc, issues = _run_parser(parse_text, error_mode, timer, line_shift, tokens)
+            if pre is not None:
+                issues = [i.shifted(pre.line_shift(i.line)) for i in issues]
+            errors = [i.to_dict() for i in issues]
+
+            # 3) Shape, fused with 4) DEFINE subs, 5) default tenancy alias, 5b) subject
+            # normalization, 6) filter / project (only kept kinds and fields are
+            # shaped) and 6b) interning. Substitution needs every DEFINE of the document (they may
+            # follow their uses), so those are shaped up front.
+            if define_subs:
+                sym = _merged_symbols(
+                    _document_defines(doc) if defines is None else defines, define_symbols, define_symbols_win
                 )
+            else:
+                sym = None
+            out = _shape_statements(
+                doc,
+                parse_text,
+                include_spans=include_spans,
+                nested_simplify=nested_simplify,
+                timer=timer,
+                finish=_finisher(
+                    sym=sym,
+                    default_tenancy_alias=default_tenancy_alias,
+                    default_identity_domain=default_identity_domain,
+                    pool=pool,
+                ),
+                proj=proj if pushed_down else None,
+                lazy=lazy,
+                needles=needles,
+                deadline=deadline_source(tokens.tokenSource) if tokens is not None else None,
             )
-            continue
-        node: dict[str, Any] = {"kind": "unknown"}
-        if include_spans:
-            node["span"] = ctx_span(st)
-            node["source_text"] = span_source(text, node["span"])
-        out.append(node)
-
-    # 4) DEFINE subs (if any)
-    if define_subs:
-        sym = build_symbols(out, form="flat")
-        if sym:
-            out = _apply_define_subs(out, sym)
+            if lazy is not None and stmt_timings is not None:
+                for item in stmt_timings.slow[slow_before:]:
+                    item.span = lazy.extend_span(item.span)
+
+    except ParseBudgetExceeded as ex:
+        # A budget stopped the parse: no statements, one diagnostic
+        if error_mode == "raise":
+            raise
+        payload = {"schema_version": STATEMENT_SCHEMA_VERSION, "statements": []}
+        if error_mode == "report":
+            return payload, {"errors": [_budget_error(text, ex)], "error_count": 1}
+        return payload
 
-    # 5) Inject default tenancy alias into location "IN TENANCY" if requested
-    if default_tenancy_alias:
-        _inject_default_tenancy_alias_in_location(out, default_tenancy_alias)
+    if pre is not None:
+        for st in out:
+            if "span" in st:
+                st["span"] = pre.rebase_span(st["span"])
+        if stmt_timings is not None:
+            for item in stmt_timings.slow[slow_before:]:
+                item.span = pre.rebase_span(item.span)
 
-    # 5b) V1 subject normalization: turn subject.values into structured objects
-    _normalize_subject_values(out, default_identity_domain)
+    # 5c) Collapse identical statements (before filtering so indices stay document-relative)
+    if dedupe:
+        out = dedupe_statements(out)
 
     # 6) Filter / project
-    if return_filter is not None:
-        allowed_kinds: set[str] | None = None
-        fields: set[str] | None = None
-        first_only = False
-
-        if isinstance(return_filter, str):
-            allowed_kinds = {return_filter.lower()}
-        elif isinstance(return_filter, (list, set, tuple)):
-            allowed_kinds = {str(x).lower() for x in return_filter}
-        elif isinstance(return_filter, dict):
-            kinds = return_filter.get("kinds")
-            if kinds is not None:
-                allowed_kinds = {str(x).lower() for x in kinds}
-            f = return_filter.get("fields")
-            if f is not None:
-                fields = set(f)
-                fields.add("kind")
-            first_only = bool(return_filter.get("first_only", False))
-
-        if allowed_kinds is not None:
-            out = [s for s in out if s.get("kind") in allowed_kinds]
-        if fields is not None:
-            out = [{k: v for k, v in s.items() if k in fields} for s in out]
-        if first_only and out:
-            out = [out[0]]
+    if proj is not None and not pushed_down:
+        out = _project_statements(out, proj)
 
     payload = {"schema_version": STATEMENT_SCHEMA_VERSION, "statements": out}
 
     # 7) Diagnostics for "report"
     if error_mode == "report":
-        diags = {"errors": [asdict(i) for i in issues], "error_count": len(issues)}
+        diags = {"errors": errors, "error_count": len(errors)}
         return payload, diags
 
     return payload
@@ -1076,3 +1916,30 @@ def parse_policy_statement(
     text: TextInput, **kwargs: Any
 ) -> dict[str, Any] | tuple[dict[str, Any], dict[str, Any]]:
     return parse_policy_statements(text, **kwargs)
+
+
+def statement_conditions(stmt: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    The "conditions" of a statement from parse_policy_statements(). A lazy WHERE
+    clause (lazy_conditions=True) is parsed on first access and the tree is
+    stored back into the statement.
+    """
+    cond = stmt.get("conditions")
+    if cond is not None and cond.get("type") == "lazy":
+        cond = stmt["conditions"] = _materialize_where(cond)
+    return cond
+
+
+def materialize_conditions(stmts: dict[str, Any] | Iterable[dict[str, Any]]) -> int:
+    """
+    Build the condition tree of every lazy WHERE clause, in place, in a payload
+    or a list of statements. Returns how many clauses were parsed.
+    """
+    items = stmts["statements"] if isinstance(stmts, dict) else stmts
+    n = 0
+    for st in items:
+        cond = st.get("conditions")
+        if cond is not None and cond.get("type") == "lazy":
+            statement_conditions(st)
+            n += 1
+    return n
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import re
-from typing import Any
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, TypeVar
 from antlr4 import ParserRuleContext, Token
 
 _INVALID_ASCII = re.compile(r"[^\t\r\n\x20-\x7E]")
@@ -41,64 +42,79 @@ def span_source(text: str, span: dict[str, int]) -> str:
     return text[start : stop + 1]
 
 
-def split_rules_by_newline_preserving_groups(text: str) -> list[str]:
+# Rule splitting scans only the characters that matter: a whole single-quoted
+# string (backslash escapes any character, newlines included) is one match,
+# and so is each brace or line break. An opening quote that is not closed in
+# the current chunk matches alone, and the rest of the chunk is string body.
+_SPLIT_SCAN_RE = re.compile(r"'[^'\\]*(?:\\.[^'\\]*)*'|[{}\r\n']", re.DOTALL)
+# Continuation of an open string: its body up to and including the closing quote, if any.
+_STR_TAIL_RE = re.compile(r"[^'\\]*(?:\\.[^'\\]*)*(')?", re.DOTALL)
+
+
+def iter_rules_by_newline_preserving_groups(chunks: Iterable[str]) -> Iterator[str]:
     """
-    Split by newline, but do not split inside braces or single-quoted strings.
+    Streaming split_rules_by_newline_preserving_groups(): `chunks` are
+    concatenated as-is (e.g. lines read from a file, line endings included) and
+    rules are yielded as soon as the line break that ends them is seen.
     """
-    chunks: list[str] = []
     depth = 0
     in_str = False
     esc = False
+    pending: list[str] = []  # text of the current rule from earlier chunks
 
-    start = 0
-    i = 0
-    n = len(text)
-
-    while i < n:
-        ch = text[i]
-
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pos = 0
         if in_str:
             if esc:
                 esc = False
-            elif ch == "\\":
-                esc = True
-            elif ch == "'":
-                in_str = False
-            i += 1
-            continue
-
-        if ch == "'":
-            in_str = True
-            i += 1
-            continue
-
-        if ch == "{":
-            depth += 1
-            i += 1
-            continue
-        if ch == "}":
-            depth = max(0, depth - 1)
-            i += 1
-            continue
-
-        if (ch == "\n" or ch == "\r") and depth == 0:
-            chunk = text[start:i].strip()
-            if chunk:
-                chunks.append(chunk)
-            if ch == "\r" and i + 1 < n and text[i + 1] == "\n":
-                i += 2
-            else:
-                i += 1
-            start = i
-            continue
+                pos = 1
+            m = _STR_TAIL_RE.match(chunk, pos)
+            pos = m.end()
+            if m.group(1) is None:
+                # Still inside the string; a trailing backslash escapes the next chunk's first character.
+                esc = pos < len(chunk)
+                pending.append(chunk)
+                continue
+            in_str = False
 
-        i += 1
+        start = 0
+        for m in _SPLIT_SCAN_RE.finditer(chunk, pos):
+            ch = m.group()
+            if ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth = max(0, depth - 1)
+            elif ch == "\n" or ch == "\r":
+                if depth == 0:
+                    rule = chunk[start : m.start()]
+                    if pending:
+                        rule = "".join(pending) + rule
+                        pending.clear()
+                    rule = rule.strip()
+                    if rule:
+                        yield rule
+                    start = m.end()
+            elif ch == "'":
+                # Unterminated in this chunk: the rest of it is string body.
+                in_str = True
+                tail = _STR_TAIL_RE.match(chunk, m.end())
+                esc = tail.end() < len(chunk)
+                break
+        pending.append(chunk[start:])
 
-    tail = text[start:].strip()
+    tail = "".join(pending).strip()
     if tail:
-        chunks.append(tail)
+        yield tail
 
-    return chunks
+
+def split_rules_by_newline_preserving_groups(text: str | Iterable[str]) -> list[str]:
+    """
+    Split by newline, but do not split inside braces or single-quoted strings.
+    `text` may also be an iterable of chunks (see iter_rules_by_newline_preserving_groups).
+    """
+    return list(iter_rules_by_newline_preserving_groups((text,) if isinstance(text, str) else text))
 
 
 def simplify_group_tree(node: dict[str, Any], *, collapse_single: bool) -> dict[str, Any]:
@@ -146,3 +162,280 @@ def simplify_group_tree(node: dict[str, Any], *, collapse_single: bool) -> dict[
         return child
 
     return node
+
+
+# ============================================================
+# Diagnostics (shared by the policy and DG error listeners)
+# ============================================================
+
+# Line breaks as str.splitlines() sees them in (validated) ASCII text.
+_LINE_BREAK_RE = re.compile(r"\r\n|\r|\n")
+
+
+class LineIndex:
+    """
+    Line start offsets of a source text, built on first use.
+
+    One index is shared by every diagnostic of a parse, so a clean parse never
+    scans the text for lines and a dirty one scans it once; line text is only
+    sliced out for diagnostics that are actually rendered.
+    """
+
+    __slots__ = ("text", "_starts", "_count")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._starts: list[int] | None = None
+        self._count = 0
+
+    def _build(self) -> list[int]:
+        text = self.text
+        starts = [0]
+        starts.extend(m.end() for m in _LINE_BREAK_RE.finditer(text))
+        # As with splitlines(), a trailing line break does not open another line.
+        if starts[-1] == len(text):
+            self._count = len(starts) - 1
+        else:
+            self._count = len(starts)
+            starts.append(len(text))
+        self._starts = starts
+        return starts
+
+    @property
+    def line_count(self) -> int:
+        if self._starts is None:
+            self._build()
+        return self._count
+
+    def offset(self, line: int, column: int) -> int:
+        """Absolute offset of 1-based `line` / 0-based `column` (clamped to the text)."""
+        starts = self._starts if self._starts is not None else self._build()
+        return starts[max(0, min(line - 1, self._count))] + max(0, column)
+
+    def line_text(self, line: int) -> str | None:
+        """Text of 1-based `line` without its line break, or None when out of range."""
+        starts = self._starts if self._starts is not None else self._build()
+        if not 1 <= line <= self._count:
+            return None
+        s = self.text[starts[line - 1] : starts[line]]
+        if s.endswith("\r\n"):
+            return s[:-2]
+        if s.endswith("\n") or s.endswith("\r"):
+            return s[:-1]
+        return s
+
+
+# (literalNames, symbolicNames) of a generated recognizer
+Vocabulary = tuple[Sequence[str | None], Sequence[str | None]]
+
+
+def token_names(vocab: Vocabulary, types: Sequence[int]) -> list[str]:
+    """Display names of token types: the literal ("'allow'") if any, else the symbolic name."""
+    lit, sym = vocab
+    names: list[str] = []
+    for ttype in types:
+        if ttype == Token.EOF:
+            names.append("<EOF>")
+            continue
+        name = None
+        if 0 <= ttype < len(lit) and lit[ttype] not in (None, "<INVALID>"):
+            name = lit[ttype]
+        elif 0 <= ttype < len(sym) and sym[ttype] not in (None, "<INVALID>"):
+            name = sym[ttype]
+        if name:
+            names.append(name)
+    return names
+
+
+def _expected_tokens(atn: Any, state: int, chain: Sequence[int]) -> tuple[int, ...]:
+    """
+    ATN.getExpectedTokens() for `state` and an invoking-state chain, computed
+    from uncached follow sets: the runtime's cached per-state sets can be grown
+    in place by DefaultErrorStrategy.sync(), which would make a memoized
+    answer depend on earlier parses.
+    """
+    following = atn.nextTokensInContext(atn.states[state], None)
+    expected = set(t for r in (following.intervals or ()) for t in r)
+    for invoking in chain:
+        if Token.EPSILON not in expected:
+            break
+        expected.discard(Token.EPSILON)
+        follow_state = atn.states[invoking].transitions[0].followState
+        following = atn.nextTokensInContext(follow_state, None)
+        expected.update(t for r in (following.intervals or ()) for t in r)
+    if Token.EPSILON in expected:
+        expected.discard(Token.EPSILON)
+        expected.add(Token.EOF)
+    return tuple(sorted(expected))
+
+
+class ExpectedTokensCache:
+    """
+    Memo for recognizer.getExpectedTokens().
+
+    The expected set depends only on the parser's ATN state and the chain of
+    invoking states of its rule context (what ATN.getExpectedTokens() walks),
+    so that pair is the key. Inputs with systematic errors hit the same few
+    keys over and over. Keep one cache per grammar; values are token-type
+    tuples. The memo is cleared when it reaches `maxsize` entries.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_memo")
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memo: dict[tuple[int, tuple[int, ...]], tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def lookup(self, recognizer: Any) -> tuple[int, ...]:
+        chain: list[int] = []
+        ctx = recognizer._ctx
+        while ctx is not None and ctx.invokingState >= 0:
+            chain.append(ctx.invokingState)
+            ctx = ctx.parentCtx
+        key = (recognizer.state, tuple(chain))
+
+        types = self._memo.get(key)
+        if types is not None:
+            self.hits += 1
+            return types
+
+        self.misses += 1
+        types = _expected_tokens(recognizer._interp.atn, key[0], chain)
+        if len(self._memo) >= self.maxsize:
+            self._memo.clear()
+        self._memo[key] = types
+        return types
+
+
+_IssueT = TypeVar("_IssueT", bound="LazySyntaxIssue")
+
+
+class LazySyntaxIssue:
+    """
+    Compact record of one syntax error: position, message, offending text and
+    the expected token types. `expected`, `line_text` and `caret` are derived on
+    access (and by to_dict()) from the shared LineIndex and vocabulary.
+
+    `line` is the reported line and may be shifted (see shifted()) when the
+    parsed text was a slice of a larger document; line text is still looked up
+    at the original line of the parsed slice.
+    """
+
+    __slots__ = ("line", "column", "message", "offending", "_types", "_vocab", "_lines", "_src_line")
+
+    def __init__(
+        self,
+        line: int,
+        column: int,
+        message: str,
+        offending: str | None,
+        types: Sequence[int],
+        vocab: Vocabulary | None,
+        lines: LineIndex | None,
+    ) -> None:
+        self.line = line
+        self.column = column
+        self.message = message
+        self.offending = offending
+        self._types = types
+        self._vocab = vocab
+        self._lines = lines
+        self._src_line = line
+
+    @property
+    def expected(self) -> list[str] | None:
+        if not self._types or self._vocab is None:
+            return None
+        return token_names(self._vocab, self._types) or None
+
+    @property
+    def line_text(self) -> str | None:
+        return self._lines.line_text(self._src_line) if self._lines is not None else None
+
+    @property
+    def caret(self) -> str | None:
+        if self.line_text is None:
+            return None
+        return (" " * self.column) + "^"
+
+    def shifted(self: _IssueT, lines: int) -> _IssueT:
+        """Copy of this issue reported `lines` further down."""
+        cls = type(self)
+        other = cls.__new__(cls)
+        for klass in cls.__mro__:
+            for name in getattr(klass, "__slots__", ()):
+                setattr(other, name, getattr(self, name))
+        other.line = self.line + lines
+        return other
+
+    def to_dict(self) -> dict[str, Any]:
+        """Diagnostics JSON item; subclasses add their own index field."""
+        return {
+            "line": self.line,
+            "column": self.column,
+            "message": self.message,
+            "offending": self.offending,
+            "expected": self.expected,
+            "line_text": self.line_text,
+            "caret": self.caret,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LazySyntaxIssue):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class InternPool:
+    """
+    Hash-consing pool for JSON-like subtrees (dicts, lists, strings, numbers).
+
+    intern() returns an object equal to its argument; equal subtrees passed to
+    the same pool come back as the *same* object, so repeated condition clauses,
+    typed values and subjects are stored once. Interned subtrees are shared and
+    must be treated as read-only.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self) -> None:
+        self._table: dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def intern(self, obj: Any) -> Any:
+        if isinstance(obj, str):
+            return self._table.setdefault(obj, obj)
+        if isinstance(obj, dict):
+            vals: Any = [(k, self.intern(v)) for k, v in obj.items()]
+            key: Any = ("d", *((k, _ref(v)) for k, v in vals))
+        elif isinstance(obj, list):
+            vals = [self.intern(v) for v in obj]
+            key = ("l", *map(_ref, vals))
+        else:
+            return obj
+
+        shared = self._table.get(key)
+        if shared is None:
+            shared = self._table[key] = dict(vals) if key[0] == "d" else vals
+        return shared
+
+
+def _ref(obj: Any) -> Any:
+    """
+    Key of an interned child: strings, dicts and lists are unique per pool (and
+    kept alive by it), so their identity stands for their structure.
+    bool/int/float/None keep their type so True != 1 here.
+    """
+    if isinstance(obj, (str, dict, list)):
+        return id(obj)
+    return type(obj), obj
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .canonical import _digest, canonicalize_statement, identity_key
+
+# ============================================================
+# Semantic diff between two parsed policy snapshots
+# ============================================================
+#
+# Statements are compared by the hash of their canonical form (see
+# canonical.py), so whitespace, spans, keyword case and condition item order
+# never show up as changes. Statements that only exist on one side are paired
+# by identity_key() (same kind/subject/resources/location/...): a pair is
+# "modified", anything left over is "added" or "removed". Everything is done
+# with hash maps in a single pass per side.
+
+PolicyInput = dict[str, Any] | tuple[dict[str, Any], dict[str, Any]] | list[dict[str, Any]]
+PathLike = str | os.PathLike[str]
+
+
+def _statements_of(obj: PolicyInput) -> list[dict[str, Any]]:
+    if isinstance(obj, tuple):
+        obj = obj[0]
+    if isinstance(obj, dict):
+        stmts = obj.get("statements")
+        if not isinstance(stmts, list):
+            raise TypeError("payload has no 'statements' list")
+        return stmts
+    if isinstance(obj, list):
+        return obj
+    raise TypeError(f"expected a payload or a list of statements; got {type(obj).__name__}")
+
+
+def _keys(stmt: dict[str, Any]) -> tuple[str, str]:
+    canon = canonicalize_statement(stmt)
+    return _digest(canon), identity_key(canon)
+
+
+def diff_policies(old_payload: PolicyInput, new_payload: PolicyInput) -> dict[str, Any]:
+    """
+    Compare two parse results (payloads, (payload, diagnostics) tuples or
+    statement lists) and return:
+
+        {
+          "added":     [stmt, ...],                 # in new order
+          "removed":   [stmt, ...],                 # in old order
+          "modified":  [{"old": stmt, "new": stmt}, ...],
+          "unchanged": <count>,
+        }
+
+    Duplicate statements are matched one-to-one, so a statement that appears
+    twice in `old` and once in `new` is reported as removed once.
+    """
+    old_stmts = _statements_of(old_payload)
+    new_stmts = _statements_of(new_payload)
+
+    old_keys = [_keys(st) for st in old_stmts]
+    remaining = Counter(h for h, _ in old_keys)
+
+    unchanged = 0
+    new_only: list[tuple[int, str]] = []
+    for idx, st in enumerate(new_stmts):
+        h, ident = _keys(st)
+        if remaining[h] > 0:
+            remaining[h] -= 1
+            unchanged += 1
+        else:
+            new_only.append((idx, ident))
+
+    # Old statements that were not matched, in old order, grouped by identity.
+    removed_by_ident: dict[str, deque[int]] = {}
+    for idx, (h, ident) in enumerate(old_keys):
+        if remaining[h] > 0:
+            remaining[h] -= 1
+            removed_by_ident.setdefault(ident, deque()).append(idx)
+
+    added: list[dict[str, Any]] = []
+    modified: list[dict[str, Any]] = []
+    paired: set[int] = set()
+    for idx, ident in new_only:
+        candidates = removed_by_ident.get(ident)
+        if candidates:
+            old_idx = candidates.popleft()
+            paired.add(old_idx)
+            modified.append({"old": old_stmts[old_idx], "new": new_stmts[idx]})
+        else:
+            added.append(new_stmts[idx])
+
+    removed = [
+        old_stmts[idx]
+        for idx in sorted(i for q in removed_by_ident.values() for i in q)
+        if idx not in paired
+    ]
+    return {"added": added, "removed": removed, "modified": modified, "unchanged": unchanged}
+
+
+# ============================================================
+# Streaming variant for CLI JSONL output
+# ============================================================
+
+
+def _iter_jsonl(path: PathLike) -> Iterator[tuple[str, dict[str, Any]]]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield line, json.loads(line)
+
+
+def iter_policy_diff_jsonl(old_path: PathLike, new_path: PathLike) -> Iterator[dict[str, Any]]:
+    """
+    Diff two JSONL files as written by `oci-lexer-parse --jsonl` without loading
+    either snapshot into memory.
+
+    Yields change records:
+        {"change": "removed",  "statement": {...}}
+        {"change": "modified", "old": {...}, "new": {...}}
+        {"change": "added",    "statement": {...}}
+    Removed and modified records come first (in old order), then added records
+    (in new order).
+
+    Memory is one small digest per distinct old statement plus the changed
+    statements themselves; the old file is read twice.
+    """
+    # Pass 1: count old statements by hash.
+    remaining: Counter[str] = Counter()
+    ident_of: dict[str, str] = {}
+    for _, st in _iter_jsonl(old_path):
+        h, ident = _keys(st)
+        remaining[h] += 1
+        ident_of[h] = ident
+
+    # Pass 2: match new statements; keep only the unmatched ones.
+    new_only: list[tuple[str, str]] = []  # (identity, raw line)
+    for line, st in _iter_jsonl(new_path):
+        h, ident = _keys(st)
+        if remaining[h] > 0:
+            remaining[h] -= 1
+        else:
+            new_only.append((ident, line))
+
+    # Pair unmatched new statements with unmatched old ones of the same identity.
+    removed_count: Counter[str] = Counter()
+    for h, n in remaining.items():
+        if n > 0:
+            removed_count[ident_of[h]] += n
+    pending_new: dict[str, deque[str]] = {}
+    added_lines: list[str] = []
+    for ident, line in new_only:
+        if removed_count[ident] > 0:
+            removed_count[ident] -= 1
+            pending_new.setdefault(ident, deque()).append(line)
+        else:
+            added_lines.append(line)
+
+    # Pass 3: re-read old and emit its unmatched statements.
+    for _, st in _iter_jsonl(old_path):
+        h, ident = _keys(st)
+        if remaining[h] <= 0:
+            continue
+        remaining[h] -= 1
+        queue = pending_new.get(ident)
+        if queue:
+            yield {"change": "modified", "old": st, "new": json.loads(queue.popleft())}
+        else:
+            yield {"change": "removed", "statement": st}
+
+    for line in added_lines:
+        yield {"change": "added", "statement": json.loads(line)}
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import cProfile
+import gc
+import os
+import pstats
+import sys
+import tracemalloc
+from typing import Literal, TextIO
+
+# ============================================================
+# CLI profiling (--profile cpu|mem)
+# ============================================================
+#
+# The CLI creates one profiler per run, calls start() before reading input,
+# after_parse() once parsing is done (before output is written) and stop() at
+# the end. The CPU profiler writes a pstats dump and prints self time grouped
+# into lexer / parser / shaping / json / io / other; the memory profiler
+# writes a tracemalloc snapshot diff taken around parsing.
+
+ProfileKind = Literal["cpu", "mem"]
+
+DEFAULT_PROFILE_OUT = {"cpu": "oci-lexer-parse.prof", "mem": "oci-lexer-parse.memdiff.txt"}
+
+_PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+_GEN_DIR = os.path.join(_PKG_DIR, "grammar", "gen")
+
+# ANTLR runtime modules that belong to lexing (token production and buffering).
+_LEXER_RUNTIME = frozenset(
+    ("InputStream.py", "BufferedTokenStream.py", "CommonTokenStream.py", "CommonTokenFactory.py", "Token.py")
+)
+_JSON_FUNCS = ("_json_dumps", "_emit_jsonl", "_emit_statements_jsonl_or_array", "_emit_rules_jsonl_or_array")
+
+
+def categorize(filename: str, funcname: str) -> str:
+    """Bucket a profiled function into lexer / parser / shaping / json / io / other."""
+    base = os.path.basename(filename)
+    if filename.startswith(_GEN_DIR):
+        return "lexer" if "Lexer" in base else "parser"
+    if f"{os.sep}antlr4{os.sep}" in filename:
+        return "lexer" if "Lexer" in base or base in _LEXER_RUNTIME else "parser"
+    if f"{os.sep}json{os.sep}" in filename or "_json" in funcname or funcname in _JSON_FUNCS:
+        return "json"
+    if filename.startswith(_PKG_DIR):
+        return "io" if base == "cli.py" else "shaping"
+    if "_io." in funcname or "'write'" in funcname or "'read" in funcname:
+        return "io"
+    return "other"
+
+
+class Profiler:
+    """No-op profiler; also the interface the CLI calls."""
+
+    def start(self) -> None:
+        pass
+
+    def after_parse(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class CpuProfiler(Profiler):
+    def __init__(self, out_path: str, report: TextIO) -> None:
+        self.out_path = out_path
+        self.report = report
+        self._prof = cProfile.Profile()
+
+    def start(self) -> None:
+        self._prof.enable()
+
+    def stop(self) -> None:
+        self._prof.disable()
+        self._prof.dump_stats(self.out_path)
+
+        st = pstats.Stats(self._prof)
+        totals: dict[str, float] = {}
+        for (filename, _line, funcname), (_cc, _nc, tt, _ct, _callers) in st.stats.items():  # type: ignore[attr-defined]
+            cat = categorize(filename, funcname)
+            totals[cat] = totals.get(cat, 0.0) + tt
+        grand = sum(totals.values()) or 1.0
+
+        w = self.report.write
+        w(f"CPU profile written to {self.out_path} (load with pstats or snakeviz)\n")
+        w(f"{'group':<10}{'self s':>10}{'share':>9}\n")
+        for cat in ("lexer", "parser", "shaping", "json", "io", "other"):
+            secs = totals.get(cat, 0.0)
+            w(f"{cat:<10}{secs:>10.3f}{secs / grand:>9.1%}\n")
+        w(f"{'total':<10}{grand:>10.3f}\n")
+
+
+class MemoryProfiler(Profiler):
+    def __init__(self, out_path: str, report: TextIO, *, frames: int = 1, top: int = 10) -> None:
+        self.out_path = out_path
+        self.report = report
+        self.frames = frames
+        self.top = top
+        self._before: tracemalloc.Snapshot | None = None
+        self._after: tracemalloc.Snapshot | None = None
+        self._peak = 0
+
+    def start(self) -> None:
+        gc.collect()
+        tracemalloc.start(self.frames)
+        self._before = tracemalloc.take_snapshot()
+
+    def after_parse(self) -> None:
+        self._snapshots("after_parse")
+
+    def _snapshots(self, caller: str) -> tuple[tracemalloc.Snapshot, tracemalloc.Snapshot]:
+        """The (before, after parsing) snapshots; takes the second one on first call."""
+        before = self._before
+        if before is None:
+            raise RuntimeError(f"{caller}() called before start()")
+        if self._after is None:
+            self._after = tracemalloc.take_snapshot()
+            self._peak = tracemalloc.get_traced_memory()[1]
+        return before, self._after
+
+    def stop(self) -> None:
+        before_snapshot, after_snapshot = self._snapshots("stop")
+        tracemalloc.stop()
+
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+        before = before_snapshot.filter_traces(filters)
+        after = after_snapshot.filter_traces(filters)
+        by_file = after.compare_to(before, "filename")
+        by_line = after.compare_to(before, "lineno")
+        retained = sum(d.size_diff for d in by_file)
+
+        with open(self.out_path, "w", encoding="utf-8") as fh:
+            fh.write("# tracemalloc diff: after parsing vs. before reading input\n")
+            fh.write(f"# retained: {retained:,} B   peak: {self._peak:,} B\n\n")
+            fh.write("## by file\n")
+            for d in by_file:
+                if d.size_diff:
+                    fh.write(f"{d}\n")
+            fh.write("\n## by line\n")
+            for d in by_line:
+                if d.size_diff:
+                    fh.write(f"{d}\n")
+
+        w = self.report.write
+        w(f"Memory profile written to {self.out_path}\n")
+        w(f"retained after parse: {retained:,} B   peak: {self._peak:,} B\n")
+        for d in by_line[: self.top]:
+            w(f"  {d}\n")
+
+
+def make_profiler(kind: ProfileKind | None, out_path: str | None) -> Profiler:
+    if kind is None:
+        return Profiler()
+    path = out_path or DEFAULT_PROFILE_OUT[kind]
+    if kind == "cpu":
+        return CpuProfiler(path, sys.stderr)
+    if kind == "mem":
+        return MemoryProfiler(path, sys.stderr)
+    raise ValueError(f"unknown profile kind: {kind!r}")
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Any, TypeVar
+
+from antlr4 import InputStream, Lexer, Parser, Token, TokenStream
+from antlr4.atn.ATN import ATN
+from antlr4.atn.ATNDeserializer import ATNDeserializer
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.dfa.DFA import DFA
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+from antlr4.IntervalSet import IntervalSet
+from antlr4.PredictionContext import PredictionContextCache
+
+# ============================================================
+# Lexer / parser construction (thread-safe parsing mode)
+# ============================================================
+#
+# A generated recognizer class keeps its ATN, its DFA cache (decisionsToDFA)
+# and, for parsers, its prediction-context cache at class level. Every instance
+# adds to the caches while it predicts and memoizes next-token sets on the ATN
+# states, and the runtime does not guard those updates. That is what makes warm
+# parses fast, but it is only safe from one thread at a time.
+#
+# With set_thread_safe_parsing(True), lexers and parsers built here get an ATN
+# deserialized for the current thread and an ATN simulator over caches owned by
+# that thread, so no state the runtime mutates is shared between threads. Each
+# thread warms its own caches, so the mode pays off with long-lived worker
+# threads.
+#
+# Parsers built here always recover with _RecoveryStrategy. The runtime's
+# DefaultErrorStrategy.sync() adds the recovery set to a memoized next-token
+# set in place at loop-back states, so a syntax error would change how later
+# parses (in any thread sharing the ATN) recover.
+
+L = TypeVar("L", bound=Lexer)
+R = TypeVar("R", bound=Parser)
+
+_thread_safe = False
+_local = threading.local()
+
+
+_LOOP_BACK_STATES = (ATNState.PLUS_LOOP_BACK, ATNState.STAR_LOOP_BACK)
+
+
+class _RecoveryStrategy(DefaultErrorStrategy):
+    """DefaultErrorStrategy whose loop-back sync() leaves the ATN's next-token sets alone."""
+
+    def sync(self, recognizer: Parser) -> None:
+        if not self.inErrorRecoveryMode(recognizer):
+            s = recognizer._interp.atn.states[recognizer.state]
+            if s.stateType in _LOOP_BACK_STATES:
+                next_tokens = recognizer.atn.nextTokens(s)
+                if recognizer.getTokenStream().LA(1) not in next_tokens and Token.EPSILON not in next_tokens:
+                    # As the runtime does, but on a copy of the expected tokens:
+                    # without epsilon, getExpectedTokens() returns the memoized set.
+                    self.reportUnwantedToken(recognizer)
+                    expecting = IntervalSet()
+                    expecting.addSet(recognizer.getExpectedTokens())
+                    self.consumeUntil(recognizer, expecting.addSet(self.getErrorRecoverySet(recognizer)))
+                    return
+        super().sync(recognizer)
+
+
+def set_thread_safe_parsing(enabled: bool = True) -> None:
+    """
+    Give every thread its own ANTLR ATN, DFA and prediction-context caches (off
+    by default). Switch it on before parsing from several threads.
+    """
+    global _thread_safe
+    _thread_safe = enabled
+
+
+def thread_safe_parsing() -> bool:
+    return _thread_safe
+
+
+def _thread_caches(cls: type[Any]) -> tuple[ATN, list[DFA], PredictionContextCache]:
+    """The current thread's (ATN, decisionsToDFA, context cache) for recognizer class `cls`."""
+    caches: dict[type[Any], tuple[ATN, list[DFA], PredictionContextCache]] | None = getattr(_local, "caches", None)
+    if caches is None:
+        caches = _local.caches = {}
+    entry = caches.get(cls)
+    if entry is None:
+        # Generated modules expose the serialized ATN the class was built from.
+        atn = ATNDeserializer().deserialize(sys.modules[cls.__module__].serializedATN())
+        dfas = [DFA(ds, i) for i, ds in enumerate(atn.decisionToState)]
+        entry = caches[cls] = (atn, dfas, PredictionContextCache())
+    return entry
+
+
+def new_lexer(cls: type[L], text: str) -> L:
+    lexer = cls(InputStream(text))
+    if _thread_safe:
+        atn, dfas, _ = _thread_caches(cls)
+        lexer.atn = atn
+        lexer._interp = LexerATNSimulator(lexer, atn, dfas, PredictionContextCache())
+    return lexer
+
+
+def new_parser(cls: type[R], tokens: TokenStream) -> R:
+    parser = cls(tokens)
+    parser._errHandler = _RecoveryStrategy()
+    if _thread_safe:
+        atn, dfas, contexts = _thread_caches(cls)
+        parser.atn = atn
+        parser._interp = ParserATNSimulator(parser, atn, dfas, contexts)
+    return parser
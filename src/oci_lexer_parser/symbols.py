@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from collections import ChainMap
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+# ============================================================
+# Cross-policy DEFINE symbol table
+# ============================================================
+#
+# OCI scopes a DEFINE to the policy that contains it, but analyses resolve
+# aliases tenancy-wide. SymbolTable keeps every definition with the policy
+# (and compartment) it came from and answers lookups for a scope in layers:
+#
+#   1. the policy's own DEFINEs (last definition wins, as in build_symbols)
+#   2. DEFINEs of other policies in the same compartment
+#   3. tenancy-wide DEFINEs
+#
+# A name bound to different OCIDs in layer 2 or 3 is a conflict: it is not
+# resolved there (see conflicts()). The tenancy-wide layer is a plain dict kept
+# up to date per name as policies are added, replaced or removed, so a view for
+# a policy without DEFINEs of its own is that dict itself and substitution is a
+# single lookup per reference.
+
+SymbolKey = tuple[str, str]  # (type, name), e.g. ("group", "Admins")
+
+
+def iter_defines(stmts: Iterable[dict[str, Any]]) -> Iterator[tuple[str, str, str]]:
+    """(type, name, ocid) of every shaped DEFINE statement with a name."""
+    for st in stmts:
+        if st.get("kind") != "define":
+            continue
+        sym = st.get("symbol", {})
+        name = sym.get("name")
+        if isinstance(name, str) and name:
+            yield sym.get("type"), name, (st.get("def") or {}).get("value")
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolConflict:
+    type: str
+    name: str
+    # (policy, compartment, ocid) for every policy defining the name
+    definitions: tuple[tuple[str | None, str | None, str], ...]
+
+
+def _unique(ocids: Iterable[str]) -> str | None:
+    first: str | None = None
+    for oc in ocids:
+        if first is None:
+            first = oc
+        elif oc != first:
+            return None
+    return first
+
+
+class SymbolTable:
+    """
+    DEFINE aliases collected across many documents, scoped by policy and compartment.
+
+    Build it with add_statements() (one call per policy, with its parsed
+    statements) and pass view(policy=..., compartment=...) -- or the table
+    itself, for the tenancy-wide view -- to parse_policy_statements() as
+    `define_symbols`. add_statements() for a policy that is already present
+    replaces its definitions, so edited policies can be re-added in place.
+    """
+
+    def __init__(self) -> None:
+        # policy -> (compartment, {(type, name): ocid})
+        self._policies: dict[str | None, tuple[str | None, dict[SymbolKey, str]]] = {}
+        # (type, name) -> {policy: ocid}
+        self._where: dict[SymbolKey, dict[str | None, str]] = {}
+        # Unambiguous tenancy-wide bindings, maintained per key.
+        self._global: dict[SymbolKey, str] = {}
+        # compartment -> policies in it, and cached compartment layers
+        self._by_compartment: dict[str, set[str | None]] = {}
+        self._comp_layers: dict[str, dict[SymbolKey, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._where
+
+    def policies(self) -> list[str | None]:
+        return list(self._policies)
+
+    def add_statements(
+        self,
+        stmts: Iterable[dict[str, Any]],
+        *,
+        policy: str | None = None,
+        compartment: str | None = None,
+    ) -> int:
+        """Record the DEFINEs of one policy's statements; returns how many were seen."""
+        defs: dict[SymbolKey, str] = {}
+        count = 0
+        for t, name, ocid in iter_defines(stmts):
+            if isinstance(ocid, str) and ocid:
+                defs[(t, name)] = ocid
+                count += 1
+        self._set_policy(policy, compartment, defs)
+        return count
+
+    def define(self, type: str, name: str, ocid: str, *, policy: str | None = None, compartment: str | None = None) -> None:
+        """Add a single binding to `policy` (keeping its other definitions)."""
+        prev_comp, defs = self._policies.get(policy, (compartment, {}))
+        self._set_policy(policy, compartment if compartment is not None else prev_comp, {**defs, (type, name): ocid})
+
+    def remove_policy(self, policy: str | None) -> None:
+        if policy in self._policies:
+            self._set_policy(policy, None, {})
+            del self._policies[policy]
+
+    def _set_policy(self, policy: str | None, compartment: str | None, defs: dict[SymbolKey, str]) -> None:
+        old_comp, old = self._policies.get(policy, (None, {}))
+        self._policies[policy] = (compartment, defs)
+        if old_comp is not None:
+            self._by_compartment[old_comp].discard(policy)
+        if compartment is not None:
+            self._by_compartment.setdefault(compartment, set()).add(policy)
+        # Any change can move a key in or out of the tenancy-wide layer, which
+        # compartment layers are relative to.
+        self._comp_layers.clear()
+        for key in old.keys() - defs.keys():
+            where = self._where[key]
+            del where[policy]
+            if not where:
+                del self._where[key]
+            self._refresh(key)
+        for key, ocid in defs.items():
+            self._where.setdefault(key, {})[policy] = ocid
+            self._refresh(key)
+
+    def _refresh(self, key: SymbolKey) -> None:
+        where = self._where.get(key)
+        ocid = _unique(where.values()) if where else None
+        if ocid is None:
+            self._global.pop(key, None)
+        else:
+            self._global[key] = ocid
+
+    def _compartment_layer(self, compartment: str) -> dict[SymbolKey, str]:
+        layer = self._comp_layers.get(compartment)
+        if layer is None:
+            seen: dict[SymbolKey, str | None] = {}
+            for p in self._by_compartment.get(compartment, ()):
+                for key, ocid in self._policies[p][1].items():
+                    seen[key] = ocid if seen.get(key, ocid) == ocid else None
+            # Only what differs from the tenancy-wide layer (names it leaves unresolved).
+            layer = {k: v for k, v in seen.items() if v is not None and self._global.get(k) != v}
+            self._comp_layers[compartment] = layer
+        return layer
+
+    def view(self, *, policy: str | None = None, compartment: str | None = None) -> Mapping[SymbolKey, str]:
+        """
+        Flat {(type, name): ocid} mapping as seen from `policy` (compartment
+        defaults to the policy's own). Treat it as read-only; it reflects later
+        changes to the tenancy-wide layer.
+        """
+        own: dict[SymbolKey, str] = {}
+        if policy in self._policies:
+            comp, own = self._policies[policy]
+            compartment = compartment if compartment is not None else comp
+        layers: list[Mapping[SymbolKey, str]] = [own] if own else []
+        if compartment is not None:
+            comp_layer = self._compartment_layer(compartment)
+            if comp_layer:
+                layers.append(comp_layer)
+        if not layers:
+            return self._global
+        return ChainMap(*layers, self._global)
+
+    def resolve(self, type: str, name: str, *, policy: str | None = None, compartment: str | None = None) -> str | None:
+        return self.view(policy=policy, compartment=compartment).get((type, name))
+
+    def conflicts(self) -> list[SymbolConflict]:
+        """Names bound to more than one OCID across policies, in first-definition order."""
+        out: list[SymbolConflict] = []
+        for (t, name), where in self._where.items():
+            if _unique(where.values()) is None:
+                defs = tuple((p, self._policies[p][0], oc) for p, oc in where.items())
+                out.append(SymbolConflict(t, name, defs))
+        return out
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any
+
+from antlr4 import ParserRuleContext
+from antlr4.tree.Tree import ParseTreeListener
+
+from .parser_utils import ctx_span
+
+# ============================================================
+# Per-statement latency (timings= / slow_threshold_ms=)
+# ============================================================
+#
+# parse_policy_statements() and parse_dynamic_group_matching_rules() can time
+# every statement (rule) they produce: the ANTLR lex+parse time of the
+# statement and the time spent shaping its parse tree into JSON. Totals go
+# into an HDR-style histogram; statements slower than slow_threshold_ms are
+# kept in StatementTimings.slow and logged on the "oci_lexer_parser.timing"
+# logger at WARNING level.
+
+_log = logging.getLogger(__name__)
+
+_NS_PER_MS = 1_000_000
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram over integer nanoseconds.
+
+    Values are bucketed log-linearly: every power-of-two range is split into
+    the same number of linear sub-buckets, so any recorded value is reported
+    with at most ~10**-significant_digits relative error, whatever its
+    magnitude. Buckets are stored sparsely.
+    """
+
+    __slots__ = ("significant_digits", "_sub_bits", "_counts", "count", "total", "min", "max")
+
+    def __init__(self, significant_digits: int = 2) -> None:
+        if not 1 <= significant_digits <= 5:
+            raise ValueError(f"significant_digits must be between 1 and 5; got {significant_digits}")
+        self.significant_digits = significant_digits
+        self._sub_bits = (2 * 10**significant_digits - 1).bit_length()
+        self._counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self._sub_bits)
+        return (shift << self._sub_bits) | (value >> shift)
+
+    def _highest_equivalent(self, key: int) -> int:
+        shift = key >> self._sub_bits
+        sub = key & ((1 << self._sub_bits) - 1)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_ns: int) -> None:
+        if value_ns < 0:
+            raise ValueError(f"latency must be non-negative; got {value_ns}")
+        k = self._key(value_ns)
+        self._counts[k] = self._counts.get(k, 0) + 1
+        if not self.count or value_ns < self.min:
+            self.min = value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+        self.count += 1
+        self.total += value_ns
+
+    def merge(self, other: LatencyHistogram) -> None:
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("cannot merge histograms with different significant_digits")
+        if not other.count:
+            return
+        for k, c in other._counts.items():
+            self._counts[k] = self._counts.get(k, 0) + c
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, p: float) -> int:
+        """Smallest recorded-bucket value (ns) that at least `p` percent of samples do not exceed."""
+        if not 0.0 <= p <= 100.0:
+            raise ValueError(f"percentile must be in [0, 100]; got {p}")
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for k in sorted(self._counts):
+            seen += self._counts[k]
+            if seen >= rank:
+                return min(self._highest_equivalent(k), self.max)
+        return self.max  # pragma: no cover
+
+    def summary(self) -> dict[str, Any]:
+        """Count plus min/mean/p50/p90/p99/p99.9/max in milliseconds."""
+        ms = _NS_PER_MS
+        return {
+            "count": self.count,
+            "min_ms": self.min / ms,
+            "mean_ms": (self.total / self.count / ms) if self.count else 0.0,
+            "p50_ms": self.percentile(50) / ms,
+            "p90_ms": self.percentile(90) / ms,
+            "p99_ms": self.percentile(99) / ms,
+            "p999_ms": self.percentile(99.9) / ms,
+            "max_ms": self.max / ms,
+        }
+
+
+@dataclass(slots=True)
+class SlowStatement:
+    statement_index: int
+    span: dict[str, int]
+    parse_ms: float
+    shape_ms: float
+    total_ms: float
+
+
+class StatementTimings:
+    """
+    Collects per-statement latencies across one or more parse calls.
+
+    `statement_index` in the slow log is 1-based and keeps counting across
+    calls that share this object (e.g. the chunks of one file).
+    """
+
+    def __init__(self, significant_digits: int = 2) -> None:
+        self.histogram = LatencyHistogram(significant_digits)
+        self.slow: list[SlowStatement] = []
+        self.statements = 0
+
+    def record(
+        self,
+        span: dict[str, int],
+        parse_ns: int,
+        shape_ns: int,
+        slow_threshold_ms: float | None,
+    ) -> None:
+        self.statements += 1
+        total_ns = parse_ns + shape_ns
+        self.histogram.record(total_ns)
+        if slow_threshold_ms is None or total_ns < slow_threshold_ms * _NS_PER_MS:
+            return
+        item = SlowStatement(
+            statement_index=self.statements,
+            span=span,
+            parse_ms=parse_ns / _NS_PER_MS,
+            shape_ms=shape_ns / _NS_PER_MS,
+            total_ms=total_ns / _NS_PER_MS,
+        )
+        self.slow.append(item)
+        _log.warning(
+            "slow statement #%d at line %d, col %d: %.2f ms (parse %.2f ms, shape %.2f ms)",
+            item.statement_index,
+            span.get("line", 0),
+            span.get("column", 0),
+            item.total_ms,
+            item.parse_ms,
+            item.shape_ms,
+        )
+
+    def merge(self, other: StatementTimings) -> None:
+        """Append `other` (timings of the statements that follow ours, e.g. from a worker process)."""
+        self.histogram.merge(other.histogram)
+        self.slow.extend(replace(s, statement_index=s.statement_index + self.statements) for s in other.slow)
+        self.statements += other.statements
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"latency": self.histogram.summary(), "slow": [asdict(s) for s in self.slow]}
+
+
+class StatementTimer(ParseTreeListener):
+    """
+    Parse listener for the policy parser: measures the lex+parse time of each
+    `statement` rule while ANTLR builds it; the shaping stage then reports its
+    own time per statement through shaped().
+    """
+
+    def __init__(self, timings: StatementTimings, statement_rule: int, slow_threshold_ms: float | None) -> None:
+        self.timings = timings
+        self.slow_threshold_ms = slow_threshold_ms
+        self._rule = statement_rule
+        self._t0 = 0
+        self._parse_ns: list[int] = []
+        self._clock = time.perf_counter_ns
+
+    def enterEveryRule(self, ctx: ParserRuleContext) -> None:
+        if ctx.getRuleIndex() == self._rule:
+            self._t0 = self._clock()
+
+    def exitEveryRule(self, ctx: ParserRuleContext) -> None:
+        if ctx.getRuleIndex() == self._rule:
+            self._parse_ns.append(self._clock() - self._t0)
+
+    def reset(self) -> None:
+        """Forget the parse times measured so far (the document is parsed again)."""
+        self._parse_ns.clear()
+
+    def shaped(self, i: int, ctx: ParserRuleContext, shape_ns: int) -> None:
+        """Record the i-th (0-based) statement of the current document."""
+        parse_ns = self._parse_ns[i] if i < len(self._parse_ns) else 0
+        self.timings.record(ctx_span(ctx), parse_ns, shape_ns, self.slow_threshold_ms)
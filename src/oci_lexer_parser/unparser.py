@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from .parser_policy_statements import statement_conditions
+
+# ============================================================
+# Canonical text rendering (inverse of the shapers)
+# ============================================================
+#
+# render_policy_statements() turns the statements produced by
+# parse_policy_statements() back into OCI policy text, one statement per line;
+# render_dynamic_group_rule() does the same for a matching rule. The output is
+# canonical: the first keyword is capitalized, every other keyword is lower
+# case, names are quoted only when they have to be, condition values are always
+# quoted, and spacing is fixed. Parsing the rendered text yields the same
+# statements again (spans and source_text aside).
+#
+# A few parsed shapes have no source form and raise ValueError: "unknown"
+# nodes produced under error recovery, and tenancy_id sources/targets created
+# by DEFINE substitution (OCI only accepts a tenancy *name* there).
+
+# Spellings the policy lexer turns into keyword tokens; a name spelled like one
+# of these has to be quoted. Matching is case-insensitive.
+_POLICY_KEYWORDS = frozenset(
+    (
+        "allow", "deny", "to", "in", "where", "define", "as", "admit", "of", "endorse",
+        "associate", "group", "dynamic-group", "any-group", "any-user", "service",
+        "compartment", "tenancy", "any-tenancy", "id", "manage", "use", "read", "inspect",
+        "any", "all", "all-resources", "before", "after", "between", "and", "not",
+    )
+)  # fmt: skip
+
+_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+_BARE_OCID_RE = re.compile(r"ocid1\.[^\s,}']+")
+
+_CLAUSE_OPS = {"eq": " = ", "neq": " != ", "before": " before ", "after": " after "}
+_DG_OPS = {"eq": " = ", "neq": " != "}
+
+# name -> rendered token; names repeat heavily across statements.
+_name_cache: dict[str, str] = {}
+
+
+def _quote(value: str) -> str:
+    if "'" in value.replace("\\'", "") or "\n" in value or "\r" in value:
+        raise ValueError(f"value cannot be rendered as a quoted string: {value!r}")
+    return f"'{value}'"
+
+
+def _name(value: str) -> str:
+    """A `name` token: bare WORD when possible, otherwise QUOTED."""
+    out = _name_cache.get(value)
+    if out is None:
+        bare = (
+            _WORD_RE.fullmatch(value) is not None
+            and value.lower() not in _POLICY_KEYWORDS
+            and not value.lower().startswith("ocid1.")
+        )
+        out = value if bare else _quote(value)
+        if len(_name_cache) < 65536:
+            _name_cache[value] = out
+    return out
+
+
+def _qualified_name(value: str) -> str:
+    # Mirrors _qname(): "Domain/Name" was written as two names around a SLASH.
+    # The part after the SLASH is always quoted: a bare "/Name ... /" would lex
+    # as a PATTERN when another "/" follows on the line ("group A/B, C/D").
+    dom, sep, rest = value.partition("/")
+    if sep and dom and rest:
+        return f"{_name(dom)}/{_quote(rest)}"
+    return _name(value)
+
+
+def _ocid(value: str) -> str:
+    if not value.startswith("ocid1."):
+        raise ValueError(f"expected an OCID; got {value!r}")
+    return value if _BARE_OCID_RE.fullmatch(value) else _quote(value)
+
+
+def _values(node: dict[str, Any], what: str) -> list[Any]:
+    vals = node.get("values")
+    if not isinstance(vals, list) or not vals:
+        raise ValueError(f"{what} has no values: {node!r}")
+    return vals
+
+
+# ============================================================
+# Policy statement parts
+# ============================================================
+
+
+def _subject_label(v: Any) -> str:
+    # Normalized values are {"label", "identity_domain"?}; raw strings are accepted too.
+    if isinstance(v, dict):
+        label = v.get("label")
+        if not isinstance(label, str):
+            raise ValueError(f"subject value has no label: {v!r}")
+        dom = v.get("identity_domain")
+        return f"{dom}/{label}" if dom else label
+    if isinstance(v, str):
+        return v
+    raise ValueError(f"unsupported subject value: {v!r}")
+
+
+def _subject(node: dict[str, Any]) -> str:
+    t = node.get("type")
+    if t == "any-group" or t == "any-user":
+        return t
+    if t == "service":
+        return "service " + ", ".join(_name(_subject_label(v)) for v in _values(node, "service subject"))
+    if t == "group" or t == "dynamic-group":
+        names = ", ".join(_qualified_name(_subject_label(v)) for v in _values(node, f"{t} subject"))
+        return f"{t} {names}"
+    if t == "group-id" or t == "dynamic-group-id":
+        ids = ", ".join("id " + _ocid(_subject_label(v)) for v in _values(node, f"{t} subject"))
+        return f"{t[:-3]} {ids}"
+    raise ValueError(f"cannot render subject of type {t!r}")
+
+
+def _actions(node: dict[str, Any]) -> str:
+    t = node.get("type")
+    if t == "verbs":
+        return str(_values(node, "actions")[0]).lower()
+    if t == "permissions":
+        return "{" + ", ".join(str(p).upper() for p in _values(node, "actions")) + "}"
+    raise ValueError(f"cannot render actions of type {t!r}")
+
+
+def _resource(node: dict[str, Any] | None) -> str | None:
+    t = (node or {}).get("type")
+    if t == "all-resources":
+        return "all-resources"
+    if t == "specific":
+        return str(_values(node or {}, "resources")[0])
+    return None
+
+
+def _compartment_path(names: list[Any]) -> str:
+    return ":".join(_name(str(n)) for n in names)
+
+
+def _location(node: dict[str, Any] | None) -> str:
+    node = node or {}
+    t = node.get("type")
+    if t == "tenancy":
+        # Any values here are a default_tenancy_alias, which is output-only.
+        return "tenancy"
+    if t == "compartment-id":
+        return "compartment id " + _ocid(str(_values(node, "location")[0]))
+    if t == "compartment_name" or t == "compartment-path":
+        return "compartment " + _compartment_path(_values(node, "location"))
+    raise ValueError(f"cannot render location of type {t!r}")
+
+
+def _endorse_scope(node: dict[str, Any] | None) -> str:
+    node = node or {}
+    t = node.get("type")
+    if t == "any-tenancy":
+        return "any-tenancy"
+    if t == "tenancy":
+        return "tenancy " + _name(str(_values(node, "target")[0]))
+    if t == "compartment_name" or t == "compartment-path":
+        ten = node.get("tenancy")
+        if not isinstance(ten, str):
+            raise ValueError(f"compartment target has no tenancy: {node!r}")
+        return f"compartment {_compartment_path(_values(node, 'target'))} of tenancy {_name(ten)}"
+    raise ValueError(f"cannot render endorse target of type {t!r}")
+
+
+def _cond_value(node: dict[str, Any]) -> str:
+    t = node.get("type")
+    v = node.get("value")
+    if not isinstance(v, str):
+        raise ValueError(f"condition value has no string value: {node!r}")
+    if t == "regex":
+        return v
+    if t == "literal" or t == "ocid":
+        return _quote(v)
+    raise ValueError(f"cannot render condition value of type {t!r}")
+
+
+def _clause(node: dict[str, Any]) -> str:
+    lhs = node.get("lhs")
+    op = node.get("op")
+    if not isinstance(lhs, str) or not lhs:
+        raise ValueError(f"condition has no lhs: {node!r}")
+    sym = _CLAUSE_OPS.get(op)  # type: ignore[arg-type]
+    if sym is not None:
+        return lhs + sym + _cond_value(node["rhs"])
+    if op == "in" or op == "not_in":
+        vals = ", ".join(_cond_value(v) for v in node["rhs"]["values"])
+        return f"{lhs} {'in' if op == 'in' else 'not in'} ({vals})"
+    if op == "between":
+        rng = node["rhs"]
+        return f"{lhs} between {_cond_value(rng['from'])} and {_cond_value(rng['to'])}"
+    if op == "exists":
+        return lhs
+    if op == "not_exists":
+        return "not " + lhs
+    raise ValueError(f"cannot render condition operator {op!r}")
+
+
+def _cond_expr(node: dict[str, Any]) -> str:
+    if node.get("type") == "clause":
+        return _clause(node["node"])
+    items = node.get("items") or []
+    if not items:
+        raise ValueError("condition group has no items")
+    mode = str(node.get("mode", "all")).lower()
+    return f"{mode} {{" + ", ".join(_cond_expr(it) for it in items) + "}"
+
+
+def _conditions(node: dict[str, Any] | None) -> str:
+    if not node:
+        return ""
+    # The shaper wraps a bare condition in an ALL group; write it back bare.
+    items = node.get("items") or []
+    if node.get("type") == "group" and str(node.get("mode", "all")).lower() == "all" and len(items) == 1:
+        if items[0].get("type") == "clause":
+            return " where " + _clause(items[0]["node"])
+    return " where " + _cond_expr(node)
+
+
+# ============================================================
+# Statements
+# ============================================================
+
+
+def _render_allow(st: dict[str, Any]) -> str:
+    head = "Deny" if st["kind"] == "deny" else "Allow"
+    res = _resource(st.get("resources"))
+    return (
+        f"{head} {_subject(st['subject'])} to {_actions(st['actions'])}"
+        + (f" {res}" if res else "")
+        + f" in {_location(st.get('location'))}"
+        + _conditions(statement_conditions(st))
+    )
+
+
+def _render_define(st: dict[str, Any]) -> str:
+    sym = st.get("symbol") or {}
+    t = sym.get("type")
+    name = sym.get("name")
+    if not isinstance(name, str) or not name or name == "?":
+        raise ValueError(f"cannot render DEFINE without a name: {st!r}")
+    if t == "group" or t == "dynamic-group":
+        target = f"{t} {_qualified_name(name)}"
+    elif t == "tenancy" or t == "compartment":
+        target = f"{t} {_name(name)}"
+    else:
+        raise ValueError(f"cannot render DEFINE of type {t!r}")
+    return f"Define {target} as {_ocid(str((st.get('def') or {}).get('value')))}"
+
+
+def _render_admit(st: dict[str, Any]) -> str:
+    head = "Deny admit" if st["kind"] == "deny_admit" else "Admit"
+    src = st.get("source")
+    of = ""
+    if src:
+        t = src.get("type")
+        if t == "any-tenancy":
+            of = " of any-tenancy"
+        elif t == "tenancy":
+            of = " of tenancy " + _name(str(_values(src, "source")[0]))
+        else:
+            raise ValueError(f"cannot render admit source of type {t!r}; render before DEFINE substitution")
+    res = _resource(st.get("resources"))
+    return (
+        f"{head} {_subject(st['subject'])}{of} to {_actions(st['actions'])}"
+        + (f" {res}" if res else "")
+        + f" in {_location(st.get('location'))}"
+        + _conditions(statement_conditions(st))
+    )
+
+
+def _render_endorse(st: dict[str, Any]) -> str:
+    head = "Deny endorse" if st["kind"] == "deny_endorse" else "Endorse"
+    tgt = st.get("target") or {}
+    if tgt.get("type") == "tenancy_id":
+        raise ValueError("cannot render endorse target of type 'tenancy_id'; render before DEFINE substitution")
+    actions = st["actions"]
+    res = _resource(st.get("resources"))
+    if res is None:
+        if actions.get("type") != "permissions":
+            raise ValueError(f"endorse statement needs a resource: {st!r}")
+        # ENDORSE ... {PERM, ...} IN ... has neither TO nor a resource-type.
+        middle = _actions(actions)
+    else:
+        middle = f"to {_actions(actions)} {res}"
+    return (
+        f"{head} {_subject(st['subject'])} {middle} in {_endorse_scope(tgt)}"
+        + _conditions(statement_conditions(st))
+    )
+
+
+_RENDERERS = {
+    "allow": _render_allow,
+    "deny": _render_allow,
+    "define": _render_define,
+    "admit": _render_admit,
+    "deny_admit": _render_admit,
+    "endorse": _render_endorse,
+    "deny_endorse": _render_endorse,
+}
+
+
+def render_policy_statement(stmt: dict[str, Any]) -> str:
+    """
+    Render one statement from parse_policy_statements() as canonical policy text.
+    A lazy WHERE clause (lazy_conditions=True) is materialized first.
+    """
+    fn = _RENDERERS.get(stmt.get("kind"))  # type: ignore[arg-type]
+    if fn is None:
+        raise ValueError(f"cannot render statement of kind {stmt.get('kind')!r}")
+    return fn(stmt)
+
+
+def render_policy_statements(
+    payload: dict[str, Any] | tuple[dict[str, Any], dict[str, Any]] | Iterable[dict[str, Any]],
+) -> str:
+    """
+    Render a parse_policy_statements() payload (or a (payload, diagnostics)
+    tuple, or a plain list of statements) as policy text, one statement per line.
+    """
+    if isinstance(payload, tuple):
+        payload = payload[0]
+    stmts = payload.get("statements", []) if isinstance(payload, dict) else payload
+    return "".join(render_policy_statement(st) + "\n" for st in stmts)
+
+
+# ============================================================
+# Dynamic group matching rules
+# ============================================================
+
+
+def _dg_node(node: dict[str, Any]) -> str:
+    if node.get("type") == "clause":
+        pred = node["node"]
+        lhs = pred.get("lhs")
+        if not isinstance(lhs, str) or not lhs:
+            raise ValueError(f"predicate has no lhs: {pred!r}")
+        op = pred.get("op")
+        if op == "exists":
+            return lhs
+        sym = _DG_OPS.get(op)  # type: ignore[arg-type]
+        if sym is None:
+            raise ValueError(f"cannot render predicate operator {op!r}")
+        value = (pred.get("rhs") or {}).get("value")
+        if not isinstance(value, str):
+            raise ValueError(f"predicate has no value: {pred!r}")
+        return lhs + sym + f"'{value}'"
+    mode = str(node.get("mode", "all")).upper()
+    return f"{mode} {{" + ", ".join(_dg_node(it) for it in node.get("items") or []) + "}"
+
+
+def render_dynamic_group_rule(rule: dict[str, Any]) -> str:
+    """
+    Render one rule from parse_dynamic_group_matching_rules() (a {"level",
+    "expr"} object, or just its "expr" tree) as canonical matching-rule text,
+    e.g. "ALL {resource.type = 'fnfunc', resource.compartment.id = 'ocid1...'}".
+    """
+    expr = rule.get("expr", rule)
+    if expr.get("type") == "clause":
+        # A collapsed single predicate still needs a mode to be a valid rule.
+        return "ALL {" + _dg_node(expr) + "}"
+    return _dg_node(expr)
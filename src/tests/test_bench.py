@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+from oci_lexer_parser import parse_dynamic_group_matching_rules, parse_policy_statements
+from oci_lexer_parser.bench.__main__ import main as bench_main
+from oci_lexer_parser.bench.corpus import iter_dg_rules, iter_policy_statements
+from oci_lexer_parser.bench.stats import compare_samples
+
+
+def test_corpus_is_valid_and_covers_every_statement_kind():
+    text = "\n".join(iter_policy_statements(400, seed=3)) + "\n"
+    stmts = parse_policy_statements(text)["statements"]
+    assert len(stmts) == 400
+    kinds = {s["kind"] for s in stmts}
+    assert kinds == {"allow", "deny", "define", "admit", "deny_admit", "endorse", "deny_endorse"}
+
+    ops: set[str] = set()
+
+    def walk(node):
+        if node["type"] == "clause":
+            ops.add(node["node"]["op"])
+        else:
+            for it in node["items"]:
+                walk(it)
+
+    for s in stmts:
+        if "conditions" in s:
+            walk(s["conditions"])
+    assert ops == {"eq", "neq", "in", "not_in", "before", "after", "between", "exists", "not_exists"}
+
+    rules = parse_dynamic_group_matching_rules(list(iter_dg_rules(100, seed=3)))["rules"]
+    assert len(rules) == 100
+    assert max(r["level"] for r in rules) >= 3
+
+
+def test_corpus_is_deterministic_per_seed():
+    assert list(iter_policy_statements(20, seed=1)) == list(iter_policy_statements(20, seed=1))
+    assert list(iter_policy_statements(20, seed=1)) != list(iter_policy_statements(20, seed=2))
+
+
+def test_compare_samples_verdicts():
+    rnd = random.Random(0)
+    base = [1.0 + rnd.uniform(-0.02, 0.02) for _ in range(15)]
+    same = [1.0 + rnd.uniform(-0.02, 0.02) for _ in range(15)]
+    slow = [x * 1.3 for x in base]
+    fast = [x * 0.7 for x in base]
+
+    assert compare_samples(base, same, threshold=0.05)["verdict"] == "ok"
+    res = compare_samples(base, slow, threshold=0.05)
+    assert res["verdict"] == "regressed"
+    assert res["ci_low"] > 0.2
+    assert compare_samples(base, fast, threshold=0.05)["verdict"] == "improved"
+    # Past the threshold but within noise is not a regression.
+    assert compare_samples(base, slow, threshold=0.5)["verdict"] == "ok"
+
+
+def _result(path: Path, samples: list[float]) -> str:
+    doc = {"meta": {}, "scenarios": {"policy-parse": {"units": 1, "median_s": 0, "samples_s": samples}}}
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    return str(path)
+
+
+def test_compare_exit_code(tmp_path: Path, capsys):
+    base = _result(tmp_path / "base.json", [1.0, 1.01, 0.99, 1.0, 1.02])
+    slow = _result(tmp_path / "slow.json", [1.2, 1.21, 1.19, 1.2, 1.22])
+    assert bench_main(["compare", base, base]) == 0
+    assert bench_main(["compare", base, slow, "--threshold", "5"]) == 1
+    assert bench_main(["compare", base, slow, "--threshold", "25"]) == 0
+    out = capsys.readouterr().out
+    assert "policy-parse" in out and "regressed" in out
+
+
+def test_run_writes_all_scenarios(tmp_path: Path):
+    out = tmp_path / "run.json"
+    args = ["run", "--statements", "5", "--rules", "2", "--repeats", "2", "--warmup", "0", "--out", str(out)]
+    assert bench_main(args) == 0
+    doc = json.loads(out.read_text(encoding="utf-8"))
+    assert set(doc["scenarios"]) == {
+        "policy-parse",
+        "dg-parse",
+        "policy-errors",
+        "cli-chunked",
+        "json-emit",
+        "define-subs",
+    }
+    assert all(len(s["samples_s"]) == 2 for s in doc["scenarios"].values())
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from oci_lexer_parser import dedupe_statements, parse_policy_statements, statement_fingerprint
+
+
+def _stmts(text: str, **kwargs):
+    payload = parse_policy_statements(text, **kwargs)
+    if isinstance(payload, tuple):
+        payload, _ = payload
+    return payload["statements"]
+
+
+def test_fingerprint_ignores_formatting_case_and_condition_order():
+    a, b = _stmts(
+        "allow group A to manage instances in tenancy where all { request.region = 'x', target.y = 'z' }\n"
+        "ALLOW group A TO MANAGE Instances IN TENANCY\n"
+        "   where ALL { target.y = 'z', all { request.region = 'x' } }\n",
+        include_spans=True,
+    )
+    assert statement_fingerprint(a) == statement_fingerprint(b)
+
+
+def test_fingerprint_and_dedupe_materialize_lazy_conditions():
+    text = (
+        "allow group A to manage instances in tenancy where all { request.region = 'x', target.y = 'z' }\n"
+        "allow group A to manage instances in tenancy where all { target.y = 'z', request.region = 'x' }\n"
+    )
+    eager = _stmts(text)
+    a, b = _stmts(text, lazy_conditions=True)
+    assert statement_fingerprint(a) == statement_fingerprint(b) == statement_fingerprint(eager[0])
+    assert len(dedupe_statements(_stmts(text, lazy_conditions=True))) == 1
+
+
+def test_fingerprint_distinguishes_meaning():
+    a, b, c = _stmts(
+        "allow group A to read buckets in tenancy\n"
+        "allow group A to read objects in tenancy\n"
+        "allow group A to read buckets in tenancy where request.region = 'x'\n"
+    )
+    assert len({statement_fingerprint(a), statement_fingerprint(b), statement_fingerprint(c)}) == 3
+
+
+def test_dedupe_keeps_first_occurrence_with_provenance():
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "allow group B to read buckets in tenancy\n"
+        "allow   group A to READ buckets in tenancy\n"
+    )
+    out = dedupe_statements(_stmts(text, include_spans=True))
+    assert [s["subject"]["values"][0]["label"] for s in out] == ["A", "B"]
+    prov = out[0]["provenance"]
+    assert [p["statement_index"] for p in prov] == [1, 3]
+    assert prov[1]["span"]["line"] == 3
+    assert out[0]["span"] == prov[0]["span"]
+
+
+def test_parse_dedupe_option_matches_helper():
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "allow group A to read buckets in tenancy\n"
+    )
+    deduped = _stmts(text, dedupe=True)
+    assert deduped == dedupe_statements(_stmts(text))
+    assert len(deduped) == 1
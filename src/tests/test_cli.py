@@ -60,6 +60,14 @@ def test_cli_file_path(tmp_path: Path):
     assert '"T"' in proc.stdout
 
 
+def test_cli_symbols_raise_mode_checks_every_statement():
+    text = read_text(FIXTURES / "04_define_tenancy.txt") + "\nallow group to read\n"
+    assert run_cli(["--symbols", "--error-mode", "raise"], input_text=text).returncode != 0
+    proc = run_cli(["--symbols", "--error-mode", "ignore"], input_text=text)
+    assert proc.returncode == 0
+    assert '"T"' in proc.stdout
+
+
 def test_cli_reports_errors_json():
     bad = read_text(FIXTURES / "05_bad_statement.txt")  # malformed on purpose
     proc = run_cli(["--error-mode", "report"], input_text=bad)
@@ -124,3 +132,259 @@ def test_cli_dynamic_group_rejects_symbols():
     proc = run_cli(["--dynamic-group", "--symbols"], input_text=text)
     assert proc.returncode == 2
     assert "--symbols is not supported" in proc.stderr
+
+
+def test_cli_dedupe_collapses_identical_statements():
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "ALLOW group A TO READ buckets IN tenancy\n"
+        "allow group B to read buckets in tenancy\n"
+    )
+    for extra in ([], ["--chunked"]):
+        proc = run_cli(["--dedupe", *extra], input_text=text)
+        assert proc.returncode == 0
+        stmts = json.loads(proc.stdout)["statements"]
+        assert len(stmts) == 2
+        assert [p["statement_index"] for p in stmts[0]["provenance"]] == [1, 2]
+
+
+def test_cli_dynamic_group_rejects_dedupe():
+    text = read_text(FIXTURES / "03_dynamic_group_matching_rules.txt")
+    proc = run_cli(["--dynamic-group", "--dedupe"], input_text=text)
+    assert proc.returncode == 2
+    assert "--dedupe is not supported" in proc.stderr
+
+
+def test_cli_profile_cpu_writes_pstats(tmp_path: Path):
+    import pstats
+
+    text = read_text(FIXTURES / "02_multi_stmt.txt")
+    out = tmp_path / "parse.prof"
+    for extra in ([], ["--chunked"]):
+        proc = run_cli(["--profile", "cpu", "--profile-out", str(out), *extra], input_text=text)
+        assert proc.returncode == 0
+        assert json.loads(proc.stdout)["statements"]
+        assert "lexer" in proc.stderr and "parser" in proc.stderr
+        assert pstats.Stats(str(out)).total_calls > 0  # type: ignore[attr-defined]
+
+
+def test_cli_profile_mem_writes_diff(tmp_path: Path):
+    out = tmp_path / "mem.txt"
+    policy = read_text(FIXTURES / "02_multi_stmt.txt")
+    dg = read_text(FIXTURES / "03_dynamic_group_matching_rules.txt")
+    for args, text in ((["--chunked", "--jsonl"], policy), (["--dynamic-group"], dg)):
+        proc = run_cli(["--profile", "mem", "--profile-out", str(out), *args], input_text=text)
+        assert proc.returncode == 0
+        assert "retained after parse" in proc.stderr
+        assert out.read_text(encoding="utf-8").startswith("# tracemalloc diff")
+
+
+def test_memory_profiler_stop_before_start_raises(tmp_path: Path):
+    import io
+
+    import pytest
+
+    from oci_lexer_parser.profiling import MemoryProfiler
+
+    prof = MemoryProfiler(str(tmp_path / "mem.txt"), io.StringIO())
+    with pytest.raises(RuntimeError, match=r"stop\(\) called before start\(\)"):
+        prof.stop()
+
+
+def test_cli_profile_out_requires_profile():
+    proc = run_cli(["--profile-out", "x.prof"], input_text="")
+    assert proc.returncode == 2
+    assert "--profile-out requires --profile" in proc.stderr
+
+
+def test_cli_slow_threshold_prints_latency_summary():
+    text = read_text(FIXTURES / "02_multi_stmt.txt")
+    for extra in ([], ["--chunked", "--jsonl"]):
+        proc = run_cli(["--slow-threshold-ms", "0", *extra], input_text=text)
+        assert proc.returncode == 0
+        assert "slow statement #1" in proc.stderr
+        assert "p99" in proc.stderr
+
+
+def test_cli_batched_chunks_match_per_statement_parsing():
+    text = (
+        "# preamble\n"
+        "allow group A to read buckets in tenancy\n"
+        "allow group B to manage objects in compartment C\n"
+        "  where all { request.region = 'x', target.bucket.name = 'y' }\n"
+        "allow group C to read buckets in tenancy allow group D to use vcns in tenancy\n"
+        "allow group to read\n"
+        "define tenancy Acme as ocid1.tenancy.oc1..aaaa\n"
+        "endorse group E to read objects in tenancy Acme\n"
+    )
+    clean = text.replace("allow group to read\n", "")
+    for src, code in ((text, 1), (clean, 0)):
+        base = run_cli(["--chunked", "--include-spans", "--batch-bytes", "0"], input_text=src)
+        assert base.returncode == code
+        for flag, budget in (
+            ("--batch-bytes", "1"),
+            ("--batch-bytes", "150"),
+            ("--batch-bytes", "100000"),
+            ("--batch-tokens", "1"),
+            ("--batch-tokens", "20"),
+            ("--batch-tokens", "100000"),
+        ):
+            proc = run_cli(["--chunked", "--include-spans", flag, budget], input_text=src)
+            assert proc.returncode == code
+            assert proc.stdout == base.stdout
+
+
+def test_batch_chunks_caps_estimated_tokens():
+    from oci_lexer_parser.cli import batch_chunks, estimate_tokens
+
+    chunks = [
+        "allow group A to read buckets in tenancy\n",
+        "define tenancy Acme as ocid1.tenancy.oc1..aaaa\n",
+        "allow group 'Dom'/'B' to use vcns in compartment id ocid1.compartment.oc1..bbbb where target.x != 'y z'\n",
+    ]
+    assert [estimate_tokens(c) for c in chunks] == [8, 5, 16]
+    assert list(batch_chunks(chunks, 0)) == [[c] for c in chunks]
+    assert list(batch_chunks(chunks, 0, 13)) == [chunks[:2], chunks[2:]]
+    assert list(batch_chunks(chunks, 50, 100)) == [chunks[:1], chunks[1:2], chunks[2:]]
+    assert list(batch_chunks(chunks, 0, 1000)) == [chunks]
+
+
+def test_cli_chunked_define_subs_matches_whole_file(tmp_path: Path):
+    text = (
+        "allow group Admins to manage all-resources in tenancy\n"
+        "define group Admins as ocid1.group.oc1..aaaa\n"
+        "define tenancy Acme as ocid1.tenancy.oc1..bbbb\n"
+        "admit group Ops of tenancy Acme to read buckets in tenancy\n"
+        "define group Ops as ocid1.group.oc1..cccc\n"
+    )
+    path = tmp_path / "policy.txt"
+    path.write_text(text + "define group Ops as ocid1.group.oc1..dddd\n", encoding="utf-8")
+    for src, file_args in ((text, []), (None, [str(path)])):
+        whole = run_cli(["--define-subs", "--jsonl", *file_args], input_text=src).stdout
+        assert "ocid1.group.oc1..aaaa" in whole.splitlines()[0]
+        for budget in ("0", "100000"):
+            proc = run_cli(["--define-subs", "--jsonl", "--chunked", "--batch-bytes", budget, *file_args], input_text=src)
+            assert proc.returncode == 0
+            assert proc.stdout == whole
+
+
+def test_cli_chunked_define_subs_rebound_name_matches_whole_file():
+    text = (
+        "define group Ops as ocid1.group.oc1..aaaa allow group Ops to read buckets in tenancy\n"
+        "allow group Ops to use vcns in tenancy\n"
+        "define group Ops as ocid1.group.oc1..bbbb\n"
+    )
+    whole = run_cli(["--define-subs", "--jsonl"], input_text=text).stdout
+    assert "ocid1.group.oc1..aaaa" not in "".join(whole.splitlines()[1:3])
+    for budget in ("0", "100000"):
+        proc = run_cli(["--define-subs", "--jsonl", "--chunked", "--batch-bytes", budget], input_text=text)
+        assert proc.returncode == 0
+        assert proc.stdout == whole
+
+
+def test_cli_isolate_errors_keeps_neighbouring_statements():
+    text = "allow group A to read buckets in tenancy\nallow group to read\nallow group C to use vcns in tenancy\n"
+    proc = run_cli(["--isolate-errors"], input_text=text)
+    assert proc.returncode == 1
+    out = json.loads(proc.stdout)
+    assert [s["kind"] for s in out["statements"]] == ["allow", "unknown", "allow"]
+    assert {e["statement_index"] for e in out["diagnostics"]["errors"]} == {2}
+
+    proc = run_cli(["--workers", "2"], input_text=text)
+    assert proc.returncode == 2
+    assert "--workers requires --isolate-errors" in proc.stderr
+
+
+def test_cli_reads_compressed_input(tmp_path: Path):
+    import bz2
+    import gzip
+    import lzma
+
+    text = "allow group A to read buckets in tenancy\nallow group B to manage objects in compartment C\n"
+    plain = tmp_path / "policy.txt"
+    plain.write_text(text, encoding="utf-8")
+    expected = run_cli(["--jsonl", str(plain)]).stdout
+    data = text.encode("utf-8")
+    # Detection is by magic bytes, not by file name.
+    for name, blob in (("p.gz", gzip.compress(data)), ("p.dat", bz2.compress(data)), ("p.txt", lzma.compress(data))):
+        path = tmp_path / name
+        path.write_bytes(blob)
+        for extra in ([], ["--chunked"]):
+            proc = run_cli(["--jsonl", *extra, str(path)])
+            assert proc.returncode == 0, proc.stderr
+            assert proc.stdout == expected
+
+
+def test_cli_output_file_compressed_by_suffix(tmp_path: Path):
+    import gzip
+
+    text = "allow group A to read buckets in tenancy\n"
+    out = tmp_path / "out.jsonl.gz"
+    proc = run_cli(["--chunked", "--jsonl", "-o", str(out)], input_text=text)
+    assert proc.returncode == 0
+    assert proc.stdout == ""
+    assert gzip.decompress(out.read_bytes()).decode("utf-8") == run_cli(["--jsonl"], input_text=text).stdout
+
+
+def _policy_tree(root: Path) -> Path:
+    (root / "b").mkdir(parents=True)
+    (root / ".hidden").mkdir()
+    (root / "a_defs.txt").write_text("define group Admins as ocid1.group.oc1..aaaa\n", encoding="utf-8")
+    (root / "b" / "uses.txt").write_text("allow group Admins to read buckets in tenancy\n", encoding="utf-8")
+    (root / "b" / "bad.txt").write_text("allow group to read\n", encoding="utf-8")
+    (root / ".hidden" / "skip.txt").write_text("allow group Z to read buckets in tenancy\n", encoding="utf-8")
+    return root
+
+
+def test_cli_directory_input_tags_source_file(tmp_path: Path):
+    root = _policy_tree(tmp_path / "tree")
+    files = [str(root / "a_defs.txt"), str(root / "b" / "bad.txt"), str(root / "b" / "uses.txt")]
+    for args in ([str(root)], [str(root / "**" / "*.txt")], ["--workers", "2", str(root)]):
+        proc = run_cli(args)
+        assert proc.returncode == 1
+        out = json.loads(proc.stdout)
+        assert [s["source_file"] for s in out["statements"]] == files
+        errors = out["diagnostics"]["errors"]
+        assert errors and {e["source_file"] for e in errors} == {files[1]}
+
+
+def test_cli_workers_keep_statement_timings(tmp_path: Path):
+    root = _policy_tree(tmp_path / "tree")
+    for workers in ("1", "2"):
+        proc = run_cli(["--workers", workers, "--slow-threshold-ms", "100000", str(root)])
+        assert "3 statement(s): p50" in proc.stderr
+
+    proc = run_cli(["--isolate-errors", "--workers", "2", "--slow-threshold-ms", "1"], input_text="")
+    assert proc.returncode == 2
+    assert "not supported with --slow-threshold-ms" in proc.stderr
+
+
+def test_cli_shared_defines_resolve_across_files(tmp_path: Path):
+    root = _policy_tree(tmp_path / "tree")
+    (root / "b" / "bad.txt").unlink()
+    uses = str(root / "b" / "uses.txt")
+    local = json.loads(run_cli(["--define-subs", str(root)]).stdout)
+    shared = json.loads(run_cli(["--define-subs", "--shared-defines", str(root)]).stdout)
+    assert local["statements"][1]["subject"]["type"] == "group"
+    assert shared["statements"][1]["subject"]["type"] == "group-id"
+    assert shared["statements"][1]["source_file"] == uses
+    assert run_cli(["--shared-defines", str(root)]).returncode == 2
+
+
+def test_cli_oci_export_policy_list(tmp_path: Path):
+    export = {
+        "data": [
+            {"compartment-id": "c1", "id": "ocid1.policy..1", "name": "p1", "statements": ["allow group A to read buckets in tenancy"]},
+            {"compartment-id": "c2", "id": "ocid1.policy..2", "name": "p2", "statements": ["allow group B to use vcns in tenancy"]},
+        ]
+    }
+    path = tmp_path / "policies.json"
+    path.write_text(json.dumps(export), encoding="utf-8")
+    proc = run_cli(["--oci-export", "--jsonl", str(path)])
+    assert proc.returncode == 0
+    rows = [json.loads(ln) for ln in proc.stdout.splitlines()]
+    assert [r["policy"] for r in rows] == [
+        {"id": "ocid1.policy..1", "name": "p1", "compartment_id": "c1"},
+        {"id": "ocid1.policy..2", "name": "p2", "compartment_id": "c2"},
+    ]
+    assert run_cli(["--oci-export", "--chunked", str(path)]).returncode == 2
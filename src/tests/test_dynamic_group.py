@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import random
 from pathlib import Path
 
 import pytest
 
 from helpers import read_text
 from oci_lexer_parser import parse_dynamic_group_matching_rules
+from oci_lexer_parser.parser_utils import (
+    LazySyntaxIssue,
+    LineIndex,
+    iter_rules_by_newline_preserving_groups,
+    split_rules_by_newline_preserving_groups,
+)
 
 FIXTURES = Path(__file__).parent / "fixtures" / "dynamic_group"
 
@@ -312,3 +319,77 @@ def test_depth3_any_any_any_simplifies_recursively():
     assert expr["mode"] == "any"
     assert len(expr["items"]) == 3
     assert all(item["type"] == "clause" for item in expr["items"])
+
+
+def _reference_split(text: str) -> list[str]:
+    """The original character-by-character splitter (CRLF counted as two breaks, which splits the same)."""
+    chunks: list[str] = []
+    depth = 0
+    in_str = esc = False
+    start = i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == "'":
+                in_str = False
+        elif ch == "'":
+            in_str = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth = max(0, depth - 1)
+        elif ch in "\r\n" and depth == 0:
+            if text[start:i].strip():
+                chunks.append(text[start:i].strip())
+            start = i + 1
+        i += 1
+    if text[start:].strip():
+        chunks.append(text[start:].strip())
+    return chunks
+
+
+def test_rule_splitter_matches_reference_on_random_input():
+    rnd = random.Random(48)
+    for _ in range(5000):
+        text = "".join(rnd.choice("{}'\\\n\r ab") for _ in range(rnd.randint(0, 30)))
+        want = _reference_split(text)
+        assert split_rules_by_newline_preserving_groups(text) == want, text
+        # Streaming: any chunking of the same text gives the same rules.
+        cuts = sorted(rnd.sample(range(len(text) + 1), min(len(text) + 1, rnd.randint(0, 6))))
+        parts = [text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)])]
+        assert list(iter_rules_by_newline_preserving_groups(iter(parts))) == want, parts
+
+
+def test_dynamic_group_budgets_stop_with_a_diagnostic():
+    text = "ANY {x.y = 'z'}\nALL {ANY {ANY {a.b = 'c'}}}\n"
+    payload, diags = parse_dynamic_group_matching_rules(text, error_mode="report", max_condition_depth=2)
+    (err,) = diags["errors"]
+    assert payload["rules"] == []
+    assert (err["budget"], err["rule_index"], err["line"], err["column"]) == ("max_condition_depth", 2, 1, 14)
+    with pytest.raises(ValueError, match="max_tokens=5"):
+        parse_dynamic_group_matching_rules(text, max_tokens=5)
+    assert parse_dynamic_group_matching_rules(text, max_statement_bytes=40) == parse_dynamic_group_matching_rules(text)
+
+
+def test_syntax_issue_to_dict_extends_shared_fields():
+    base = LazySyntaxIssue(1, 4, "boom", "x", (), None, LineIndex("any {x}\n"))
+    assert base.to_dict() == {
+        "line": 1,
+        "column": 4,
+        "message": "boom",
+        "offending": "x",
+        "expected": None,
+        "line_text": "any {x}",
+        "caret": "    ^",
+    }
+    assert base.shifted(2).to_dict()["line"] == 3
+    assert repr(base).startswith("LazySyntaxIssue({")
+
+    _, diags = parse_dynamic_group_matching_rules("any {\n", error_mode="report")
+    (err,) = diags["errors"]
+    assert list(err) == [*base.to_dict(), "rule_index"]
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from helpers import discover_txt, read_text
+from oci_lexer_parser import (
+    parse_policy_document,
+    parse_policy_statements,
+    reparse_policy_document,
+)
+
+FIXTURES_ROOT = Path(__file__).parent / "fixtures" / "policy"
+
+OPTS = {
+    "include_spans": True,
+    "define_subs": True,
+    "error_mode": "report",
+    "default_identity_domain": "Default",
+    "default_tenancy_alias": "Root",
+}
+
+
+def _corpus() -> str:
+    texts = [read_text(p) for d in ("valid_subs", "examples") for p in discover_txt(FIXTURES_ROOT / d)]
+    return "\n".join(texts)
+
+
+def _edit(doc, offset: int, removed: int, inserted: str):
+    new_doc = reparse_policy_document(doc, offset, removed, inserted)
+    expected_text = doc.text[:offset] + inserted + doc.text[offset + removed :]
+    assert new_doc.text == expected_text
+    assert new_doc.result() == parse_policy_statements(expected_text, **OPTS)
+    return new_doc
+
+
+def test_initial_document_matches_full_parse():
+    text = _corpus()
+    doc = parse_policy_document(text, **OPTS)
+    assert doc.result() == parse_policy_statements(text, **OPTS)
+
+
+def test_preamble_shares_first_statement_index():
+    text = "\n\n  allow group A to read all-resources in tenancy\nallow group B to read\n"
+    doc = parse_policy_document(text, error_mode="report")
+    _, diags = doc.result()
+    _, full_diags = parse_policy_statements(text, error_mode="report")
+    assert [e["statement_index"] for e in diags["errors"]] == [2]
+    assert [e["statement_index"] for e in full_diags["errors"]] == [2]
+    assert diags["errors"][0]["line"] == full_diags["errors"][0]["line"]
+
+
+def test_edit_inside_statement_rebases_following_spans():
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "allow group B to read buckets in compartment apps\n"
+        "allow group C to read buckets in tenancy\n"
+    )
+    doc = parse_policy_document(text, **OPTS)
+    offset = text.index("group A") + len("group ")
+    new_doc = _edit(doc, offset, 1, "Admins\n ")
+
+    # Only the edited statement (plus its leading context) was re-parsed; the tail
+    # is shifted, not rebuilt.
+    assert new_doc.segments[-1].start == doc.segments[-1].start + len("Admins\n ") - 1
+    assert new_doc.result()[0]["statements"][2]["span"]["line"] == 4
+
+
+def test_inserting_and_removing_statements():
+    text = "allow group A to read buckets in tenancy\nallow group C to read buckets in tenancy\n"
+    doc = parse_policy_document(text, **OPTS)
+
+    line = "allow group B to use buckets in compartment apps\n"
+    at = text.index("allow group C")
+    doc = _edit(doc, at, 0, line)
+    assert len(doc.result()[0]["statements"]) == 3
+
+    doc = _edit(doc, at, len(line), "")
+    assert len(doc.result()[0]["statements"]) == 2
+
+    # Deleting a statement keyword merges it into the previous statement.
+    doc = _edit(doc, at, len("allow"), "")
+    assert doc.result()[1]["error_count"] > 0
+
+
+def test_define_edit_resubstitutes_only_referencing_statements():
+    text = (
+        "allow group A to read buckets in compartment apps\n"
+        "allow group B to read buckets in compartment other\n"
+        "define compartment apps as 'ocid1.compartment.oc1..one'\n"
+    )
+    doc = parse_policy_document(text, **OPTS)
+    assert doc.result()[0]["statements"][0]["location"]["values"] == ["ocid1.compartment.oc1..one"]
+
+    offset = text.index("one")
+    new_doc = _edit(doc, offset, len("one"), "two")
+    assert new_doc.result()[0]["statements"][0]["location"]["values"] == ["ocid1.compartment.oc1..two"]
+    # The statement that doesn't reference "apps" is shared with the previous state.
+    assert new_doc.segments[1] is doc.segments[1]
+
+
+def test_raise_mode_propagates_syntax_errors():
+    text = "allow group A to read buckets in tenancy\nallow group B to read buckets in tenancy\n"
+    doc = parse_policy_document(text)
+    with pytest.raises(ValueError):
+        reparse_policy_document(doc, text.rindex(" in tenancy"), 3, "")
+
+
+def test_edit_out_of_range_is_rejected():
+    doc = parse_policy_document("allow group A to read buckets in tenancy")
+    with pytest.raises(ValueError):
+        reparse_policy_document(doc, 5, 100, "")
+
+
+def test_random_edits_match_full_parse():
+    text = _corpus()
+    lines = text.splitlines(keepends=True)
+    rng = random.Random(20240611)
+    doc = parse_policy_document(text, **OPTS)
+
+    applied = 0
+    for _ in range(60):
+        cur = doc.text
+        starts = [0]
+        for ln in cur.splitlines(keepends=True):
+            starts.append(starts[-1] + len(ln))
+        roll = rng.random()
+        if roll < 0.4:
+            i = rng.randrange(len(starts) - 1)
+            offset, removed, inserted = starts[i], starts[i + 1] - starts[i], ""
+        elif roll < 0.8:
+            offset, removed = rng.choice(starts), 0
+            inserted = rng.choice(lines).rstrip("\n") + "\n"
+        else:
+            offset, removed, inserted = rng.randrange(len(cur)), 0, " "
+
+        candidate = cur[:offset] + inserted + cur[offset + removed :]
+        try:
+            _, diags = parse_policy_statements(candidate, **OPTS)
+        except (ValueError, AttributeError):
+            continue
+        if diags["error_count"]:
+            continue
+        doc = _edit(doc, offset, removed, inserted)
+        applied += 1
+
+    assert applied > 20
+
+
+def test_deny_admit_across_lines_is_one_statement():
+    text = "Deny\nAdmit group X of tenancy T to manage all-resources in tenancy"
+    doc = parse_policy_document(text, **OPTS)
+    assert doc.result() == parse_policy_statements(text, **OPTS)
+    assert len(doc.segments) == 1
+    assert parse_policy_document(text).result() == parse_policy_statements(text)
+    _edit(doc, 0, 0, "allow group A to read buckets in tenancy\n")
+
+
+DENY_LINES = [
+    "allow group A to read buckets in tenancy\n",
+    "Deny\n",
+    "Admit group X of tenancy T to manage all-resources in tenancy\n",
+    "  Endorse group G to manage object-family in any-tenancy\n",
+    "deny group B to use vcns in tenancy\n",
+]
+
+
+def test_random_deny_admit_edits_match_full_parse():
+    rng = random.Random(7)
+    text = "".join(DENY_LINES[k] for k in (0, 1, 2, 4, 1, 3, 0))
+    doc = parse_policy_document(text, **OPTS)
+
+    applied = 0
+    for _ in range(150):
+        cur = doc.text
+        roll = rng.random()
+        if roll < 0.3:
+            starts = [0] + [i + 1 for i, c in enumerate(cur) if c == "\n"]
+            i = rng.randrange(len(starts) - 1)
+            offset, removed, inserted = starts[i], starts[i + 1] - starts[i], ""
+        elif roll < 0.7:
+            starts = [0] + [i + 1 for i, c in enumerate(cur) if c == "\n"]
+            offset, removed, inserted = rng.choice(starts), 0, rng.choice(DENY_LINES)
+        else:
+            # Join a line with the next one, or split a line at a space.
+            seps = [i for i, c in enumerate(cur) if c in " \n"]
+            offset = rng.choice(seps)
+            removed, inserted = 1, "\n" if cur[offset] == " " else " "
+
+        candidate = cur[:offset] + inserted + cur[offset + removed :]
+        try:
+            _, diags = parse_policy_statements(candidate, **OPTS)
+        except (ValueError, AttributeError):
+            continue
+        if diags["error_count"]:
+            continue
+        doc = _edit(doc, offset, removed, inserted)
+        applied += 1
+
+    assert applied > 40
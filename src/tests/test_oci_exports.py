@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from oci_lexer_parser import parse_dynamic_group_export, parse_policy_export, parse_policy_statements
+from oci_lexer_parser.oci_exports import iter_export_items, iter_policy_records
+
+POLICIES = [
+    {
+        "compartment-id": "ocid1.tenancy.oc1..root",
+        "id": "ocid1.policy.oc1..one",
+        "name": "admins",
+        "statements": [
+            "define group Ops as ocid1.group.oc1..ops",
+            "allow group Ops to manage all-resources in tenancy",
+        ],
+        "lifecycle-state": "ACTIVE",
+    },
+    {
+        "compartment-id": "ocid1.compartment.oc1..apps",
+        "id": "ocid1.policy.oc1..two",
+        "name": "apps",
+        "statements": ["allow group Devs to use instances in compartment apps", "allow group to read"],
+    },
+]
+
+
+class _Trickle(io.StringIO):
+    """Returns at most `n` characters per read(), to split values across buffer refills."""
+
+    def __init__(self, text: str, n: int) -> None:
+        super().__init__(text)
+        self.n = n
+
+    def read(self, size: int | None = -1) -> str:
+        return super().read(self.n)
+
+
+def test_export_items_from_cli_and_sdk_shapes():
+    items = [{"id": i, "n": 1234567.5, "ok": True, "x": None, "s": 'a"b'} for i in range(20)]
+    shapes = [
+        (json.dumps({"opc-next-page": "tok", "data": items}, indent=2), items),
+        (json.dumps(items), items),
+        (json.dumps({"data": items[0]}), items[:1]),
+        ("[]", []),
+    ]
+    for text, want in shapes:
+        for n in (1, 3, 1 << 16):
+            assert list(iter_export_items(_Trickle(text, n))) == want
+
+
+@pytest.mark.parametrize("text", ["", '{"a": 1}', "[1, ", "[1 2]", "5"])
+def test_export_items_reject_malformed_input(text: str):
+    with pytest.raises(ValueError):
+        list(iter_export_items(io.StringIO(text)))
+
+
+def test_policy_export_carries_provenance(tmp_path: Path):
+    path = tmp_path / "policies.json.gz"
+    path.write_bytes(gzip.compress(json.dumps({"data": POLICIES}).encode("utf-8")))
+    payload, diags = parse_policy_export(path, error_mode="report", define_subs=True)
+    assert [s["policy"]["name"] for s in payload["statements"]] == ["admins", "admins", "apps", "apps"]
+    assert payload["statements"][1]["subject"]["type"] == "group-id"
+    assert payload["statements"][2]["policy"]["compartment_id"] == "ocid1.compartment.oc1..apps"
+    assert diags["error_count"] and {e["policy"]["id"] for e in diags["errors"]} == {"ocid1.policy.oc1..two"}
+
+    expected, _ = parse_policy_statements("\n".join(POLICIES[1]["statements"]), error_mode="report")
+    assert [{k: v for k, v in s.items() if k != "policy"} for s in payload["statements"][2:]] == expected["statements"]
+
+
+def test_policy_export_workers_keep_order():
+    sdk = [{**p, "compartment_id": p["compartment-id"]} for p in POLICIES * 40]
+    for p in sdk:
+        del p["compartment-id"]
+    text = json.dumps(sdk)
+    assert [r.compartment_id for r in iter_policy_records(io.StringIO(text))][:2] == [
+        "ocid1.tenancy.oc1..root",
+        "ocid1.compartment.oc1..apps",
+    ]
+    serial = parse_policy_export(io.StringIO(text), error_mode="ignore")
+    assert parse_policy_export(io.StringIO(text), error_mode="ignore", workers=2) == serial
+
+
+def test_policy_export_workers_send_options_once_and_merge_timings(monkeypatch, tmp_path: Path):
+    from oci_lexer_parser import oci_exports
+    from oci_lexer_parser.timing import StatementTimings
+
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps({"data": POLICIES * 80}), encoding="utf-8")
+    table = oci_exports.collect_policy_symbols(path)
+    opts = {"error_mode": "ignore", "define_subs": True, "define_symbols": table, "slow_threshold_ms": 0.0}
+
+    serial_t = StatementTimings()
+    serial = parse_policy_export(path, timings=serial_t, **opts)
+
+    submitted: list[tuple] = []
+    real = oci_exports.ProcessPoolExecutor
+
+    class Recording(real):  # type: ignore[misc, valid-type]
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(args)
+            return super().submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(oci_exports, "ProcessPoolExecutor", Recording)
+    pooled_t = StatementTimings()
+    assert parse_policy_export(path, workers=2, timings=pooled_t, **opts) == serial
+    assert len(submitted) > 1
+    assert all(len(args) == 1 and isinstance(args[0], list) for args in submitted)
+
+    assert pooled_t.statements == serial_t.statements == 320
+    assert pooled_t.histogram.count == serial_t.histogram.count
+    assert [s.statement_index for s in pooled_t.slow] == [s.statement_index for s in serial_t.slow]
+    assert [s.span for s in pooled_t.slow] == [s.span for s in serial_t.slow]
+
+
+def test_dynamic_group_export_carries_provenance():
+    text = json.dumps(
+        {
+            "data": [
+                {
+                    "compartment-id": "ocid1.tenancy.oc1..root",
+                    "id": "ocid1.dynamicgroup.oc1..fn",
+                    "name": "functions",
+                    "matching-rule": "ALL {resource.type = 'fnfunc', resource.compartment.id = 'ocid1.compartment.oc1..x'}",
+                }
+            ]
+        }
+    )
+    payload = parse_dynamic_group_export(io.StringIO(text))
+    (rule,) = payload["rules"]
+    assert rule["dynamic_group"] == {
+        "id": "ocid1.dynamicgroup.oc1..fn",
+        "name": "functions",
+        "compartment_id": "ocid1.tenancy.oc1..root",
+    }
+    with pytest.raises(ValueError, match="matching-rule"):
+        parse_dynamic_group_export(io.StringIO('[{"id": "x"}]'))
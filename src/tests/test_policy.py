@@ -1,6 +1,16 @@
 from __future__ import annotations
 
-from oci_lexer_parser import build_symbols, parse_policy_statements
+import time
+
+import pytest
+
+from oci_lexer_parser import (
+    ParseBudgetExceeded,
+    build_symbols,
+    materialize_conditions,
+    parse_policy_statements,
+    statement_conditions,
+)
 
 
 def parse_policy(text: str, **kwargs):
@@ -73,6 +83,194 @@ def test_return_filter_fields_and_kinds():
     assert "def" in out[0] and "symbol" in out[0]
 
 
+def test_return_filter_is_pushed_into_shaping(monkeypatch):
+    from oci_lexer_parser import parser_policy_statements as pps
+
+    text = "\n".join(
+        [
+            "allow group A to read buckets in compartment C where request.region = 'iad'",
+            "define group A as ocid1.group.oc1..a",
+            "endorse group A to manage objects in tenancy Other where target.bucket.name = 'x'",
+            "allow group B to use vcns in tenancy",
+        ]
+    )
+    filters = [
+        {"define"},
+        {"kinds": ["allow"], "fields": ["subject", "span"]},
+        {"kinds": ["endorse"], "fields": ["target"], "first_only": True},
+        {"fields": ["location"], "first_only": True},
+    ]
+    for rf in filters:
+        for opts in ({}, {"define_subs": True, "include_spans": True}):
+            pushed = parse_policy(text, return_filter=rf, **opts)
+            # dedupe keeps the post-shaping filter; with no duplicates it must agree.
+            post = parse_policy(text, return_filter=rf, dedupe=True, **opts)
+            assert pushed == [{k: v for k, v in st.items() if k != "provenance"} for st in post]
+            assert pushed
+
+    calls = []
+    real = pps._conditions
+    monkeypatch.setattr(pps, "_conditions", lambda *a, **k: calls.append(1) or real(*a, **k))
+    parse_policy(text, return_filter={"kinds": ["allow"], "fields": ["subject"]})
+    parse_policy(text, return_filter={"define"})
+    assert calls == []
+    parse_policy(text, return_filter={"first_only": True})
+    assert len(calls) == 1
+
+
+def test_prefilter_skips_statements_before_parsing():
+    text = "\n".join(
+        [
+            "allow group Admins to manage all-resources in tenancy",
+            "define group Ops as ocid1.group.oc1..ops",
+            "",
+            "endorse group Ops to manage objects in tenancy Other",
+            "allow group to read",
+            "Allow group Ops to read buckets in compartment C",
+            "deny group Ops to use vcns in tenancy",
+        ]
+    )
+    opts = {"include_spans": True, "define_subs": True, "error_mode": "report"}
+    for rf in (["endorse"], {"kinds": ["deny"], "fields": ["subject", "span"]}):
+        plain, _ = parse_policy_statements(text, return_filter=rf, **opts)
+        payload, diags = parse_policy_statements(text, return_filter=rf, prefilter=True, **opts)
+        # The malformed ALLOW is never parsed; spans stay document-relative.
+        assert payload == plain and diags["error_count"] == 0
+    assert parse_policy(text, return_filter=["deny"], prefilter=True, define_subs=True)[0]["subject"]["type"] == "group-id"
+
+    mentions = parse_policy(text, prefilter=["OPS", "admins"], include_spans=True)
+    assert [st["span"]["line"] for st in mentions] == [1, 2, 4, 6, 7]
+    assert parse_policy(text, return_filter=["admit"], prefilter=True) == []
+
+
+def test_prefilter_matches_substrings_per_statement():
+    text = (
+        "allow group Devs to read buckets in tenancy allow group Ops to use vcns in tenancy\n"
+        "allow group Devs to read objects in tenancy where request.region = 'ops-east'\n"
+        "allow group Devs to manage instances in tenancy\n"
+    )
+    for opts in ({}, {"isolate_errors": True}, {"isolate_errors": True, "workers": 2}, {"lazy_conditions": True}):
+        got = parse_policy(text, prefilter="OPS", include_spans=True, **opts)
+        materialize_conditions(got)
+        assert [(st["span"]["line"], st["resources"]["values"]) for st in got] == [(1, ["vcns"]), (2, ["objects"])]
+        assert got == [st for st in parse_policy(text, include_spans=True) if "ops" in st["source_text"].lower()]
+
+
+def test_prefilter_keeps_deny_admit_on_separate_lines_together():
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "Deny\nAdmit group X of tenancy T to manage all-resources in tenancy\n"
+        "deny group B to use vcns in tenancy\n"
+    )
+    opts = {"include_spans": True, "error_mode": "report"}
+    for rf in (["deny"], ["deny_admit"], ["admit", "allow"]):
+        plain = parse_policy_statements(text, return_filter=rf, **opts)
+        assert parse_policy_statements(text, return_filter=rf, prefilter=True, **opts) == plain
+        assert plain[1]["error_count"] == 0
+
+
+def test_lazy_conditions_materialize_to_eager_trees():
+    text = "\n".join(
+        [
+            "allow group A to read buckets in tenancy where any {request.permission = 'X', all {a = 'b', NOT c}}",
+            "define group Ops as ocid1.group.oc1..ops",
+            "endorse group Ops to read objects in any-tenancy where x between '2020' and '2021'",
+            "allow group B to use vcns in compartment C where request.region not in ('phx', 'iad')",
+        ]
+    )
+    for opts in ({"include_spans": True}, {"nested_simplify": True, "isolate_errors": True}):
+        eager = parse_policy_statements(text, **opts)
+        lazy = parse_policy_statements(text, lazy_conditions=True, **opts)
+        assert lazy["statements"][0]["conditions"]["type"] == "lazy"
+        assert lazy["statements"][2]["conditions"]["text"] == "x between '2020' and '2021'"
+        assert statement_conditions(lazy["statements"][0]) == eager["statements"][0]["conditions"]
+        assert materialize_conditions(lazy) == 2
+        assert lazy == eager
+
+    # A clause where none is allowed is not cut: the error is raised/reported as usual.
+    bad = "define group Ops as ocid1.group.oc1..ops where x = 'y'\nallow group A to read buckets where x = 'y'"
+    _, diags = parse_policy_statements(bad, error_mode="report")
+    assert parse_policy_statements(bad, error_mode="report", lazy_conditions=True)[1] == diags
+    with pytest.raises(ValueError, match="syntax error"):
+        parse_policy_statements(bad, lazy_conditions=True)
+
+
+def test_parse_budgets_stop_with_a_diagnostic():
+    ok = "allow group A to read buckets in tenancy where any {a = 'b'}\n"
+    values = ", ".join(f"'r{i}'" for i in range(2000))
+    text = ok + f"allow group B to read buckets in tenancy where request.region in ({values})\n"
+    deep = ok + "allow group A to read buckets in tenancy where " + "any {" * 30 + "x = 'y'" + "}" * 30
+    cases = [
+        (text, {"max_tokens": 500}, 2),
+        (text, {"max_statement_bytes": 1000}, 2),
+        (deep, {"max_condition_depth": 8}, 2),
+        (text, {"deadline": time.monotonic() - 1}, 1),
+    ]
+    for doc, budget, line in cases:
+        for opts in ({}, {"isolate_errors": True}, {"lazy_conditions": True}):
+            payload, diags = parse_policy_statements(doc, error_mode="report", **budget, **opts)
+            (err,) = diags["errors"]
+            assert payload["statements"] == []
+            assert (err["budget"], err["line"], err["statement_index"]) == (*budget, line, line)
+        with pytest.raises(ParseBudgetExceeded, match=f"{next(iter(budget))}=.* at line {line}"):
+            parse_policy_statements(doc, **budget)
+    # Within budget the result is unchanged; limits must be positive.
+    assert parse_policy_statements(ok, max_tokens=20, max_condition_depth=1, max_statement_bytes=len(ok)) == (
+        parse_policy_statements(ok)
+    )
+    with pytest.raises(ValueError, match="max_tokens"):
+        parse_policy_statements(ok, max_tokens=0)
+
+
+def test_lazy_conditions_keep_the_deadline_while_parsing(monkeypatch):
+    from itertools import count
+    from types import SimpleNamespace
+
+    from oci_lexer_parser import budgets
+    from oci_lexer_parser.parser_policy_statements import _token_stream
+
+    values = ", ".join(f"'r{i}'" for i in range(2000))
+    where = f"allow group B to read buckets in tenancy where request.region in ({values})\nallow group to read\n"
+    plain = "allow group A to read buckets in tenancy\n" * 300
+    # (text, clock reads after lexing before the deadline passes): 0 stops the
+    # parse with WHERE clauses cut, 1 the re-parse as written after its error.
+    for text, parse_reads in ((where, 0), (where, 1), (plain, 0)):
+        stream = _token_stream(text)
+        stream.fill()
+        lex_reads = (len(stream.tokens) - 1) // 256 + 1
+        # The budget clock ticks once per read.
+        ticks = count()
+        monkeypatch.setattr(budgets, "time", SimpleNamespace(monotonic=lambda: next(ticks)))
+        deadline = lex_reads + parse_reads - 0.5
+        _, diags = parse_policy_statements(text, error_mode="report", lazy_conditions=True, deadline=deadline)
+        assert [e.get("budget") for e in diags["errors"]] == ["deadline"]
+
+
+def test_deadline_is_checked_per_statement_after_lexing(monkeypatch):
+    from itertools import count
+    from types import SimpleNamespace
+
+    from oci_lexer_parser import budgets
+
+    text = "allow group A to read buckets in tenancy\n" * 5
+    # Under 256 tokens: the lexer reads the clock once, at the first token. Then
+    # each parsed statement reads it once (ticks 1-5), then each shaped one (6-10).
+    for deadline, line in ((2.5, 3), (5.5, 1), (8.5, 4), (10.5, None)):
+        ticks = count()
+        monkeypatch.setattr(budgets, "time", SimpleNamespace(monotonic=lambda: next(ticks)))
+        payload, diags = parse_policy_statements(text, error_mode="report", deadline=deadline)
+        if line is None:
+            assert len(payload["statements"]) == 5 and diags["error_count"] == 0
+        else:
+            assert payload["statements"] == []
+            assert [(e["budget"], e["line"]) for e in diags["errors"]] == [("deadline", line)]
+    for opts in ({"isolate_errors": True}, {"lazy_conditions": True}, {"return_filter": ["allow"]}):
+        ticks = count()
+        monkeypatch.setattr(budgets, "time", SimpleNamespace(monotonic=lambda: next(ticks)))
+        with pytest.raises(ParseBudgetExceeded, match="deadline"):
+            parse_policy_statements(text, deadline=0.5, **opts)
+
+
 def test_default_tenancy_alias_applied_to_in_tenancy():
     text = "ALLOW SERVICE faas TO {KEY_READ} IN TENANCY"
     stmts = parse_policy(
@@ -602,3 +800,165 @@ def test_statement_index_unaffected_by_a_leading_malformed_line():
     assert len(errors) == 2
     assert errors[1]["statement_index"] == 2
     assert errors[1]["line"] == 4
+
+
+def test_intern_shares_identical_subtrees_without_changing_output():
+    text = (
+        "allow group A to read buckets in tenancy where request.permission = 'BUCKET_READ'\n"
+        "allow group A to read objects in tenancy where request.permission = 'BUCKET_READ'\n"
+        "allow group A to read buckets in tenancy where request.permission = 'BUCKET_READ'\n"
+    )
+    for opts in ({}, {"isolate_errors": True}, {"dedupe": True, "define_subs": True}, {"slow_threshold_ms": 1e9}):
+        plain = parse_policy(text, include_spans=True, **opts)
+        shared = parse_policy(text, include_spans=True, intern=True, **opts)
+        assert shared == plain
+
+        a, b = shared[:2]
+        assert a["subject"] is b["subject"]
+        assert a["conditions"] is b["conditions"]
+        assert a["span"] is not b["span"]
+    a, _, c = parse_policy(text, include_spans=True, intern=True)
+    assert a is not c
+    assert a["resources"] is c["resources"]
+
+
+def test_intern_shares_statements_as_they_are_shaped(monkeypatch):
+    from oci_lexer_parser import InternPool
+    from oci_lexer_parser import parser_policy_statements as pps
+
+    pool = InternPool()
+    sizes = []
+    real = pps._shape_statement
+    monkeypatch.setattr(pps, "_shape_statement", lambda *a, **k: sizes.append(len(pool)) or real(*a, **k))
+    text = "".join(f"allow group G{i} to read buckets in compartment c{i}\n" for i in range(3))
+    parse_policy(text, intern=pool)
+    # Each statement is in the pool before the next one is shaped.
+    assert sizes[0] == 0 and sizes[0] < sizes[1] < sizes[2]
+    # Containers are keyed on their interned children, not on copies of them.
+    for key in pool._table:
+        if isinstance(key, tuple):
+            assert all(isinstance(part, int) or not any(isinstance(x, tuple) for x in part) for part in key[1:])
+
+
+def test_intern_pool_can_be_shared_across_calls():
+    from oci_lexer_parser import InternPool
+
+    pool = InternPool()
+    (a,) = parse_policy("allow group A to use vcns in compartment apps", intern=pool)
+    (b,) = parse_policy("ALLOW group A TO USE vcns IN compartment apps", intern=pool)
+    assert a["location"] is b["location"]
+    assert a["actions"] is b["actions"]
+    assert pool.intern([1, True]) == [1, True]
+    assert pool.intern([True]) is not pool.intern([1])
+
+
+def test_isolate_errors_matches_full_parse_on_valid_fixtures():
+    from pathlib import Path
+
+    from helpers import discover_txt, read_text
+
+    root = Path(__file__).parent / "fixtures" / "policy"
+    for d in ("valid_subs", "matrix", "examples", "edge"):
+        for path in discover_txt(root / d):
+            text = read_text(path)
+            for kwargs in ({"include_spans": True}, {"define_subs": True, "error_mode": "report"}):
+                assert parse_policy_statements(text, isolate_errors=True, **kwargs) == parse_policy_statements(
+                    text, **kwargs
+                ), path.name
+
+
+def test_isolate_errors_keeps_neighbours_of_a_bad_statement():
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "allow group B to manage objects in compartment C where all { request.region = 'x',\n"
+        "allow group C to use vcns in tenancy\n"
+    )
+    payload, diags = parse_policy_statements(text, error_mode="report", include_spans=True, isolate_errors=True)
+    a, bad, c = payload["statements"]
+    assert a["subject"]["values"] == [{"label": "A"}]
+    assert c["subject"]["values"] == [{"label": "C"}]
+    assert bad["kind"] == "unknown"
+    assert bad["span"]["line"] == 2
+    assert bad["source_text"].startswith("allow group B") and bad["source_text"].endswith("'x',")
+    assert diags["error_count"] >= 1
+    assert {e["statement_index"] for e in diags["errors"]} == {2}
+    assert all(e["line"] in (2, 3) for e in diags["errors"])
+
+    ignored = parse_policy(text, error_mode="ignore", isolate_errors=True)
+    assert [s["kind"] for s in ignored] == ["allow", "unknown", "allow"]
+
+
+def test_isolate_errors_keeps_deny_admit_on_separate_lines_together():
+    text = (
+        "Deny\nAdmit group X of tenancy T to manage all-resources in tenancy\n"
+        "Deny\n  Endorse group G to manage object-family in any-tenancy\n"
+        "allow group to read\n"
+    )
+    payload, diags = parse_policy_statements(text, error_mode="report", isolate_errors=True)
+    assert [s["kind"] for s in payload["statements"]] == ["deny_admit", "deny_endorse", "unknown"]
+    assert {e["statement_index"] for e in diags["errors"]} == {3}
+    assert parse_policy_statements(text, error_mode="report")[1]["errors"][0]["statement_index"] == 3
+
+
+def test_isolate_errors_with_worker_processes():
+    import pytest
+
+    lines = [f"allow group G{i} to read buckets in compartment c{i}" for i in range(600)]
+    lines[17] = "allow group to read"
+    lines[450] = "allow group X to frobnicate"
+    text = "\n".join(lines) + "\n"
+    serial = parse_policy_statements(text, error_mode="report", include_spans=True, isolate_errors=True)
+    parallel = parse_policy_statements(text, error_mode="report", include_spans=True, isolate_errors=True, workers=2)
+    assert parallel == serial
+    assert [e["statement_index"] for e in serial[1]["errors"]][:1] == [18]
+
+    with pytest.raises(ValueError):
+        parse_policy_statements(text, workers=2)
+    with pytest.raises(ValueError):
+        parse_policy_statements(text, isolate_errors=True, workers=0)
+
+
+def test_line_index_matches_splitlines():
+    from oci_lexer_parser.parser_utils import LineIndex
+
+    for text in ("", "a", "a\n", "a\r\nb\rc\n\nd", "\n\n", "x\r"):
+        idx = LineIndex(text)
+        lines = text.splitlines()
+        assert idx.line_count == len(lines)
+        assert [idx.line_text(i) for i in range(0, len(lines) + 2)] == [None, *lines, None]
+
+
+def test_report_diagnostics_render_line_text_and_caret():
+    text = "allow group A to read buckets in tenancy\r\nallow group to read\r\n"
+    _, diags = parse_policy_statements(text, error_mode="report")
+    first = diags["errors"][0]
+    assert first["line"] == 2
+    assert first["line_text"] == "allow group to read"
+    assert first["caret"] == " " * first["column"] + "^"
+    assert first["statement_index"] == 2
+
+
+def test_expected_tokens_are_memoized_and_stable():
+    from oci_lexer_parser import parser_policy_statements as pps
+
+    text = "allow group A to read buckets\n" * 20
+    _, first = parse_policy_statements(text, error_mode="report")
+    misses = pps._EXPECTED_TOKENS.misses
+    _, again = parse_policy_statements(text, error_mode="report")
+    assert pps._EXPECTED_TOKENS.misses == misses
+    assert first == again
+    assert {tuple(e["expected"]) for e in first["errors"]} == {("IN",)}
+
+
+def test_define_symbols_extend_document_defines():
+    text = "define group Ops as ocid1.group.oc1..local\nallow group Ops, Admins to read buckets in tenancy\n"
+    shared = {("group", "Admins"): "ocid1.group.oc1..shared", ("group", "Ops"): "ocid1.group.oc1..other"}
+    out = parse_policy_statements(text, define_subs=True, define_symbols=shared)
+    subject = out["statements"][1]["subject"]
+    assert subject["type"] == "group-id"
+    assert [v["label"] for v in subject["values"]] == ["ocid1.group.oc1..local", "ocid1.group.oc1..shared"]
+
+    for opts in ({}, {"isolate_errors": True}):
+        out = parse_policy_statements(text, define_subs=True, define_symbols=shared, define_symbols_win=True, **opts)
+        labels = [v["label"] for v in out["statements"][1]["subject"]["values"]]
+        assert labels == ["ocid1.group.oc1..other", "ocid1.group.oc1..shared"]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from oci_lexer_parser import diff_policies, iter_policy_diff_jsonl, parse_policy_statements
+
+OLD = (
+    "allow group A to read buckets in tenancy\n"
+    "allow group B to manage instances in compartment apps where all { request.region = 'x', target.y = 'z' }\n"
+    "define compartment apps as 'ocid1.compartment.oc1..apps'\n"
+    "allow group C to use vcns in tenancy\n"
+)
+
+
+def _stmts(text: str, **kwargs):
+    payload = parse_policy_statements(text, **kwargs)
+    if isinstance(payload, tuple):
+        payload, _ = payload
+    return payload["statements"]
+
+
+def _write_jsonl(path: Path, stmts) -> Path:
+    path.write_text("".join(json.dumps(s) + "\n" for s in stmts), encoding="utf-8")
+    return path
+
+
+def test_identical_snapshots_have_no_changes():
+    res = diff_policies(parse_policy_statements(OLD), parse_policy_statements(OLD))
+    assert res == {"added": [], "removed": [], "modified": [], "unchanged": 4}
+
+
+def test_formatting_case_spans_and_condition_order_are_ignored():
+    new = (
+        "ALLOW group A TO READ Buckets IN TENANCY\n"
+        "allow group B to manage instances in compartment apps\n"
+        "   where all { target.y = 'z', request.region = 'x' }\n"
+        "define compartment apps as ocid1.compartment.oc1..apps\n"
+        "allow group C to use vcns in tenancy\n"
+    )
+    res = diff_policies(_stmts(OLD), _stmts(new, include_spans=True))
+    assert res["unchanged"] == 4
+    assert not res["added"] and not res["removed"] and not res["modified"]
+
+
+def test_lazy_conditions_diff_like_eager_ones(tmp_path: Path):
+    new = OLD.replace("all { request.region = 'x', target.y = 'z' }", "all { target.y = 'z', request.region = 'x' }")
+    res = diff_policies(_stmts(OLD, lazy_conditions=True), _stmts(new, lazy_conditions=True))
+    assert res == {"added": [], "removed": [], "modified": [], "unchanged": 4}
+
+    old_path = _write_jsonl(tmp_path / "old.jsonl", _stmts(OLD, lazy_conditions=True))
+    new_path = _write_jsonl(tmp_path / "new.jsonl", _stmts(new))
+    assert list(iter_policy_diff_jsonl(old_path, new_path)) == []
+
+
+def test_added_removed_and_modified():
+    new = (
+        "allow group A to manage buckets in tenancy\n"
+        "allow group B to manage instances in compartment apps where all { request.region = 'x', target.y = 'z' }\n"
+        "define compartment apps as 'ocid1.compartment.oc1..apps2'\n"
+        "allow group D to use vcns in tenancy\n"
+    )
+    res = diff_policies(_stmts(OLD), _stmts(new))
+
+    assert res["unchanged"] == 1
+    assert [s["subject"]["values"][0]["label"] for s in res["added"]] == ["D"]
+    assert [s["subject"]["values"][0]["label"] for s in res["removed"]] == ["C"]
+    assert [(m["old"]["kind"], m["new"]["kind"]) for m in res["modified"]] == [("allow", "allow"), ("define", "define")]
+    assert res["modified"][0]["new"]["actions"]["values"] == ["manage"]
+
+
+def test_duplicates_are_matched_one_to_one():
+    line = "allow group A to read buckets in tenancy\n"
+    res = diff_policies(_stmts(line * 3), _stmts(line))
+    assert res["unchanged"] == 1
+    assert len(res["removed"]) == 2
+
+
+def test_streaming_jsonl_matches_in_memory_diff(tmp_path: Path):
+    new = (
+        "allow group A to manage buckets in tenancy\n"
+        "allow group B to manage instances in compartment apps where all { target.y = 'z', request.region = 'x' }\n"
+        "allow group D to use vcns in tenancy\n"
+    )
+    old_stmts, new_stmts = _stmts(OLD), _stmts(new)
+    expected = diff_policies(old_stmts, new_stmts)
+
+    changes = list(
+        iter_policy_diff_jsonl(
+            _write_jsonl(tmp_path / "old.jsonl", old_stmts),
+            _write_jsonl(tmp_path / "new.jsonl", new_stmts),
+        )
+    )
+    assert [c["statement"] for c in changes if c["change"] == "added"] == expected["added"]
+    assert [c["statement"] for c in changes if c["change"] == "removed"] == expected["removed"]
+    assert [{"old": c["old"], "new": c["new"]} for c in changes if c["change"] == "modified"] == expected["modified"]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from oci_lexer_parser import (
+    parse_dynamic_group_matching_rules,
+    parse_policy_statements,
+    set_thread_safe_parsing,
+)
+from oci_lexer_parser.bench.corpus import iter_policy_statements
+from oci_lexer_parser.grammar.gen.PolicyStatementLexer import PolicyStatementLexer
+from oci_lexer_parser.grammar.gen.PolicyStatementParser import PolicyStatementParser
+from oci_lexer_parser.recognizers import new_lexer, new_parser
+
+POLICY = "\n".join(iter_policy_statements(15, 11)) + "\n"
+BROKEN = "allow group A to read buckets in tenancy\nallow group to read\ndeny group B to use vcns in tenancy where x = 'y'\n"
+RULES = "ALL {resource.type = 'fnfunc', ANY {resource.compartment.id = 'ocid1.compartment.oc1..x', tag.a.b.value = 'c'}}\n" * 5
+# Errors after the first list item, so recovery goes through sync() at loop-back states.
+SYNC = (
+    "allow group A to {X, Y Z} in tenancy\n"
+    "allow group A to read buckets in tenancy where request.region in ('a', 'b' 'c')\n"
+    "allow group A to read buckets in tenancy where all {a = 'b', c = 'd' e = 'f'}\n"
+    "endorse group G to {X, Y Z} in tenancy\n"
+    "allow group B to read buckets in tenancy where request.region not in ('a', 'b' 'c')\n"
+)
+SYNC_RULES = (
+    "ALL {resource.type = 'fnfunc', resource.compartment.id = 'x' tag.a.b.value = 'c'}\n"
+    "ANY {a = 'b', c = 'd' e = 'f'}\n"
+)
+
+JOBS: list[Callable[[], Any]] = [
+    lambda: parse_policy_statements(POLICY, include_spans=True),
+    lambda: parse_policy_statements(POLICY, lazy_conditions=True, nested_simplify=True),
+    lambda: parse_policy_statements(BROKEN, error_mode="report"),
+    lambda: parse_dynamic_group_matching_rules(RULES, error_mode="report"),
+    lambda: parse_policy_statements(SYNC, error_mode="report"),
+    lambda: parse_dynamic_group_matching_rules(SYNC_RULES, error_mode="report"),
+]
+
+
+@pytest.fixture
+def thread_safe():
+    set_thread_safe_parsing(True)
+    try:
+        yield
+    finally:
+        set_thread_safe_parsing(False)
+
+
+def test_parses_from_32_threads_are_deterministic(thread_safe):
+    expected = [job() for job in JOBS]
+    start = threading.Barrier(32)
+    results: dict[int, list[Any]] = {}
+    failures: list[BaseException] = []
+
+    def worker(n: int) -> None:
+        try:
+            start.wait()
+            # Different threads start at different jobs, so cold caches see different inputs.
+            got = [None] * len(JOBS)
+            for k in range(len(JOBS)):
+                i = (n + k) % len(JOBS)
+                got[i] = JOBS[i]()
+            results[n] = got
+        except BaseException as ex:  # reported below; pytest cannot see worker exceptions
+            failures.append(ex)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not failures
+    assert len(results) == 32
+    assert all(got == expected for got in results.values())
+
+
+def test_thread_safe_parsers_do_not_share_dfa_caches(thread_safe):
+    def dfa_of() -> list[Any]:
+        parser = new_parser(PolicyStatementParser, None)
+        return parser._interp.decisionToDFA
+
+    seen: list[Any] = []
+    t = threading.Thread(target=lambda: seen.append(dfa_of()))
+    t.start()
+    t.join()
+    mine = dfa_of()
+    assert mine is dfa_of()  # reused within a thread
+    assert seen[0] is not mine
+    assert mine is not PolicyStatementParser.decisionsToDFA
+    assert new_lexer(PolicyStatementLexer, "")._interp.decisionToDFA is not PolicyStatementLexer.decisionsToDFA
+
+    set_thread_safe_parsing(False)
+    assert dfa_of() is PolicyStatementParser.decisionsToDFA
+
+
+def test_error_recovery_does_not_change_later_parses(thread_safe):
+    out: list[Any] = []
+
+    def run() -> None:
+        # A new thread starts from a freshly deserialized ATN.
+        atn = new_parser(PolicyStatementParser, None).atn
+        for _ in range(2):
+            payload = parse_policy_statements(SYNC, error_mode="report")
+            cached = [s.nextTokenWithinRule and tuple(s.nextTokenWithinRule.intervals or ()) for s in atn.states]
+            out.append((payload, cached))
+
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    assert out[1] == out[0]
+    # The same error is reported the same way wherever it occurs.
+    messages = [e["message"] for e in out[0][0][1]["errors"] if e["offending"] == "Z"]
+    assert len(messages) == 2 and messages[0] == messages[1]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import io
+import json
+
+from oci_lexer_parser import SymbolTable, parse_policy_export, parse_policy_statements
+
+
+def _stmts(text: str):
+    return parse_policy_statements(text)["statements"]
+
+
+def _subject(text: str, **kwargs):
+    return parse_policy_statements(text, define_subs=True, **kwargs)["statements"][-1]["subject"]
+
+
+def _table() -> SymbolTable:
+    table = SymbolTable()
+    table.add_statements(_stmts("define group Admins as ocid1.group.oc1..admins"), policy="p1", compartment="root")
+    table.add_statements(_stmts("define group Ops as ocid1.group.oc1..ops-a"), policy="p2", compartment="apps")
+    table.add_statements(_stmts("define group Ops as ocid1.group.oc1..ops-b"), policy="p3", compartment="net")
+    table.add_statements([], policy="p4", compartment="apps")
+    return table
+
+
+def test_symbol_table_scoping_and_conflicts():
+    table = _table()
+    assert table.resolve("group", "Admins") == "ocid1.group.oc1..admins"
+    # Ops is defined differently in two compartments: unresolved tenancy-wide,
+    # resolved inside each compartment (also for policies without DEFINEs).
+    assert table.resolve("group", "Ops") is None
+    assert table.resolve("group", "Ops", policy="p4") == "ocid1.group.oc1..ops-a"
+    assert table.resolve("group", "Ops", compartment="net") == "ocid1.group.oc1..ops-b"
+    (conflict,) = table.conflicts()
+    assert (conflict.type, conflict.name) == ("group", "Ops")
+    assert [d[0] for d in conflict.definitions] == ["p2", "p3"]
+
+
+def test_symbol_table_incremental_updates():
+    table = _table()
+    table.add_statements(_stmts("define group Ops as ocid1.group.oc1..ops-a"), policy="p3", compartment="net")
+    assert table.conflicts() == []
+    assert table.resolve("group", "Ops") == "ocid1.group.oc1..ops-a"
+    table.remove_policy("p1")
+    assert ("group", "Admins") not in table
+    assert table.resolve("group", "Admins") is None
+    table.define("group", "Admins", "ocid1.group.oc1..new", policy="p9")
+    assert table.resolve("group", "Admins", policy="p9") == "ocid1.group.oc1..new"
+
+
+def test_symbol_table_substitution_during_parse():
+    table = _table()
+    text = "allow group Admins to read buckets in tenancy\n"
+    assert _subject(text)["type"] == "group"
+    assert _subject(text, define_symbols=table)["values"] == [{"label": "ocid1.group.oc1..admins"}]
+    # A policy without DEFINEs of its own is handed the tenancy-wide dict itself.
+    assert table.view() is table.view(policy="unknown")
+    # The document's own DEFINEs win over the table.
+    local = "define group Admins as ocid1.group.oc1..local\n" + text
+    assert _subject(local, define_symbols=table)["values"] == [{"label": "ocid1.group.oc1..local"}]
+    ops = "allow group Ops to read buckets in tenancy\n"
+    assert _subject(ops, define_symbols=table.view(policy="p4"))["values"] == [{"label": "ocid1.group.oc1..ops-a"}]
+
+
+def test_policy_export_with_symbol_table():
+    from oci_lexer_parser.oci_exports import collect_policy_symbols
+
+    export = json.dumps(
+        {
+            "data": [
+                {"id": "p1", "compartment-id": "root", "name": "defs", "statements": ["define group A as ocid1.group.oc1..a"]},
+                {"id": "p2", "compartment-id": "apps", "name": "use", "statements": ["allow group A to read buckets in tenancy"]},
+            ]
+        }
+    )
+    table = collect_policy_symbols(io.StringIO(export))
+    payload = parse_policy_export(io.StringIO(export), define_subs=True, define_symbols=table)
+    assert payload["statements"][1]["subject"]["type"] == "group-id"
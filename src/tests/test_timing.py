@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from oci_lexer_parser import (
+    LatencyHistogram,
+    StatementTimings,
+    parse_dynamic_group_matching_rules,
+    parse_policy_statements,
+)
+
+
+def test_histogram_percentiles_within_relative_error():
+    h = LatencyHistogram(significant_digits=2)
+    for v in range(1, 100_001):
+        h.record(v * 1000)
+    assert len(h) == 100_000
+    assert h.min == 1000 and h.max == 100_000_000
+    for p, exact in ((50, 50_000_000), (90, 90_000_000), (99, 99_000_000)):
+        assert abs(h.percentile(p) - exact) / exact < 0.01
+    assert h.percentile(100) == h.max
+    assert h.summary()["p50_ms"] == pytest.approx(50.0, rel=0.01)
+
+
+def test_histogram_merge_and_validation():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(5)
+    b.record(3)
+    b.record(7_000_000)
+    a.merge(b)
+    assert (a.count, a.min, a.max) == (3, 3, 7_000_000)
+    with pytest.raises(ValueError):
+        a.record(-1)
+    with pytest.raises(ValueError):
+        a.merge(LatencyHistogram(significant_digits=3))
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_digits=0)
+
+
+def test_policy_timings_and_slow_log(caplog):
+    text = (
+        "allow group A to read buckets in tenancy\n"
+        "\n"
+        "allow group B to manage objects in compartment C "
+        "where any { all { request.region = 'x', target.bucket.name = 'y' }, request.user.id in ('a', 'b', 'c') }\n"
+    )
+    timings = StatementTimings()
+    with caplog.at_level(logging.WARNING, logger="oci_lexer_parser.timing"):
+        plain = parse_policy_statements(text)
+        timed = parse_policy_statements(text, timings=timings, slow_threshold_ms=0)
+    assert timed == plain
+    assert len(timings.histogram) == 2
+    assert [s.statement_index for s in timings.slow] == [1, 2]
+    assert timings.slow[1].span["line"] == 3
+    assert timings.slow[1].total_ms == pytest.approx(timings.slow[1].parse_ms + timings.slow[1].shape_ms)
+    assert len(caplog.records) == 2
+    assert "slow statement #2 at line 3" in caplog.records[1].getMessage()
+
+    quiet = StatementTimings()
+    parse_policy_statements(text, timings=quiet, slow_threshold_ms=60_000)
+    assert len(quiet.histogram) == 2 and quiet.slow == []
+    assert quiet.to_dict()["latency"]["count"] == 2
+
+
+def test_dg_timings_spans_are_document_relative():
+    text = "ALL {instance.id = 'a'}\n\n  ANY {instance.compartment.id = 'b',\n resource.type = 'fnfunc'}\n"
+    timings = StatementTimings()
+    payload = parse_dynamic_group_matching_rules(text, timings=timings, slow_threshold_ms=0)
+    assert payload == parse_dynamic_group_matching_rules(text)
+    first, second = timings.slow
+    assert first.span == {"start": 0, "stop": 22, "line": 1, "column": 0}
+    assert (second.statement_index, second.span["line"], second.span["column"]) == (2, 3, 2)
+    assert text[second.span["start"] : second.span["stop"] + 1].endswith("'fnfunc'}")
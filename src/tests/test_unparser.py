@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from helpers import discover_txt, read_text
+from oci_lexer_parser import (
+    parse_dynamic_group_matching_rules,
+    parse_policy_statements,
+    render_dynamic_group_rule,
+    render_policy_statements,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+POLICY_DIRS = ["valid_subs", "matrix", "examples", "edge"]
+
+
+def _policy_fixtures() -> list[Path]:
+    paths = [p for d in POLICY_DIRS for p in discover_txt(FIXTURES / "policy" / d)]
+    return paths + [p for p in discover_txt(FIXTURES / "cli") if "dynamic_group" not in p.name]
+
+
+def _stmts(text: str, **kwargs):
+    payload = parse_policy_statements(text, **kwargs)
+    if isinstance(payload, tuple):
+        payload, _ = payload
+    return payload["statements"]
+
+
+@pytest.mark.parametrize("txt_path", _policy_fixtures(), ids=lambda p: f"{p.parent.name}/{p.name}")
+def test_policy_fixture_round_trips(txt_path: Path) -> None:
+    try:
+        stmts = _stmts(read_text(txt_path))
+    except ValueError:
+        pytest.skip("fixture is intentionally malformed")
+    text = render_policy_statements(stmts)
+    assert _stmts(text) == stmts
+    # Canonical: rendering the re-parsed statements gives the same text.
+    assert render_policy_statements(_stmts(text)) == text
+
+
+@pytest.mark.parametrize("txt_path", discover_txt(FIXTURES / "dynamic_group"), ids=lambda p: p.name)
+def test_dynamic_group_fixture_round_trips(txt_path: Path) -> None:
+    try:
+        payload = parse_dynamic_group_matching_rules(read_text(txt_path))
+    except ValueError:
+        pytest.skip("fixture is intentionally malformed")
+    rules = payload["rules"]
+    text = "\n".join(render_dynamic_group_rule(r) for r in rules)
+    assert parse_dynamic_group_matching_rules(text)["rules"] == rules
+
+
+def test_render_is_canonical_text():
+    text = (
+        "ALLOW  group 'Default'/'Net Admins', 'read' TO manage VCNS in Compartment a:b\n"
+        "   WHERE request.region = iad\n"
+        "define tenancy Acme as 'ocid1.tenancy.oc1..aaa'\n"
+        "endorse any-user {OBJECT_READ, BUCKET_READ} in any-tenancy\n"
+    )
+    assert render_policy_statements(_stmts(text)) == (
+        "Allow group Default/'Net Admins', 'read' to manage VCNS in compartment a:b where request.region = 'iad'\n"
+        "Define tenancy Acme as ocid1.tenancy.oc1..aaa\n"
+        "Endorse any-user {OBJECT_READ, BUCKET_READ} in any-tenancy\n"
+    )
+
+
+def test_render_materializes_lazy_conditions():
+    text = (
+        "allow group A to read buckets in tenancy where all { request.region = 'x', any { a = 'b', c = 'd' } }\n"
+        "endorse group B to read objects in any-tenancy where request.permission = 'X'\n"
+        "allow group C to use vcns in tenancy\n"
+    )
+    lazy = _stmts(text, lazy_conditions=True)
+    assert lazy[0]["conditions"]["type"] == "lazy"
+    assert render_policy_statements(lazy) == render_policy_statements(_stmts(text))
+    assert lazy[0]["conditions"]["type"] == "group"
+
+
+def test_render_rejects_substituted_tenancy_ids():
+    text = (
+        "define tenancy Peer as ocid1.tenancy.oc1..peer\n"
+        "admit group A of tenancy Peer to read buckets in tenancy\n"
+    )
+    stmts = _stmts(text, define_subs=True)
+    with pytest.raises(ValueError, match="tenancy_id"):
+        render_policy_statements(stmts)
+    # Without substitution the same statements render fine.
+    assert "of tenancy Peer" in render_policy_statements(_stmts(text))
+
+
+def test_render_keeps_qualified_names_apart_from_regex_patterns():
+    text = "allow group A/B, C/D to read buckets in tenancy where target.bucket.name = /logs-.*/\n"
+    stmts = _stmts(text.replace("A/B, C/D", "'A'/'B', 'C'/'D'"))
+    rendered = render_policy_statements(stmts)
+    assert rendered.startswith("Allow group A/'B', C/'D' to read")
+    assert _stmts(rendered) == stmts